@@ -0,0 +1,365 @@
+# src/analytics.py
+"""
+Aggregate analytics over the whole stored decision history (no Streamlit import).
+
+Every option ever saved (storage.py history + data/saved_decisions) is evaluated once and
+kept as one row in a set of numpy columns; dashboards are then plain vectorized reductions
+over those columns. refresh() only ingests what changed since the last call (new history
+rows by insertion sequence, new/deleted saved files by id), and the columns are persisted to
+data/analytics.npz so a restart doesn't re-evaluate the whole history.
+"""
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+import saved_store
+import storage
+from boundaries import BOUNDARY_KEYS, NO_FAILURE, check_columns, limits_row, option_columns
+from criteria import criteria_matrix, weighted_scores
+from export import date_of
+from models import OptionInput
+from snapshots import decode_snapshot, unwrap_record
+
+CACHE_VERSION = 1
+SCORE_BINS = 10  # histogram buckets over the 0-100 score scale
+NO_DAY = -1
+
+_EPOCH = date(1970, 1, 1)
+_BITS = (1 << np.arange(len(BOUNDARY_KEYS))).astype(np.uint8)
+
+
+def _cache_path() -> Path:
+    p = Path(__file__).resolve().parents[1] / "data"
+    p.mkdir(parents=True, exist_ok=True)
+    return p / "analytics.npz"
+
+
+def _day_number(saved_at: str) -> int:
+    d = date_of(saved_at)
+    if not d:
+        return NO_DAY
+    try:
+        return (date.fromisoformat(d) - _EPOCH).days
+    except ValueError:
+        return NO_DAY
+
+
+def _day_label(day: int) -> str:
+    return (_EPOCH + timedelta(days=int(day))).isoformat()
+
+
+@dataclass
+class _Chunk:
+    """
+    Rows ingested by one refresh(), evaluated together before being appended.
+    """
+    doc: list[int]
+    options: list[OptionInput]
+    limits: list[np.ndarray]
+    category: list[str]
+    criteria: list[dict]
+
+    @classmethod
+    def empty(cls) -> "_Chunk":
+        return cls([], [], [], [], [])
+
+
+class HistoryColumns:
+    """
+    Columnar store: one row per option, one doc per saved decision.
+
+    Row columns: doc (int32), fail_mask (uint8), first_fail (int8), score (float32).
+    Doc columns: category (int16 code into self.categories), day (int32 days since epoch,
+    -1 if unknown), alive (bool; deleted saved files are masked out, not rewritten).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.row_doc = np.zeros(0, dtype=np.int32)
+        self.row_fail = np.zeros(0, dtype=np.uint8)
+        self.row_first = np.zeros(0, dtype=np.int8)
+        self.row_score = np.zeros(0, dtype=np.float32)
+        self.doc_cat = np.zeros(0, dtype=np.int16)
+        self.doc_day = np.zeros(0, dtype=np.int32)
+        self.doc_alive = np.zeros(0, dtype=bool)
+        self.categories: list[str] = []
+        self.doc_refs: list[str] = []
+        self.history_seq = 0
+        self._cat_code: dict[str, int] = {}
+        self._saved_docs: dict[str, int] = {}
+
+    # ---- persistence ----
+    def load(self) -> bool:
+        try:
+            with np.load(_cache_path(), allow_pickle=False) as z:
+                if int(z["version"]) != CACHE_VERSION:
+                    return False
+                self.row_doc, self.row_fail = z["row_doc"], z["row_fail"]
+                self.row_first, self.row_score = z["row_first"], z["row_score"]
+                self.doc_cat, self.doc_day, self.doc_alive = z["doc_cat"], z["doc_day"], z["doc_alive"]
+                self.categories = [str(c) for c in z["categories"]]
+                self.doc_refs = [str(r) for r in z["doc_refs"]]
+                self.history_seq = int(z["history_seq"])
+        except Exception:
+            self.reset()
+            return False
+        self._cat_code = {c: i for i, c in enumerate(self.categories)}
+        self._saved_docs = {
+            ref[6:]: i for i, ref in enumerate(self.doc_refs) if ref.startswith("saved:") and self.doc_alive[i]
+        }
+        return True
+
+    def save(self) -> None:
+        path = _cache_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # unique tmp per writer: two processes saving at once must not share (and corrupt) one file
+        with tempfile.NamedTemporaryFile(dir=path.parent, prefix=path.name + ".", suffix=".tmp", delete=False) as f:
+            tmp = f.name
+            try:
+                np.savez(
+                    f,
+                    version=np.array(CACHE_VERSION),
+                    row_doc=self.row_doc,
+                    row_fail=self.row_fail,
+                    row_first=self.row_first,
+                    row_score=self.row_score,
+                    doc_cat=self.doc_cat,
+                    doc_day=self.doc_day,
+                    doc_alive=self.doc_alive,
+                    categories=np.array(self.categories, dtype=str),
+                    doc_refs=np.array(self.doc_refs, dtype=str),
+                    history_seq=np.array(self.history_seq),
+                )
+            except BaseException:
+                f.close()
+                os.unlink(tmp)
+                raise
+        os.replace(tmp, path)
+
+    # ---- ingestion ----
+    def _add_doc(self, chunk: _Chunk, docs: dict[str, list], ref: str, snap: Any, saved_at: str) -> bool:
+        try:
+            decision, options = decode_snapshot(unwrap_record(snap))
+        except Exception:
+            return False
+        category = decision.category or "Personal"
+        if category not in self._cat_code:
+            self._cat_code[category] = len(self.categories)
+            self.categories.append(category)
+
+        doc = len(self.doc_refs) + len(docs["ref"])
+        docs["ref"].append(ref)
+        docs["cat"].append(self._cat_code[category])
+        docs["day"].append(_day_number(saved_at or str(snap.get("saved_at", ""))))
+
+        opts = list(options.values())
+        lim = limits_row(decision.limits)
+        chunk.doc.extend([doc] * len(opts))
+        chunk.options.extend(opts)
+        chunk.limits.extend([lim] * len(opts))
+        chunk.category.extend([category] * len(opts))
+        chunk.criteria.extend(o.criteria or {} for o in opts)
+        return True
+
+    def _append(self, chunk: _Chunk, docs: dict[str, list]) -> None:
+        n = len(chunk.doc)
+        if n:
+            # one limits row per option, so the whole chunk is a single vectorized check
+            res = check_columns(np.array(chunk.limits), option_columns(chunk.options))
+            scores = np.zeros(n, dtype=np.float32)
+            by_cat: dict[str, list[int]] = defaultdict(list)
+            for i, cat in enumerate(chunk.category):
+                by_cat[cat].append(i)
+            for cat, idx in by_cat.items():
+                scores[idx] = weighted_scores(cat, criteria_matrix(cat, [chunk.criteria[i] for i in idx]))
+
+            self.row_doc = np.concatenate([self.row_doc, np.array(chunk.doc, dtype=np.int32)])
+            self.row_fail = np.concatenate([self.row_fail, res.fail_mask.astype(np.uint8)])
+            self.row_first = np.concatenate([self.row_first, res.first_fail.astype(np.int8)])
+            self.row_score = np.concatenate([self.row_score, scores])
+
+        if docs["ref"]:
+            self.doc_cat = np.concatenate([self.doc_cat, np.array(docs["cat"], dtype=np.int16)])
+            self.doc_day = np.concatenate([self.doc_day, np.array(docs["day"], dtype=np.int32)])
+            self.doc_alive = np.concatenate([self.doc_alive, np.ones(len(docs["ref"]), dtype=bool)])
+            for i, ref in enumerate(docs["ref"], start=len(self.doc_refs)):
+                if ref.startswith("saved:"):
+                    self._saved_docs[ref[6:]] = i
+            self.doc_refs.extend(docs["ref"])
+
+    def refresh(self) -> bool:
+        """
+        Ingests new history rows and new saved files, masks deleted saved files.
+        Returns True if anything changed.
+        """
+        with self._lock:
+            chunk = _Chunk.empty()
+            docs: dict[str, list] = {"ref": [], "cat": [], "day": []}
+            changed = False
+
+            upto = storage.last_seq()
+            if upto > self.history_seq:
+                for rec in storage.iter_saved(after_seq=self.history_seq, upto_seq=upto):
+                    self._add_doc(chunk, docs, f"history:{rec.get('id', '')}", rec, str(rec.get("saved_at", "")))
+                self.history_seq = upto
+                changed = True
+
+            current = {it["file_id"]: it for it in saved_store.list_saved_snapshots()}
+            gone = [fid for fid in self._saved_docs if fid not in current]
+            for fid in gone:
+                self.doc_alive[self._saved_docs.pop(fid)] = False
+            changed = changed or bool(gone)
+
+            for fid, meta in current.items():
+                if fid in self._saved_docs:
+                    continue
+                try:
+                    snap = saved_store.load_snapshot_by_id(fid)
+                except Exception:
+                    continue
+                changed = self._add_doc(chunk, docs, f"saved:{fid}", snap, meta["saved_at"]) or changed
+
+            self._append(chunk, docs)
+            return changed
+
+    # ---- aggregation ----
+    def summary(self, since_day: int | None = None) -> dict[str, Any]:
+        """
+        Dashboard aggregates over live docs (optionally only those saved on/after since_day).
+        """
+        with self._lock:
+            doc_ok = self.doc_alive.copy()
+            if since_day is not None:
+                doc_ok &= self.doc_day >= since_day
+            rows = doc_ok[self.row_doc] if self.row_doc.size else np.zeros(0, dtype=bool)
+
+            row_doc = self.row_doc[rows]
+            fail = self.row_fail[rows]
+            first = self.row_first[rows]
+            score = self.row_score[rows]
+            cat = self.doc_cat[row_doc].astype(np.int64)
+            day = self.doc_day[row_doc]
+            categories = list(self.categories)
+            n_docs = int(doc_ok.sum())
+            # arrays are replaced (not grown in place) on refresh, so these stay consistent
+            all_cat, all_day = self.doc_cat, self.doc_day
+
+        n_cat = len(categories)
+        passed = fail == 0
+
+        # per category
+        opts_per_cat = np.bincount(cat, minlength=n_cat)
+        pass_per_cat = np.bincount(cat, weights=passed, minlength=n_cat)
+        docs_per_cat = np.bincount(all_cat[doc_ok], minlength=n_cat)
+        # a decision "has a fit" if any of its options passes
+        doc_fit = np.zeros(all_cat.size, dtype=bool)
+        doc_fit[row_doc[passed]] = True
+        fit_per_cat = np.bincount(all_cat[doc_fit], minlength=n_cat)
+
+        # score quartiles per category: sort by (category, score) once, index into each run
+        order = np.lexsort((score, cat))
+        starts = np.concatenate([[0], np.cumsum(opts_per_cat)])
+        sorted_scores = score[order]
+
+        def _q(i: int, q: float) -> float:
+            lo, hi = starts[i], starts[i + 1]
+            return float(np.quantile(sorted_scores[lo:hi], q)) if hi > lo else 0.0
+
+        bins = np.minimum((score // (100 / SCORE_BINS)).astype(np.int64), SCORE_BINS - 1)
+        hist = np.bincount(cat * SCORE_BINS + bins, minlength=n_cat * SCORE_BINS).reshape(n_cat, SCORE_BINS)
+
+        by_category = [
+            {
+                "category": categories[i],
+                "decisions": int(docs_per_cat[i]),
+                "options": int(opts_per_cat[i]),
+                "pass_rate": float(pass_per_cat[i] / opts_per_cat[i]) if opts_per_cat[i] else 0.0,
+                "decisions_with_fit": float(fit_per_cat[i] / docs_per_cat[i]) if docs_per_cat[i] else 0.0,
+                "score_p25": _q(i, 0.25),
+                "score_median": _q(i, 0.5),
+                "score_p75": _q(i, 0.75),
+                "score_histogram": hist[i].tolist(),
+            }
+            for i in np.argsort(-opts_per_cat, kind="stable")
+            if opts_per_cat[i] or docs_per_cat[i]
+        ]
+
+        # eliminations: the first boundary (in CHECK_ORDER) each failing option trips,
+        # plus how often each boundary is exceeded at all
+        first_counts = np.bincount(first[first != NO_FAILURE].astype(np.int64), minlength=len(BOUNDARY_KEYS))
+        any_counts = ((fail[:, None] & _BITS) > 0).sum(axis=0)
+        eliminations = [
+            {"boundary": key, "first_failure": int(first_counts[i]), "exceeded": int(any_counts[i])}
+            for i, key in enumerate(BOUNDARY_KEYS)
+        ]
+
+        # weekly trend (weeks start on Monday; 1970-01-01 was a Thursday)
+        known = day != NO_DAY
+        week = (day[known] - (day[known] + 3) % 7).astype(np.int64)
+        trend: list[dict[str, Any]] = []
+        if week.size:
+            w0 = int(week.min())
+            widx = week - w0
+            nw = int(widx.max()) + 1
+            opts_w = np.bincount(widx, minlength=nw)
+            pass_w = np.bincount(widx, weights=passed[known], minlength=nw)
+            score_w = np.bincount(widx, weights=score[known], minlength=nw)
+            dweek = all_day[doc_ok & (all_day != NO_DAY)].astype(np.int64)
+            docs_w = np.bincount(dweek - (dweek + 3) % 7 - w0, minlength=nw)
+            trend = [
+                {
+                    "week": _day_label(w0 + i),
+                    "decisions": int(docs_w[i]),
+                    "pass_rate": float(pass_w[i] / opts_w[i]),
+                    "mean_score": float(score_w[i] / opts_w[i]),
+                }
+                for i in np.flatnonzero(opts_w)
+            ]
+
+        return {
+            "decisions": n_docs,
+            "options": int(rows.sum()),
+            "pass_rate": float(passed.mean()) if passed.size else 0.0,
+            "by_category": by_category,
+            "eliminations": eliminations,
+            "trend": trend,
+        }
+
+
+_history: HistoryColumns | None = None
+_history_lock = threading.Lock()
+
+
+def history() -> HistoryColumns:
+    """
+    Process-wide columns (shared by every session), loaded from the on-disk cache once
+    and brought up to date incrementally; the cache is rewritten only when something changed.
+    """
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = HistoryColumns()
+            _history.load()
+        if _history.refresh():
+            try:
+                _history.save()
+            except OSError:
+                # read-only disk: still works, just re-ingests after a restart
+                pass
+        return _history
+
+
+def days_ago(n: int) -> int:
+    return (date.today() - _EPOCH).days - int(n)
@@ -1,8 +1,10 @@
 # src/app.py
 from __future__ import annotations
 
-import base64
+import hashlib
 import importlib
+import re
+from functools import lru_cache
 from pathlib import Path
 
 import streamlit as st
@@ -24,6 +26,7 @@ PAGES = [
     ("Compare", "screens.compare"),
     ("Past Decisions", "screens.past"),
     ("Load Decision", "screens.load"),
+    ("Analytics", "screens.analytics"),
 ]
 
 # Sidebar display labels (keeps internal page keys unchanged)
@@ -35,29 +38,48 @@ NAV_LABELS: dict[str, str] = {
     "Compare": "Compare",
     "Past Decisions": "Past",
     "Load Decision": "Load",
+    "Analytics": "Analytics",
 }
 
 
 # -----------------------------
 # THEME / FONT
 # -----------------------------
-def _load_ttf_as_base64(ttf_path: Path) -> str:
-    if not ttf_path.exists():
-        raise FileNotFoundError(f"Font file not found: {ttf_path}")
-    return base64.b64encode(ttf_path.read_bytes()).decode("utf-8")
-
-
-def apply_global_theme() -> None:
-    root = Path(__file__).resolve().parents[1]  # project root
-    font_path = root / "assets" / "THEBOLDFONT-FREEVERSION.ttf"
-    font_b64 = _load_ttf_as_base64(font_path)
-
-    st.markdown(
-        f"""
-<style>
+# The font is served by Streamlit's static file server (server.enableStaticServing
+# in .streamlit/config.toml) from src/static/ at the "app/static/" URL prefix.
+# The "?v=<hash>" query string makes tornado send a long-lived Cache-Control header,
+# so browsers fetch the font once instead of receiving it inline on every rerun.
+STATIC_DIR = Path(__file__).resolve().parent / "static"
+FONT_FILE = "THEBOLDFONT-FREEVERSION.ttf"
+
+
+def _static_url(filename: str) -> str:
+    path = STATIC_DIR / filename
+    if not path.exists():
+        raise FileNotFoundError(f"Static asset not found: {path}")
+    version = hashlib.sha1(path.read_bytes()).hexdigest()[:12]
+    return f"app/static/{filename}?v={version}"
+
+
+def _minify_css(css: str) -> str:
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    return css.strip()
+
+
+@lru_cache(maxsize=1)
+def _theme_style_block() -> str:
+    """
+    Builds the global <style> block once per process.
+    Every rerun re-sends it, so keep it small (no inline font data).
+    """
+    font_url = _static_url(FONT_FILE)
+
+    css = f"""
 @font-face {{
   font-family: "LifeDecisionFont";
-  src: url(data:font/ttf;base64,{font_b64}) format("truetype");
+  src: url("{font_url}") format("truetype");
   font-weight: 400;
   font-style: normal;
 }}
@@ -221,16 +243,21 @@ button[kind="headerNoPadding"]:hover span[data-testid="stIconMaterial"]::after {
   opacity: 1;
   transform: translateY(-1px);
 }}
-</style>
-        """,
-        unsafe_allow_html=True,
-    )
+"""
+    return f"<style>{_minify_css(css)}</style>"
+
+
+def apply_global_theme() -> None:
+    st.markdown(_theme_style_block(), unsafe_allow_html=True)
 
 
 # -----------------------------
 # NAV
 # -----------------------------
-def render_sidebar() -> None:
+def render_sidebar() -> st.delta_generator.DeltaGenerator:
+    """
+    Returns an empty sidebar slot for the undo/redo controls (filled after the page runs).
+    """
     page_names = [p[0] for p in PAGES]
     current = nav.get_page()
 
@@ -255,11 +282,37 @@ def render_sidebar() -> None:
             format_func=lambda x: NAV_LABELS.get(x, x),
         )
 
+        st.markdown("---")
+        slot = st.container()
+
         st.markdown("---")
         st.markdown(
             f"<div class='small-muted' style='margin-top:6px; font-style: italic;'>{DEDICATION}</div>",
             unsafe_allow_html=True,
         )
+    return slot
+
+
+def render_undo_controls(slot: st.delta_generator.DeltaGenerator) -> None:
+    # Rendered after the page so the buttons reflect edits made during this run
+    with slot:
+        c1, c2 = st.columns(2, gap="small")
+        with c1:
+            st.button(
+                "↶ Undo",
+                key="nav_undo",
+                use_container_width=True,
+                disabled=not state.can_undo(),
+                on_click=state.undo_edit,
+            )
+        with c2:
+            st.button(
+                "↷ Redo",
+                key="nav_redo",
+                use_container_width=True,
+                disabled=not state.can_redo(),
+                on_click=state.redo_edit,
+            )
 
 
 # -----------------------------
@@ -277,8 +330,12 @@ def main() -> None:
     st.set_page_config(page_title=APP_TITLE, layout="wide")
     state.init_state()
     apply_global_theme()
-    render_sidebar()
+    slot = render_sidebar()
     render_page(nav.get_page())
+    state.record_edit()
+    state.autosave_current()
+    state.persist_session()
+    render_undo_controls(slot)
 
 
 if __name__ == "__main__":
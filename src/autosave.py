@@ -0,0 +1,163 @@
+# src/autosave.py
+"""
+Debounced background autosave (no Streamlit import).
+
+The render thread only hands over the latest snapshot (submit() is a dict assignment under a
+lock); one process-wide worker thread coalesces bursts of edits and does the disk write, so
+reruns never wait on I/O. A session's pending snapshot is written once it has been quiet for
+DEBOUNCE_SECONDS, and never more often than every MIN_INTERVAL_SECONDS per session.
+With a batch_writer, every snapshot that is due at the same time goes out in one call.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+log = logging.getLogger(__name__)
+
+DEBOUNCE_SECONDS = 1.5
+MIN_INTERVAL_SECONDS = 5.0
+
+# writer(key, snapshot) does the actual (atomic) write; see saved_store.put_draft
+Writer = Callable[[str, dict], None]
+# batch_writer(items) writes every due (key, snapshot) in one call; see session_store.py
+BatchWriter = Callable[[list[tuple[str, dict]]], None]
+
+
+@dataclass
+class _Pending:
+    snapshot: dict
+    changed_at: float
+
+
+class Autosaver:
+    def __init__(
+        self,
+        writer: Writer | None = None,
+        *,
+        batch_writer: BatchWriter | None = None,
+        debounce: float = DEBOUNCE_SECONDS,
+        min_interval: float = MIN_INTERVAL_SECONDS,
+    ) -> None:
+        if (writer is None) == (batch_writer is None):
+            raise ValueError("Pass exactly one of writer / batch_writer.")
+        self._writer = writer
+        self._batch_writer = batch_writer
+        self.debounce = debounce
+        self.min_interval = min_interval
+        self._pending: dict[str, _Pending] = {}
+        self._last_write: dict[str, float] = {}
+        self._writing: dict[str, dict] = {}
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._flushing = False
+        self.writes = 0
+        self.failures = 0
+
+    # ---- render thread ----
+    def submit(self, key: str, snapshot: dict) -> None:
+        """
+        Queues snapshot as key's latest state (replacing anything not yet written).
+        The caller must not mutate snapshot afterwards.
+        """
+        now = time.monotonic()
+        with self._cond:
+            self._pending[key] = _Pending(snapshot, now)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def pending(self, key: str) -> bool:
+        with self._cond:
+            return key in self._pending or key in self._writing
+
+    def latest(self, key: str) -> dict | None:
+        """
+        key's newest snapshot that isn't known to be written yet (queued or in flight).
+        """
+        with self._cond:
+            p = self._pending.get(key)
+            return p.snapshot if p is not None else self._writing.get(key)
+
+    def discard(self, key: str) -> None:
+        """
+        Drops key's unwritten snapshot and waits out a write already in progress, so the
+        caller can remove key's file without the worker recreating it.
+        """
+        with self._cond:
+            self._pending.pop(key, None)
+            while key in self._writing:
+                self._cond.wait()
+
+    # ---- worker ----
+    def _due_at(self, key: str, p: _Pending) -> float:
+        return max(p.changed_at + self.debounce, self._last_write.get(key, float("-inf")) + self.min_interval)
+
+    def _take_due(self, now: float, force: bool) -> tuple[list[tuple[str, dict]], float | None]:
+        due: list[tuple[str, dict]] = []
+        next_at: float | None = None
+        # once min_interval has passed, a last-write time delays nothing: forget it
+        for key in [k for k, t in self._last_write.items() if now - t >= self.min_interval]:
+            del self._last_write[key]
+        for key, p in list(self._pending.items()):
+            at = self._due_at(key, p)
+            if force or at <= now:
+                snap = self._pending.pop(key).snapshot
+                due.append((key, snap))
+                self._writing[key] = snap
+            else:
+                next_at = at if next_at is None else min(next_at, at)
+        return due, next_at
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    due, next_at = self._take_due(time.monotonic(), self._flushing)
+                    if due:
+                        break
+                    self._cond.wait(None if next_at is None else max(0.0, next_at - time.monotonic()))
+            groups = [due] if self._batch_writer is not None else [[item] for item in due]
+            for group in groups:
+                try:
+                    if self._batch_writer is not None:
+                        self._batch_writer(group)
+                    else:
+                        self._writer(*group[0])
+                    self.writes += len(group)
+                except Exception:
+                    # keep the worker alive; the next edit queues a fresh attempt
+                    self.failures += len(group)
+                    log.exception("autosave failed for %s", ", ".join(key for key, _ in group))
+                with self._cond:
+                    now = time.monotonic()
+                    for key, _ in group:
+                        self._last_write[key] = now
+                        self._writing.pop(key, None)
+                    self._cond.notify_all()
+
+    # ---- shutdown / tests ----
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        Writes everything pending now (ignoring the debounce) and waits for it.
+        Returns False on timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            if self._thread is None:
+                return True
+            self._flushing = True
+            self._cond.notify_all()
+            try:
+                while self._pending or self._writing:
+                    left = None if deadline is None else deadline - time.monotonic()
+                    if left is not None and left <= 0:
+                        return False
+                    self._cond.wait(left)
+            finally:
+                self._flushing = False
+        return True
@@ -0,0 +1,147 @@
+# src/batch_eval.py
+"""
+Headless batch evaluation of saved decisions.
+
+Reads snapshots (or storage.py records wrapping them) from JSONL files, directories of
+saved decision *.json files, or stdin, evaluates each one across a process pool, and
+streams one JSON result per line to stdout (or --output).
+
+    python src/batch_eval.py data/decisions.jsonl
+    python src/batch_eval.py data/saved_decisions -j 8
+    cat archive.jsonl | python src/batch_eval.py - > results.jsonl
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import threading
+from functools import partial
+from multiprocessing import Pool
+from pathlib import Path
+from typing import IO, Iterable, Iterator
+
+from engine import evaluate
+from snapshots import decode_snapshot, unwrap_record
+
+# One work item: (source label, raw JSON text)
+Item = tuple[str, str]
+
+
+# -----------------------------
+# Input
+# -----------------------------
+def _iter_jsonl(f: IO[str], label: str) -> Iterator[Item]:
+    for n, line in enumerate(f, start=1):
+        line = line.strip()
+        if line:
+            yield f"{label}:{n}", line
+
+
+def iter_sources(sources: Iterable[str]) -> Iterator[Item]:
+    for src in sources:
+        if src == "-":
+            yield from _iter_jsonl(sys.stdin, "stdin")
+            continue
+
+        path = Path(src)
+        if path.is_dir():
+            for p in sorted(path.glob("*.json")):
+                try:
+                    yield str(p), p.read_text(encoding="utf-8")
+                except OSError as e:
+                    yield str(p), json.dumps({"__read_error__": str(e)})
+        else:
+            with path.open("r", encoding="utf-8-sig") as f:
+                yield from _iter_jsonl(f, str(path))
+
+
+def _batched(items: Iterable[Item], size: int) -> Iterator[list[Item]]:
+    batch: list[Item] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# -----------------------------
+# Worker
+# -----------------------------
+def evaluate_text(source: str, raw: str, strict: bool = False) -> dict:
+    try:
+        obj = json.loads(raw)
+        if isinstance(obj, dict) and "__read_error__" in obj:
+            raise OSError(obj["__read_error__"])
+        decision, options = decode_snapshot(unwrap_record(obj), strict=strict)
+        return {"source": source, "ok": True, "result": evaluate(decision, options)}
+    except Exception as e:
+        return {"source": source, "ok": False, "error": f"{type(e).__name__}: {e}"}
+
+
+def _evaluate_batch(batch: list[Item], strict: bool = False) -> str:
+    return "".join(
+        json.dumps(evaluate_text(source, raw, strict), ensure_ascii=False) + "\n" for source, raw in batch
+    )
+
+
+def _throttled(batches: Iterator[list[Item]], sem: threading.BoundedSemaphore) -> Iterator[list[Item]]:
+    # Pool.imap drains its input eagerly; this keeps only a few batches in flight.
+    for batch in batches:
+        sem.acquire()
+        yield batch
+
+
+def run(sources: Iterable[str], out: IO[str], *, workers: int, batch_size: int, strict: bool = False) -> int:
+    """
+    Evaluates every item and writes JSONL results in input order. Returns the item count.
+    With strict=True, snapshots with any invalid field are reported as errors instead of defaulted.
+    """
+    batches = _batched(iter_sources(sources), batch_size)
+    evaluate_batch = partial(_evaluate_batch, strict=strict)
+    count = 0
+
+    if workers <= 1:
+        for batch in batches:
+            out.write(evaluate_batch(batch))
+            count += len(batch)
+        return count
+
+    sem = threading.BoundedSemaphore(workers * 4)
+    with Pool(processes=workers) as pool:
+        for chunk in pool.imap(evaluate_batch, _throttled(batches, sem)):
+            sem.release()
+            out.write(chunk)
+            count += chunk.count("\n")
+    return count
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Evaluate saved decisions without the Streamlit UI.")
+    ap.add_argument(
+        "sources",
+        nargs="*",
+        default=["-"],
+        help="JSONL file, directory of *.json snapshots, or '-' for stdin (default).",
+    )
+    ap.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1, help="Worker processes.")
+    ap.add_argument("--batch-size", type=int, default=256, help="Snapshots per worker task.")
+    ap.add_argument("-o", "--output", help="Write results here instead of stdout.")
+    ap.add_argument("--strict", action="store_true", help="Reject snapshots with invalid fields.")
+    args = ap.parse_args(argv)
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        n = run(args.sources, out, workers=args.workers, batch_size=max(1, args.batch_size), strict=args.strict)
+    finally:
+        if args.output:
+            out.close()
+    print(f"evaluated {n} snapshot(s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,167 @@
+# src/boundaries.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Sequence
+
+import numpy as np
+
+from models import RISK_LEVEL, Limits, OptionInput
+
+# STRICT-4 boundary columns, in elimination order.
+# Must stay aligned with screens/compare.py CHECK_ORDER.
+BOUNDARY_KEYS: tuple[str, ...] = ("money", "time", "stress", "relationships")
+
+# fail_mask bit i is set when boundary BOUNDARY_KEYS[i] is exceeded.
+ALL_PASS = 0
+NO_FAILURE = -1
+
+_BITS = (1 << np.arange(len(BOUNDARY_KEYS), dtype=np.uint8)).astype(np.uint8)
+
+
+@dataclass(frozen=True)
+class BoundaryResult:
+    """
+    Columnar result for N options checked against one Limits.
+
+    fail_mask:  uint8[N], 0 means the option fits every boundary
+    first_fail: int8[N], index into BOUNDARY_KEYS of the first exceeded boundary (-1 if none)
+    """
+    fail_mask: np.ndarray
+    first_fail: np.ndarray
+
+    @property
+    def passed(self) -> np.ndarray:
+        return self.fail_mask == ALL_PASS
+
+    def __len__(self) -> int:
+        return int(self.fail_mask.shape[0])
+
+
+def limits_row(limits: Limits) -> np.ndarray:
+    """
+    Encodes Limits as a length-4 int row (money, hours, stress level, relationships level).
+    """
+    return np.array(
+        [
+            int(limits.money_max_usd),
+            int(limits.time_hours_per_week),
+            RISK_LEVEL[limits.stress],
+            RISK_LEVEL[limits.relationships],
+        ],
+        dtype=np.int64,
+    )
+
+
+def option_columns(opts: Sequence[OptionInput]) -> np.ndarray:
+    """
+    Encodes options as an N×4 int matrix with the same column order as limits_row().
+    """
+    rows = [
+        (
+            int(o.money_at_risk_usd),
+            int(o.time_required_hours_per_week),
+            RISK_LEVEL[o.stress_fit],
+            RISK_LEVEL[o.relationships_impact],
+        )
+        for o in opts
+    ]
+    return np.array(rows, dtype=np.int64).reshape(len(rows), len(BOUNDARY_KEYS))
+
+
+def check_columns(limit_row: np.ndarray, cols: np.ndarray) -> BoundaryResult:
+    """
+    Vectorized boundary check over pre-encoded columns (see option_columns()).
+    Every column uses the same rule: actual <= limit.
+    """
+    cols = np.asarray(cols)
+    exceeded = cols > np.asarray(limit_row)
+    fail_mask = (exceeded.astype(np.uint8) * _BITS).sum(axis=1, dtype=np.uint8)
+    first_fail = np.where(exceeded.any(axis=1), exceeded.argmax(axis=1), NO_FAILURE).astype(np.int8)
+    return BoundaryResult(fail_mask=fail_mask, first_fail=first_fail)
+
+
+def check_batch(limits: Limits, opts: Sequence[OptionInput]) -> BoundaryResult:
+    """
+    Checks many options against one Limits (same rules as models.check_limits).
+    """
+    return check_columns(limits_row(limits), option_columns(opts))
+
+
+def mask_to_checks(fail_mask: int) -> Dict[str, bool]:
+    """
+    Expands one fail_mask back into the check_limits()-style {key: passed} dict.
+    """
+    m = int(fail_mask)
+    return {k: not (m >> i) & 1 for i, k in enumerate(BOUNDARY_KEYS)}
+
+
+def first_failure_key(first_fail: int) -> str | None:
+    i = int(first_fail)
+    return None if i == NO_FAILURE else BOUNDARY_KEYS[i]
+
+
+# -----------------------------
+# What-if grid (limit sliders)
+# -----------------------------
+# Must match the Limits sliders on the constraints screen: (min, max, step)
+MONEY_LIMIT_RANGE = (0, 20000, 100)
+TIME_LIMIT_RANGE = (0, 80, 1)
+
+MONEY_GRID = np.arange(MONEY_LIMIT_RANGE[0], MONEY_LIMIT_RANGE[1] + 1, MONEY_LIMIT_RANGE[2], dtype=np.int64)
+TIME_GRID = np.arange(TIME_LIMIT_RANGE[0], TIME_LIMIT_RANGE[1] + 1, TIME_LIMIT_RANGE[2], dtype=np.int64)
+N_RISK_LEVELS = len(RISK_LEVEL)
+
+
+def pass_count_grid(cols: np.ndarray) -> np.ndarray:
+    """
+    How many options fit at every reachable limit setting.
+
+    An option's columns (see option_columns()) ARE its thresholds: it passes a boundary
+    exactly when the limit is >= its value. Each option drops a +1 at its threshold cell
+    and a cumulative sum over all four axes turns that into pass counts.
+
+    Returns int16[stress_tol, relationships_tol, time_idx, money_idx] over
+    N_RISK_LEVELS × N_RISK_LEVELS × TIME_GRID × MONEY_GRID.
+    """
+    cols = np.asarray(cols, dtype=np.int64).reshape(-1, len(BOUNDARY_KEYS))
+    shape = (N_RISK_LEVELS, N_RISK_LEVELS, len(TIME_GRID), len(MONEY_GRID))
+    grid = np.zeros(shape, dtype=np.int16)
+
+    m_idx = np.searchsorted(MONEY_GRID, cols[:, 0], side="left")
+    t_idx = np.searchsorted(TIME_GRID, cols[:, 1], side="left")
+    reachable = (m_idx < len(MONEY_GRID)) & (t_idx < len(TIME_GRID))
+
+    np.add.at(grid, (cols[reachable, 2], cols[reachable, 3], t_idx[reachable], m_idx[reachable]), 1)
+    for axis in range(grid.ndim):
+        np.cumsum(grid, axis=axis, out=grid)
+    return grid
+
+
+def grid_index(limits: Limits) -> tuple[int, int, int, int]:
+    """
+    Cell of pass_count_grid() for the given Limits (values are clamped onto the grid).
+    """
+    m = int(np.searchsorted(MONEY_GRID, int(limits.money_max_usd), side="right")) - 1
+    t = int(np.searchsorted(TIME_GRID, int(limits.time_hours_per_week), side="right")) - 1
+    return (
+        RISK_LEVEL[limits.stress],
+        RISK_LEVEL[limits.relationships],
+        min(max(t, 0), len(TIME_GRID) - 1),
+        min(max(m, 0), len(MONEY_GRID) - 1),
+    )
+
+
+def off_grid(limits: Limits) -> tuple[str, ...]:
+    """
+    BOUNDARY_KEYS whose limit is not exactly a grid value. Snapshots can carry such limits;
+    grid_index() rounds them down onto the grid, so the cell's pass count may not be theirs.
+    """
+    out = []
+    for key, value, (lo, hi, step) in (
+        ("money", int(limits.money_max_usd), MONEY_LIMIT_RANGE),
+        ("time", int(limits.time_hours_per_week), TIME_LIMIT_RANGE),
+    ):
+        if not lo <= value <= hi or (value - lo) % step:
+            out.append(key)
+    return tuple(out)
@@ -0,0 +1,192 @@
+# src/bulk_import.py
+"""
+Bulk import of decision snapshots into the saved-decisions store.
+
+Accepts JSONL files (one snapshot, or storage.py record, per line) and ZIP archives
+containing *.json / *.jsonl members. Records are streamed one at a time, validated with
+the same compiled decoder as state.apply_snapshot (snapshots.decode_snapshot), and written to
+saved_store in batches, so memory stays flat regardless of archive size.
+
+    python src/bulk_import.py archive.zip
+    python src/bulk_import.py export.jsonl --batch-size 500
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import sys
+import zipfile
+from dataclasses import dataclass, field
+from typing import IO, Callable, Iterable, Iterator
+
+import saved_store
+from snapshots import decode_snapshot, encode_snapshot, unwrap_record
+
+# One raw record: (source label, JSON text)
+Item = tuple[str, str]
+
+DEFAULT_BATCH_SIZE = 200
+# Only the first N failures keep their message (the count is always exact)
+MAX_REPORTED_ERRORS = 500
+# Single-snapshot members larger than this inside a ZIP are rejected, not read
+MAX_MEMBER_BYTES = 8 * 1024 * 1024
+
+
+@dataclass
+class ImportReport:
+    imported: int = 0
+    failed: int = 0
+    errors: list[dict[str, str]] = field(default_factory=list)
+
+    @property
+    def processed(self) -> int:
+        return self.imported + self.failed
+
+    def add_error(self, source: str, error: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"source": source, "error": error})
+
+
+# -----------------------------
+# Input
+# -----------------------------
+def _iter_jsonl(f: IO[bytes], label: str) -> Iterator[Item]:
+    text = io.TextIOWrapper(f, encoding="utf-8-sig", errors="replace", newline=None)
+    try:
+        for n, line in enumerate(text, start=1):
+            line = line.strip()
+            if line:
+                yield f"{label}:{n}", line
+    finally:
+        # don't close the caller's file along with the wrapper
+        text.detach()
+
+
+def _iter_zip(f: IO[bytes], label: str) -> Iterator[Item]:
+    with zipfile.ZipFile(f) as zf:
+        for info in zf.infolist():
+            name = info.filename
+            if info.is_dir() or name.startswith("__MACOSX/"):
+                continue
+            source = f"{label}/{name}"
+            lower = name.lower()
+            if lower.endswith(".jsonl"):
+                with zf.open(info) as member:
+                    yield from _iter_jsonl(member, source)
+            elif lower.endswith(".json"):
+                if info.file_size > MAX_MEMBER_BYTES:
+                    yield source, json.dumps({"__read_error__": "file too large"})
+                    continue
+                with zf.open(info) as member:
+                    yield source, member.read().decode("utf-8-sig", errors="replace")
+
+
+def iter_records(f: IO[bytes], filename: str) -> Iterator[Item]:
+    """
+    Streams raw records out of a binary file object; the format is picked from filename.
+    """
+    lower = filename.lower()
+    if lower.endswith(".zip"):
+        yield from _iter_zip(f, filename)
+    elif lower.endswith(".jsonl") or lower.endswith(".ndjson"):
+        yield from _iter_jsonl(f, filename)
+    else:
+        raise ValueError(f"Unsupported file type: {filename} (expected .jsonl or .zip)")
+
+
+# -----------------------------
+# Validate + write
+# -----------------------------
+def normalize_record(raw: str, strict: bool = False) -> dict:
+    """
+    Parses one record and rebuilds it as a clean current-format snapshot.
+    Raises ValueError if it can't be loaded (SnapshotError listing every invalid field if strict).
+    """
+    try:
+        obj = json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"invalid JSON ({e.msg}, line {e.lineno} col {e.colno})") from None
+    if isinstance(obj, dict) and "__read_error__" in obj:
+        raise ValueError(obj["__read_error__"])
+
+    snap = unwrap_record(obj)
+    decision, options = decode_snapshot(snap, strict=strict)
+    out = encode_snapshot(decision, options)
+    saved_at = str(snap.get("saved_at") or "").strip()
+    if saved_at:
+        out["saved_at"] = saved_at
+    return out
+
+
+def import_records(
+    items: Iterable[Item],
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    strict: bool = False,
+    on_batch: Callable[[ImportReport], None] | None = None,
+) -> ImportReport:
+    """
+    Validates each record and writes the valid ones via saved_store.save_snapshot_files,
+    batch_size at a time. on_batch is called after every flushed batch (progress).
+    """
+    report = ImportReport()
+    batch: list[dict] = []
+
+    def flush() -> None:
+        if batch:
+            report.imported += len(saved_store.save_snapshot_files(batch))
+            batch.clear()
+        if on_batch is not None:
+            on_batch(report)
+
+    for n, (source, raw) in enumerate(items, start=1):
+        try:
+            batch.append(normalize_record(raw, strict))
+        except Exception as e:
+            report.add_error(source, str(e) or type(e).__name__)
+        # count failures too, so progress keeps moving through a run of bad records
+        if n % batch_size == 0:
+            flush()
+
+    flush()
+    return report
+
+
+def import_file(
+    f: IO[bytes],
+    filename: str,
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    strict: bool = False,
+    on_batch: Callable[[ImportReport], None] | None = None,
+) -> ImportReport:
+    return import_records(iter_records(f, filename), batch_size=batch_size, strict=strict, on_batch=on_batch)
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Bulk import decision snapshots into data/saved_decisions.")
+    ap.add_argument("files", nargs="+", help=".jsonl or .zip files")
+    ap.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    ap.add_argument("--strict", action="store_true", help="skip records with any invalid field")
+    args = ap.parse_args(argv)
+
+    total = ImportReport()
+    for path in args.files:
+        with open(path, "rb") as f:
+            rep = import_file(f, path, batch_size=max(1, args.batch_size), strict=args.strict)
+        total.imported += rep.imported
+        total.failed += rep.failed
+        for err in rep.errors:
+            print(json.dumps(err, ensure_ascii=False), file=sys.stderr)
+
+    print(f"imported {total.imported}, failed {total.failed}", file=sys.stderr)
+    return 1 if total.failed and not total.imported else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
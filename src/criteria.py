@@ -2,7 +2,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, List
+from functools import lru_cache
+from typing import Dict, Iterable, List, Mapping
+
+import numpy as np
 
 
 @dataclass(frozen=True)
@@ -56,10 +59,49 @@ def criteria_for(category: str) -> List[Criterion]:
     return CRITERIA_BY_CATEGORY.get(category, CRITERIA_BY_CATEGORY["Personal"])
 
 
+@dataclass(frozen=True)
+class CompiledCriteria:
+    """
+    Per-category criteria flattened into arrays (column order = criteria_for order).
+    """
+    keys: tuple[str, ...]
+    weights: np.ndarray
+    min_values: np.ndarray
+    max_values: np.ndarray
+    defaults: np.ndarray
+    total_weight: float
+    max_raw: float
+
+
+def compile_criteria(category: str) -> CompiledCriteria:
+    # unknown (free-text) categories share the fallback's entry, so the cache stays bounded
+    return _compile(category if category in CRITERIA_BY_CATEGORY else "Personal")
+
+
+@lru_cache(maxsize=32)
+def _compile(category: str) -> CompiledCriteria:
+    crits = criteria_for(category)
+
+    def _arr(values: Iterable[float], dtype) -> np.ndarray:
+        a = np.array(list(values), dtype=dtype)
+        a.setflags(write=False)
+        return a
+
+    return CompiledCriteria(
+        keys=tuple(c.key for c in crits),
+        weights=_arr((c.weight for c in crits), np.float64),
+        min_values=_arr((c.min_value for c in crits), np.int64),
+        max_values=_arr((c.max_value for c in crits), np.int64),
+        defaults=_arr((c.default for c in crits), np.int64),
+        total_weight=sum(c.weight for c in crits),
+        max_raw=sum(c.max_value * c.weight for c in crits),
+    )
+
+
 def weighted_score(category: str, values: Dict[str, int]) -> float:
     crits = criteria_for(category)
-    total_w = sum(c.weight for c in crits)
-    if total_w <= 0:
+    compiled = compile_criteria(category)
+    if compiled.total_weight <= 0:
         return 0.0
 
     s = 0.0
@@ -69,7 +111,94 @@ def weighted_score(category: str, values: Dict[str, int]) -> float:
         s += v * c.weight
 
     # Normalize to 0–100
-    max_raw = sum(c.max_value * c.weight for c in crits)
-    if max_raw <= 0:
+    if compiled.max_raw <= 0:
         return 0.0
-    return (s / max_raw) * 100.0
+    return (s / compiled.max_raw) * 100.0
+
+
+def criteria_matrix(category: str, values: Iterable[Mapping[str, int]]) -> np.ndarray:
+    """
+    Builds the N×M int matrix expected by weighted_scores() from per-option criteria dicts.
+    Missing keys fall back to the criterion default (same rule as weighted_score).
+    """
+    compiled = compile_criteria(category)
+    rows = [
+        [int(v.get(k, d)) for k, d in zip(compiled.keys, compiled.defaults.tolist())]
+        for v in values
+    ]
+    if not rows:
+        return np.empty((0, len(compiled.keys)), dtype=np.int64)
+    return np.array(rows, dtype=np.int64)
+
+
+def weighted_scores(category: str, matrix: np.ndarray) -> np.ndarray:
+    """
+    Batch version of weighted_score(): one row per option, one column per criterion
+    (criteria_for order). Returns a float64 array of 0–100 scores.
+
+    Columns are accumulated left-to-right so results are bit-identical to the scalar path.
+    """
+    compiled = compile_criteria(category)
+    m = np.asarray(matrix)
+    if m.ndim != 2 or m.shape[1] != len(compiled.keys):
+        raise ValueError(
+            f"Expected an N×{len(compiled.keys)} matrix for '{category}', got shape {m.shape}."
+        )
+
+    n = m.shape[0]
+    if compiled.total_weight <= 0 or compiled.max_raw <= 0:
+        return np.zeros(n, dtype=np.float64)
+
+    clipped = np.clip(m.astype(np.int64, copy=False), compiled.min_values, compiled.max_values)
+    s = np.zeros(n, dtype=np.float64)
+    for j, w in enumerate(compiled.weights.tolist()):
+        s += clipped[:, j] * w
+
+    return (s / compiled.max_raw) * 100.0
+
+
+def win_probabilities(
+    category: str,
+    matrix: np.ndarray,
+    *,
+    samples: int = 10_000,
+    weight_jitter: float = 0.25,
+    value_jitter: float = 1.0,
+    seed: int = 0,
+) -> np.ndarray:
+    """
+    Monte Carlo weight/value sensitivity for the N options in `matrix` (see weighted_scores).
+
+    Each sample scales every criterion weight by U(1 - weight_jitter, 1 + weight_jitter)
+    and shifts every criterion value by U(-value_jitter, +value_jitter) (clipped to range),
+    then re-scores all options at once. Returns each option's share of samples in which it
+    scores highest (ties are split evenly), so the result sums to 1.
+    """
+    compiled = compile_criteria(category)
+    m = np.asarray(matrix)
+    n = m.shape[0] if m.ndim == 2 else 0
+    if n == 0:
+        return np.zeros(0, dtype=np.float64)
+    if m.shape[1] != len(compiled.keys):
+        raise ValueError(
+            f"Expected an N×{len(compiled.keys)} matrix for '{category}', got shape {m.shape}."
+        )
+
+    n_crit = len(compiled.keys)
+    rng = np.random.default_rng(seed)
+    lo = compiled.min_values.astype(np.float64)
+    hi = compiled.max_values.astype(np.float64)
+
+    base = np.clip(m.astype(np.float64), lo, hi)
+    w = compiled.weights * rng.uniform(1.0 - weight_jitter, 1.0 + weight_jitter, size=(samples, n_crit))
+    v = base[None, :, :] + rng.uniform(-value_jitter, value_jitter, size=(samples, n, n_crit))
+    np.clip(v, lo, hi, out=v)
+
+    # Normalization is per-sample (max_raw moves with the weights); it can't change the
+    # winner, but keeps scores comparable to weighted_score() for debugging.
+    scores = np.einsum("snm,sm->sn", v, w) / (w @ hi)[:, None]
+
+    top = scores.max(axis=1, keepdims=True)
+    is_top = scores >= top - 1e-12
+    share = is_top / is_top.sum(axis=1, keepdims=True)
+    return share.sum(axis=0) / samples
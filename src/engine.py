@@ -0,0 +1,352 @@
+# src/engine.py
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, List, Mapping
+
+from boundaries import NO_FAILURE, check_batch, first_failure_key, mask_to_checks
+from criteria import criteria_matrix, weighted_scores
+from models import Decision, Limits, OptionInput
+
+# Pure evaluation logic (no Streamlit imports) so it can be reused outside the UI.
+
+
+@dataclass
+class OptionEval:
+    key: str
+    name: str
+    fail_mask: int = 0
+    first_fail: int = NO_FAILURE
+    score: float = 0.0
+
+    @property
+    def passed(self) -> bool:
+        return self.fail_mask == 0
+
+    @property
+    def checks(self) -> Dict[str, bool]:
+        return mask_to_checks(self.fail_mask)
+
+    @property
+    def first_failure_key(self) -> str | None:
+        return first_failure_key(self.first_fail)
+
+
+@dataclass(frozen=True)
+class Verdict:
+    """
+    status:
+      - "none_fit": no option passes the boundary check
+      - "one_fits": exactly one option passes
+      - "winner":   several pass, one scores highest
+      - "tie":      several pass, top score is shared
+    """
+    status: str
+    keys: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class CompareResult:
+    """
+    Immutable copy of a Board's state (safe to share between sessions via ResultCache).
+    """
+    evals: tuple[OptionEval, ...]
+    ranking: tuple[OptionEval, ...]
+    verdict: Verdict
+
+    def get(self, key: str) -> OptionEval:
+        for ev in self.evals:
+            if ev.key == key:
+                return ev
+        raise KeyError(key)
+
+
+def _limits_fingerprint(limits: Limits) -> tuple:
+    return (
+        int(limits.money_max_usd),
+        int(limits.time_hours_per_week),
+        limits.stress,
+        limits.relationships,
+    )
+
+
+def _boundary_fingerprint(opt: OptionInput) -> tuple:
+    return (
+        int(opt.money_at_risk_usd),
+        int(opt.time_required_hours_per_week),
+        opt.stress_fit,
+        opt.relationships_impact,
+    )
+
+
+def _criteria_fingerprint(opt: OptionInput) -> tuple:
+    return tuple(sorted((opt.criteria or {}).items()))
+
+
+class Board:
+    """
+    Incrementally maintained evaluation of one decision's options.
+
+    sync() only re-checks options whose boundary inputs changed (or all of them if the
+    limits changed), and only re-scores options whose criteria changed (or all of them
+    if the category changed). The ranked surviving set is rebuilt only when something moved.
+    """
+
+    def __init__(self) -> None:
+        self._limits_fp: tuple | None = None
+        self._category: str | None = None
+        self._boundary_fps: Dict[str, tuple] = {}
+        self._criteria_fps: Dict[str, tuple] = {}
+        self._evals: Dict[str, OptionEval] = {}
+        self._order: List[str] = []
+        self._ranking: List[OptionEval] = []
+        self._stamp: tuple | None = None
+
+    def sync(self, decision: Decision, options: Mapping[str, OptionInput]) -> "Board":
+        # Nothing was assigned since the last sync (see models.Tracked): skip all work
+        stamp = (decision.revision, tuple((k, o.version) for k, o in options.items()))
+        if stamp == self._stamp:
+            return self
+        self._stamp = stamp
+
+        limits = decision.limits
+        category = decision.category or "Personal"
+
+        limits_fp = _limits_fingerprint(limits)
+        recheck_all = limits_fp != self._limits_fp
+        rescore_all = category != self._category
+        order = list(options.keys())
+        changed = recheck_all or rescore_all or order != self._order
+
+        for gone in set(self._evals) - set(options):
+            self._evals.pop(gone, None)
+            self._boundary_fps.pop(gone, None)
+            self._criteria_fps.pop(gone, None)
+
+        to_check: List[str] = []
+        to_score: List[str] = []
+        for key, opt in options.items():
+            ev = self._evals.get(key)
+            if ev is None:
+                ev = self._evals[key] = OptionEval(key=key, name=opt.name)
+            if ev.name != opt.name:
+                ev.name = opt.name
+                changed = True
+
+            b_fp = _boundary_fingerprint(opt)
+            if recheck_all or self._boundary_fps.get(key) != b_fp:
+                self._boundary_fps[key] = b_fp
+                to_check.append(key)
+
+            c_fp = _criteria_fingerprint(opt)
+            if rescore_all or self._criteria_fps.get(key) != c_fp:
+                self._criteria_fps[key] = c_fp
+                to_score.append(key)
+
+        if to_check:
+            res = check_batch(limits, [options[k] for k in to_check])
+            for i, key in enumerate(to_check):
+                self._evals[key].fail_mask = int(res.fail_mask[i])
+                self._evals[key].first_fail = int(res.first_fail[i])
+
+        if to_score:
+            scores = weighted_scores(
+                category, criteria_matrix(category, [options[k].criteria or {} for k in to_score])
+            )
+            for i, key in enumerate(to_score):
+                self._evals[key].score = float(scores[i])
+
+        self._limits_fp = limits_fp
+        self._category = category
+        self._order = order
+
+        if changed or to_check or to_score:
+            self._rerank()
+        return self
+
+    def _rerank(self) -> None:
+        pos = {k: i for i, k in enumerate(self._order)}
+        survivors = [self._evals[k] for k in self._order if self._evals[k].passed]
+        self._ranking = sorted(survivors, key=lambda e: (-e.score, pos[e.key]))
+
+    def get(self, key: str) -> OptionEval:
+        return self._evals[key]
+
+    def evals(self) -> List[OptionEval]:
+        """All options, in decision order."""
+        return [self._evals[k] for k in self._order]
+
+    def ranking(self) -> List[OptionEval]:
+        """Options that fit every boundary, best score first (ties keep decision order)."""
+        return list(self._ranking)
+
+    def verdict(self) -> Verdict:
+        ranked = self._ranking
+        if not ranked:
+            return Verdict("none_fit")
+        if len(ranked) == 1:
+            return Verdict("one_fits", (ranked[0].key,))
+        top = ranked[0].score
+        leaders = tuple(e.key for e in ranked if e.score == top)
+        if len(leaders) > 1:
+            return Verdict("tie", leaders)
+        return Verdict("winner", leaders)
+
+    def result(self) -> CompareResult:
+        copies = {k: replace(self._evals[k]) for k in self._order}
+        return CompareResult(
+            evals=tuple(copies[k] for k in self._order),
+            ranking=tuple(copies[e.key] for e in self._ranking),
+            verdict=self.verdict(),
+        )
+
+    def to_dict(self) -> dict:
+        """
+        JSON-safe summary (used by headless tooling).
+        """
+        verdict = self.verdict()
+        return {
+            "options": [
+                {
+                    "key": ev.key,
+                    "name": ev.name,
+                    "passed": ev.passed,
+                    "checks": ev.checks,
+                    "first_failure": ev.first_failure_key,
+                    "score": round(ev.score, 4),
+                }
+                for ev in self.evals()
+            ],
+            "ranking": [ev.key for ev in self._ranking],
+            "verdict": {"status": verdict.status, "keys": list(verdict.keys)},
+        }
+
+
+# -----------------------------
+# Result memoization
+# -----------------------------
+def decision_key(decision: Decision, options: Mapping[str, OptionInput]) -> str:
+    """
+    Stable content hash of everything that affects a compare result
+    (category, enforced limits, option names/keys/boundary inputs/criteria).
+    Titles, summaries and save timestamps are deliberately left out.
+    """
+    lim = decision.limits
+    norm = {
+        "category": decision.category or "Personal",
+        "limits": [
+            int(lim.money_max_usd),
+            int(lim.time_hours_per_week),
+            lim.stress.value,
+            lim.relationships.value,
+        ],
+        "options": [
+            [
+                key,
+                opt.name,
+                int(opt.money_at_risk_usd),
+                int(opt.time_required_hours_per_week),
+                opt.stress_fit.value,
+                opt.relationships_impact.value,
+                sorted((str(k), int(v)) for k, v in (opt.criteria or {}).items()),
+            ]
+            for key, opt in options.items()
+        ],
+    }
+    raw = json.dumps(norm, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class ResultCache:
+    """
+    Thread-safe bounded LRU with hit/miss counters.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+
+        value = compute()
+
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / total) if total else 0.0,
+            }
+
+
+# Process-wide cache shared by every session (identical decisions evaluate once)
+SHARED_RESULTS = ResultCache(maxsize=2048)
+
+
+def evaluate(decision: Decision, options: Mapping[str, OptionInput]) -> dict:
+    """
+    One-shot evaluation of a decision (boundary check + scores + verdict).
+    """
+    out = Board().sync(decision, options).to_dict()
+    out["title"] = decision.title
+    out["category"] = decision.category or "Personal"
+    return out
+
+
+def check(decision: Decision, options: Mapping[str, OptionInput]) -> dict:
+    """
+    Boundary check only (no scoring).
+    """
+    keys = list(options.keys())
+    res = check_batch(decision.limits, [options[k] for k in keys])
+    return {
+        "options": [
+            {
+                "key": key,
+                "name": options[key].name,
+                "passed": bool(res.passed[i]),
+                "checks": mask_to_checks(res.fail_mask[i]),
+                "first_failure": first_failure_key(res.first_fail[i]),
+            }
+            for i, key in enumerate(keys)
+        ],
+    }
+
+
+def score(decision: Decision, options: Mapping[str, OptionInput]) -> dict:
+    """
+    Category scores only (boundaries are ignored).
+    """
+    category = decision.category or "Personal"
+    keys = list(options.keys())
+    scores = weighted_scores(category, criteria_matrix(category, [options[k].criteria or {} for k in keys]))
+    return {
+        "category": category,
+        "options": [
+            {"key": key, "name": options[key].name, "score": round(float(scores[i]), 4)}
+            for i, key in enumerate(keys)
+        ],
+    }
@@ -0,0 +1,267 @@
+# src/export.py
+"""
+Streaming export of the full decision history.
+
+Walks both stores — the storage.py history database and the saved decision files in
+data/saved_decisions/, including every older version of a re-saved decision (see
+versions.py) — one record at a time and yields JSONL or CSV text chunks, so a
+full dump never has to be held in memory.
+
+    python src/export.py -o dump.jsonl
+    python src/export.py --format csv --category Career --from 2025-01-01 --to 2025-12-31 > q.csv
+
+The same generator backs GET /export in service.py.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import json
+import re
+import sys
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator
+
+import saved_store
+import storage
+from snapshots import unwrap_record
+
+FORMATS = ("jsonl", "csv")
+SOURCES = ("history", "saved")
+CHUNK_BYTES = 64 * 1024
+
+# CSV is one row per option (decision columns repeat on every row of the same decision)
+CSV_COLUMNS = [
+    "source",
+    "id",
+    "version",
+    "saved_at",
+    "title",
+    "category",
+    "money_max_usd",
+    "time_hours_per_week",
+    "stress",
+    "relationships",
+    "option_key",
+    "option_name",
+    "money_at_risk_usd",
+    "time_required_hours_per_week",
+    "stress_fit",
+    "relationships_impact",
+    "summary",
+    "criteria",
+]
+
+_COMPACT_TS = re.compile(r"^(\d{4})(\d{2})(\d{2})_")
+_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+@dataclass(frozen=True)
+class ExportFilter:
+    """
+    categories: case-insensitive category names (empty = all).
+    date_from / date_to: inclusive "YYYY-MM-DD" bounds on saved_at (None = open).
+    """
+    categories: frozenset[str] = frozenset()
+    date_from: str | None = None
+    date_to: str | None = None
+    sources: tuple[str, ...] = SOURCES
+
+    @classmethod
+    def build(
+        cls,
+        categories: Iterable[str] = (),
+        date_from: str | None = None,
+        date_to: str | None = None,
+        sources: Iterable[str] = SOURCES,
+    ) -> "ExportFilter":
+        for label, d in (("from", date_from), ("to", date_to)):
+            if d and not _DATE.match(d):
+                raise ValueError(f"Invalid '{label}' date '{d}' (expected YYYY-MM-DD).")
+        srcs = tuple(s for s in sources if s)
+        unknown = set(srcs) - set(SOURCES)
+        if unknown:
+            raise ValueError(f"Unknown source(s): {', '.join(sorted(unknown))}.")
+        return cls(
+            categories=frozenset(c.strip().lower() for c in categories if c and c.strip()),
+            date_from=date_from or None,
+            date_to=date_to or None,
+            sources=srcs or SOURCES,
+        )
+
+    def matches(self, category: str, saved_at: str) -> bool:
+        if self.categories and (category or "").strip().lower() not in self.categories:
+            return False
+        if self.date_from or self.date_to:
+            day = date_of(saved_at)
+            if not day:
+                return False
+            if self.date_from and day < self.date_from:
+                return False
+            if self.date_to and day > self.date_to:
+                return False
+        return True
+
+
+def date_of(saved_at: str) -> str:
+    """
+    "YYYY-MM-DD" for ISO timestamps and compact file-id stamps ("20250131_101500").
+    """
+    s = (saved_at or "").strip()
+    m = _COMPACT_TS.match(s)
+    if m:
+        return "-".join(m.groups())
+    return s[:10] if _DATE.match(s[:10]) else ""
+
+
+def _category(snap: Any) -> str:
+    dec = snap.get("decision") if isinstance(snap, dict) else None
+    return str((dec or {}).get("category", "")) if isinstance(dec, dict) else ""
+
+
+# -----------------------------
+# Record stream
+# -----------------------------
+def iter_records(flt: ExportFilter = ExportFilter()) -> Iterator[dict[str, Any]]:
+    """
+    Yields {"source", "id", "saved_at", "snapshot"} for every matching record,
+    history first (oldest first), then saved files (newest first). Saved records also carry
+    "version": every version of a re-saved decision is exported, newest first, under the
+    file_id of its current head.
+    """
+    if "history" in flt.sources:
+        for rec in storage.iter_saved():
+            snap = unwrap_record(rec)
+            saved_at = str(rec.get("saved_at", ""))
+            if isinstance(snap, dict) and flt.matches(_category(snap), saved_at):
+                yield {"source": "history", "id": str(rec.get("id", "")), "saved_at": saved_at, "snapshot": snap}
+
+    if "saved" in flt.sources:
+        # metadata comes from the index, so filtered-out files are never opened (except chain
+        # heads: their older versions carry their own category and date)
+        for meta in saved_store.list_saved_snapshots():
+            if meta.get("versions", 1) == 1 and not flt.matches(meta["category"], meta["saved_at"]):
+                continue
+            try:
+                for v, snap in saved_store.iter_versions(meta["file_id"]):
+                    saved_at = str(snap.get("saved_at", "")) or meta["saved_at"]
+                    if flt.matches(_category(snap), saved_at):
+                        yield {"source": "saved", "id": meta["file_id"], "version": v, "saved_at": saved_at, "snapshot": snap}
+            except Exception:
+                # deleted or corrupt since the index was read: skip it
+                continue
+
+
+# -----------------------------
+# Formatting
+# -----------------------------
+def _csv_rows(rec: dict[str, Any]) -> Iterator[list[Any]]:
+    snap = rec["snapshot"]
+    dec = snap.get("decision") if isinstance(snap.get("decision"), dict) else {}
+    lim = dec.get("limits") if isinstance(dec.get("limits"), dict) else {}
+    head = [
+        rec["source"],
+        rec["id"],
+        rec.get("version", ""),
+        rec["saved_at"],
+        dec.get("title", ""),
+        dec.get("category", ""),
+        lim.get("money_max_usd", ""),
+        lim.get("time_hours_per_week", ""),
+        lim.get("stress", ""),
+        lim.get("relationships", ""),
+    ]
+    opts = snap.get("options") if isinstance(snap.get("options"), dict) else {}
+    if not opts:
+        yield head + [""] * (len(CSV_COLUMNS) - len(head))
+        return
+    for key, o in opts.items():
+        o = o if isinstance(o, dict) else {}
+        yield head + [
+            key,
+            o.get("name", ""),
+            o.get("money_at_risk_usd", ""),
+            o.get("time_required_hours_per_week", ""),
+            o.get("stress_fit", ""),
+            o.get("relationships_impact", ""),
+            o.get("summary", ""),
+            json.dumps(o.get("criteria") or {}, ensure_ascii=False, sort_keys=True),
+        ]
+
+
+def iter_lines(fmt: str, records: Iterable[dict[str, Any]]) -> Iterator[str]:
+    if fmt == "jsonl":
+        for rec in records:
+            yield json.dumps(rec, ensure_ascii=False) + "\n"
+        return
+    if fmt != "csv":
+        raise ValueError(f"Unknown format '{fmt}' (expected one of {', '.join(FORMATS)}).")
+
+    buf = io.StringIO()
+    w = csv.writer(buf, lineterminator="\n")
+    w.writerow(CSV_COLUMNS)
+    for rec in records:
+        for row in _csv_rows(rec):
+            w.writerow(row)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+
+def iter_export(fmt: str = "jsonl", flt: ExportFilter = ExportFilter(), chunk_bytes: int = CHUNK_BYTES) -> Iterator[bytes]:
+    """
+    UTF-8 chunks of roughly chunk_bytes each (fewer writes than one per record).
+    """
+    pending: list[str] = []
+    size = 0
+    for line in iter_lines(fmt, iter_records(flt)):
+        pending.append(line)
+        size += len(line)
+        if size >= chunk_bytes:
+            yield "".join(pending).encode("utf-8")
+            pending, size = [], 0
+    if pending:
+        yield "".join(pending).encode("utf-8")
+
+
+def content_type(fmt: str) -> str:
+    return "text/csv; charset=utf-8" if fmt == "csv" else "application/x-ndjson; charset=utf-8"
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(
+        description="Stream every saved decision (all versions of re-saved ones) as JSONL or CSV."
+    )
+    ap.add_argument("--format", choices=FORMATS, default="jsonl")
+    ap.add_argument("--category", action="append", default=[], help="repeatable; case-insensitive")
+    ap.add_argument("--from", dest="date_from", help="YYYY-MM-DD (inclusive)")
+    ap.add_argument("--to", dest="date_to", help="YYYY-MM-DD (inclusive)")
+    ap.add_argument("--source", action="append", choices=SOURCES, help="default: both")
+    ap.add_argument("-o", "--output", help="write here instead of stdout")
+    args = ap.parse_args(argv)
+
+    try:
+        flt = ExportFilter.build(args.category, args.date_from, args.date_to, args.source or SOURCES)
+    except ValueError as e:
+        ap.error(str(e))
+
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for chunk in iter_export(args.format, flt):
+            out.write(chunk)
+    finally:
+        if args.output:
+            out.close()
+        else:
+            out.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,435 @@
+# src/loadtest.py
+"""
+Headless load test: many concurrent simulated users driving the real screens through
+streamlit.testing AppTest (no browser, no server, no network).
+
+Each user is one AppTest session walking journeys picked from a weighted mix. Every
+interaction (a page switch, a widget change, a click) is one full rerun of app.py and is
+timed against the screen it landed on. The report gives p50/p95/p99 rerun latency per
+screen, throughput, and RSS growth (Linux /proc).
+
+AppTest swaps a process-global Runtime for each run, so two reruns can't overlap in one
+process. Users are therefore spread over worker processes (-j) that run in parallel; inside a
+worker, each user has its own thread and session and their reruns take turns. All sessions
+stay alive for the whole run, so RSS reflects the memory many open sessions hold.
+
+    python src/loadtest.py                                  # 8 users x 3 journeys
+    python src/loadtest.py -u 32 -j 4 -n 5 --mix full=2,browse=1,editor=1
+    python src/loadtest.py -u 16 --json > loadtest.json
+
+Journeys:
+    full    Home -> Category -> Limits -> Options -> Compare -> Past Decisions (save + search)
+    browse  Home -> Past Decisions (search) -> Analytics
+    editor  Options: repeated slider/name edits, add an option, undo/redo
+
+Saves, autosaves and indexes go to a throwaway data dir unless --data-dir is given
+(see _redirect_data).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+APP_PATH = Path(__file__).resolve().with_name("app.py")
+
+DEFAULT_MIX = "full=3,browse=1,editor=1"
+PERCENTILES = (50, 95, 99)
+RERUN_TIMEOUT = 60.0
+
+SEARCH_TERMS = ("job", "move", "offer", "career", "option")
+
+# one AppTest run at a time per process (see module docstring)
+_RERUN_LOCK = threading.Lock()
+
+
+# -----------------------------
+# Environment
+# -----------------------------
+def _init_worker(root: Path) -> None:
+    # per-rerun Streamlit warnings (bare-mode context, deprecations) would drown the report;
+    # AppTest resets Streamlit's logger levels on every run, so mute at the logging module
+    logging.disable(logging.WARNING)
+    _redirect_data(root)
+
+
+def _redirect_data(root: Path) -> None:
+    """
+    Points every on-disk store at root, so a run never touches the real data/ dir.
+    Mirrors the paths in saved_store/storage/search/analytics/versions.
+    """
+    import analytics
+    import saved_store
+    import search
+    import storage
+    import versions
+
+    root.mkdir(parents=True, exist_ok=True)
+    saved_store.SAVE_DIR = root / "saved_decisions"
+    saved_store.INDEX_PATH = root / "saved_decisions.index.jsonl"
+    saved_store.DRAFT_DIR = root / "drafts"
+    storage._db_path = lambda: root / "decisions.sqlite3"
+    search._db_path = lambda: root / "search.sqlite3"
+    analytics._cache_path = lambda: root / "analytics.npz"
+    versions.versions_dir = lambda: root / "saved_versions"
+
+
+def rss_kb() -> dict[str, int]:
+    """
+    Current (VmRSS) and peak (VmHWM) resident set size in KiB; empty where /proc is missing.
+    """
+    out: dict[str, int] = {}
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith(("VmRSS:", "VmHWM:")):
+                    name, value = line.split(":", 1)
+                    out[name] = int(value.split()[0])
+    except OSError:
+        pass
+    return out
+
+
+# -----------------------------
+# Simulated user
+# -----------------------------
+class User:
+    """
+    One browser session. Every step() is one timed rerun, recorded against the page the
+    app ended up on.
+    """
+
+    def __init__(self, rng: random.Random, record: Callable[[str, float], None]) -> None:
+        from streamlit.testing.v1 import AppTest
+
+        self.rng = rng
+        self._record = record
+        self.at = AppTest.from_file(str(APP_PATH), default_timeout=RERUN_TIMEOUT)
+        self.step(self.at.run)
+
+    @property
+    def page(self) -> str:
+        return self.at.session_state["page"] if "page" in self.at.session_state else "Home"
+
+    def step(self, action: Callable[[], object]) -> None:
+        with _RERUN_LOCK:
+            t = time.perf_counter()
+            action()
+            elapsed = time.perf_counter() - t
+        if self.at.exception:
+            raise RuntimeError(f"{self.page}: {self.at.exception[0].message}")
+        self._record(self.page, elapsed)
+
+    def goto(self, page: str) -> None:
+        self.at.session_state["page"] = page
+        self.step(self.at.run)
+
+    def widget(self, kind: str, key: str | None = None, label: str | None = None):
+        widgets = getattr(self.at, kind)
+        if key is not None:
+            return widgets(key=key)
+        return next(w for w in widgets if w.label == label)
+
+    # ---- interactions (each one rerun) ----
+    def set_value(self, kind: str, value: object, *, key: str | None = None, label: str | None = None) -> None:
+        self.step(lambda: self.widget(kind, key, label).set_value(value).run())
+
+    def click(self, *, key: str | None = None, label: str | None = None) -> None:
+        self.step(lambda: self.widget("button", key, label).click().run())
+
+    def type(self, text: str, *, key: str | None = None, label: str | None = None) -> None:
+        self.step(lambda: self.widget("text_input", key, label).input(text).run())
+
+
+# -----------------------------
+# Journeys
+# -----------------------------
+def journey_full(u: User) -> None:
+    from models import DEFAULT_CATEGORIES
+
+    u.goto("Home")
+    u.goto("Category")
+    u.type(f"Load test decision {u.rng.randrange(1000)}", label="Decision title")
+    u.set_value("radio", u.rng.choice(DEFAULT_CATEGORIES), label="Decision type")
+
+    u.goto("Limits")
+    u.set_value("slider", u.rng.choice([500, 1000, 2000, 5000]), key="lim_money")
+    u.set_value("slider", u.rng.randrange(5, 30), key="lim_time")
+    u.set_value("checkbox", True, key="lim_confirmed")
+
+    u.goto("Options")
+    for key in ("opt_a", "opt_b"):
+        u.type(f"{key.upper()} {u.rng.choice(SEARCH_TERMS)}", key=f"{key}_name")
+        u.set_value("slider", u.rng.choice([250, 1000, 3000]), key=f"{key}_money")
+
+    u.goto("Compare")
+    u.goto("Past Decisions")
+    u.click(key="past_save")
+    u.type(u.rng.choice(SEARCH_TERMS), key="past_query")
+
+
+def journey_browse(u: User) -> None:
+    u.goto("Home")
+    u.goto("Past Decisions")
+    u.type(u.rng.choice(SEARCH_TERMS), key="past_query")
+    u.type("", key="past_query")
+    u.goto("Analytics")
+
+
+def journey_editor(u: User) -> None:
+    u.goto("Options")
+    for _ in range(6):
+        key = u.rng.choice(list(u.at.session_state["options"]))
+        u.set_value("slider", u.rng.choice([250, 500, 1000, 3000, 8000]), key=f"{key}_money")
+    if len(u.at.session_state["options"]) < 4:
+        u.click(label="+ Add another option")
+    u.type(f"Renamed {u.rng.randrange(100)}", key="opt_a_name")
+    u.click(key="nav_undo")
+    u.click(key="nav_undo")
+    u.click(key="nav_redo")
+
+
+JOURNEYS: dict[str, Callable[[User], None]] = {
+    "full": journey_full,
+    "browse": journey_browse,
+    "editor": journey_editor,
+}
+
+
+def parse_mix(spec: str) -> dict[str, float]:
+    """
+    "full=3,browse=1" -> {"full": 3.0, "browse": 1.0} (weights, not percentages).
+    """
+    mix: dict[str, float] = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in JOURNEYS:
+            raise ValueError(f"Unknown journey '{name}'. Must be one of: {list(JOURNEYS)}")
+        mix[name] = float(weight) if weight else 1.0
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("The journey mix needs at least one positive weight.")
+    return mix
+
+
+# -----------------------------
+# Runner
+# -----------------------------
+class _Recorder:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.samples: dict[str, list[float]] = defaultdict(list)
+        self.journeys: dict[str, int] = defaultdict(int)
+        self.errors: list[str] = []
+
+    def rerun(self, page: str, seconds: float) -> None:
+        with self._lock:
+            self.samples[page].append(seconds)
+
+    def journey(self, name: str) -> None:
+        with self._lock:
+            self.journeys[name] += 1
+
+    def error(self, message: str) -> None:
+        with self._lock:
+            self.errors.append(message)
+
+
+def _run_user(i: int, mix: dict[str, float], journeys: int, seed: int, rec: _Recorder) -> None:
+    rng = random.Random(seed * 100_003 + i)
+    try:
+        u = User(rng, rec.rerun)
+    except Exception as e:
+        rec.error(f"user {i}: start: {e}")
+        return
+    names, weights = list(mix), list(mix.values())
+    for _ in range(journeys):
+        name = rng.choices(names, weights)[0]
+        try:
+            JOURNEYS[name](u)
+            rec.journey(name)
+        except Exception as e:
+            # a failed journey doesn't end the user; later journeys start from its state
+            rec.error(f"user {i}: {name}: {type(e).__name__}: {e}")
+
+
+def _run_worker(task: tuple[list[int], dict[str, float], int, int]) -> dict:
+    """
+    One worker process: its users' sessions, interleaved (see module docstring).
+    """
+    import state
+    import streamlit.testing.v1  # noqa: F401
+
+    user_ids, mix, journeys, seed = task
+    # baseline after the imports, so growth is what the sessions themselves cost
+    rss_before = rss_kb()
+    rec = _Recorder()
+    with ThreadPoolExecutor(max_workers=len(user_ids), thread_name_prefix="user") as pool:
+        for i in user_ids:
+            pool.submit(_run_user, i, mix, journeys, seed, rec)
+    rss_after = rss_kb()
+
+    # background writers belong to the run: wait for them before reporting
+    state._AUTOSAVER.flush(30)
+    state._SESSIONS.flush(30)
+    return {
+        "samples": dict(rec.samples),
+        "journeys": dict(rec.journeys),
+        "errors": rec.errors,
+        "rss_before": rss_before.get("VmRSS"),
+        "rss_after": rss_after.get("VmRSS"),
+        "rss_peak": rss_after.get("VmHWM"),
+    }
+
+
+def _latency_table(samples: dict[str, list[float]]) -> list[dict]:
+    rows = []
+    for page in sorted(samples):
+        ms = np.asarray(samples[page]) * 1000.0
+        row = {"screen": page, "reruns": int(ms.size)}
+        for p, v in zip(PERCENTILES, np.percentile(ms, PERCENTILES)):
+            row[f"p{p}_ms"] = round(float(v), 1)
+        row["max_ms"] = round(float(ms.max()), 1)
+        rows.append(row)
+    return rows
+
+
+def _sum_rss(results: list[dict], field: str) -> int | None:
+    values = [r[field] for r in results]
+    return None if None in values else sum(values)
+
+
+def run(
+    users: int,
+    journeys: int,
+    mix: dict[str, float],
+    *,
+    workers: int | None = None,
+    seed: int = 0,
+    data_dir: Path | None = None,
+) -> dict:
+    """
+    Runs the load test and returns the report dict (see _print_report for the text rendering).
+    """
+    root = Path(data_dir) if data_dir else Path(tempfile.mkdtemp(prefix="ldt-loadtest-"))
+    workers = max(1, min(users, workers or os.cpu_count() or 1))
+    tasks = [(list(range(w, users, workers)), mix, journeys, seed) for w in range(workers)]
+
+    t0 = time.perf_counter()
+    with Pool(workers, initializer=_init_worker, initargs=(root,)) as pool:
+        results = pool.map(_run_worker, tasks, chunksize=1)
+    wall = time.perf_counter() - t0
+
+    samples: dict[str, list[float]] = defaultdict(list)
+    done: dict[str, int] = defaultdict(int)
+    errors: list[str] = []
+    for r in results:
+        for page, values in r["samples"].items():
+            samples[page].extend(values)
+        for name, n in r["journeys"].items():
+            done[name] += n
+        errors.extend(r["errors"])
+
+    all_ms = np.asarray([s for v in samples.values() for s in v] or [0.0]) * 1000.0
+    n_reruns = sum(len(v) for v in samples.values())
+    before, after = _sum_rss(results, "rss_before"), _sum_rss(results, "rss_after")
+    growth = None if before is None or after is None else after - before
+    return {
+        "users": users,
+        "workers": workers,
+        "journeys_per_user": journeys,
+        "mix": mix,
+        "wall_s": round(wall, 2),
+        "reruns": n_reruns,
+        "reruns_per_s": round(n_reruns / wall, 2),
+        "journeys": dict(done),
+        "journeys_per_s": round(sum(done.values()) / wall, 3),
+        "overall": {f"p{p}_ms": round(float(v), 1) for p, v in zip(PERCENTILES, np.percentile(all_ms, PERCENTILES))},
+        "screens": _latency_table(samples),
+        # summed over worker processes
+        "rss_kb": {
+            "before": before,
+            "after": after,
+            "growth": growth,
+            "peak": _sum_rss(results, "rss_peak"),
+            "per_user": None if growth is None else round(growth / users, 1),
+        },
+        "data_dir": str(root),
+        "errors": errors,
+    }
+
+
+def _print_report(r: dict, out=sys.stdout) -> None:
+    p = lambda *a: print(*a, file=out)  # noqa: E731
+    mix = ", ".join(f"{k}={v:g}" for k, v in r["mix"].items())
+    p(f"{r['users']} users x {r['journeys_per_user']} journeys ({mix}) on {r['workers']} worker(s) in {r['wall_s']} s")
+    p(f"throughput: {r['reruns_per_s']} reruns/s, {r['journeys_per_s']} journeys/s ({r['reruns']} reruns)")
+    overall = r["overall"]
+    p("latency (all): " + ", ".join(f"p{q} {overall[f'p{q}_ms']} ms" for q in PERCENTILES))
+    p("")
+    header = ["screen", "reruns", *(f"p{q}_ms" for q in PERCENTILES), "max_ms"]
+    width = max([len(h) for h in header[:1]] + [len(row["screen"]) for row in r["screens"]])
+    p(f"{header[0]:<{width}}  " + "  ".join(f"{h:>8}" for h in header[1:]))
+    for row in r["screens"]:
+        p(f"{row['screen']:<{width}}  " + "  ".join(f"{row[h]:>8}" for h in header[1:]))
+    p("")
+    rss = r["rss_kb"]
+    if rss["after"] is not None:
+        p(
+            f"RSS (all workers): {rss['before'] / 1024:.1f} -> {rss['after'] / 1024:.1f} MiB "
+            f"(+{rss['growth'] / 1024:.1f} MiB, {rss['per_user']:.0f} KiB/user), peak {rss['peak'] / 1024:.1f} MiB"
+        )
+    else:
+        p("RSS: unavailable (no /proc)")
+    if r["errors"]:
+        p(f"\n{len(r['errors'])} error(s):")
+        for e in r["errors"][:20]:
+            p(f"  {e}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Concurrent-session load test over the real screens (headless).")
+    ap.add_argument("-u", "--users", type=int, default=8, help="Concurrent simulated users.")
+    ap.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1, help="Worker processes.")
+    ap.add_argument("-n", "--journeys", type=int, default=3, help="Journeys per user.")
+    ap.add_argument("--mix", default=DEFAULT_MIX, help=f"Weighted journey mix (default: {DEFAULT_MIX}).")
+    ap.add_argument("--seed", type=int, default=0, help="Random seed (runs are repeatable per seed).")
+    ap.add_argument("--data-dir", help="Keep the run's saves here instead of a temp dir.")
+    ap.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = ap.parse_args(argv)
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        ap.error(str(e))
+
+    report = run(
+        max(1, args.users),
+        max(1, args.journeys),
+        mix,
+        workers=args.workers,
+        seed=args.seed,
+        data_dir=args.data_dir,
+    )
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report)
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
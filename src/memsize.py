@@ -0,0 +1,75 @@
+# src/memsize.py
+"""
+Deep memory accounting for per-session state (no Streamlit import).
+
+deep_sizeof() follows containers, __dict__ and __slots__ and counts each object once per
+`seen` set, so sharing between keys is attributed to whichever key reaches it first.
+Process-wide singletons (None/bools/small ints, enum members, classes, functions, modules)
+are not counted.
+"""
+from __future__ import annotations
+
+import sys
+import types
+from enum import Enum
+from typing import Any, Iterable, Mapping
+
+import numpy as np
+
+_SKIP = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType, Enum)
+
+
+def _slot_names(cls: type) -> Iterable[str]:
+    for klass in cls.__mro__:
+        slots = klass.__dict__.get("__slots__", ())
+        yield from (slots,) if isinstance(slots, str) else slots
+
+
+def deep_sizeof(obj: Any, seen: set[int] | None = None) -> int:
+    """
+    Approximate bytes reachable from obj (iterative, so deep structures don't recurse).
+    """
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if o is None or isinstance(o, (bool, _SKIP)) or id(o) in seen:
+            continue
+        if type(o) is int and -5 <= o <= 256:
+            continue
+        seen.add(id(o))
+        total += sys.getsizeof(o)
+
+        if isinstance(o, np.ndarray):
+            # getsizeof already includes the buffer when the array owns it
+            if o.base is not None:
+                stack.append(o.base)
+        elif isinstance(o, (str, bytes, bytearray, int, float, complex)):
+            pass
+        elif isinstance(o, (dict, types.MappingProxyType)):
+            for k, v in o.items():
+                stack.append(k)
+                stack.append(v)
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+        else:
+            d = getattr(o, "__dict__", None)
+            if d is not None:
+                stack.append(d)
+            for name in _slot_names(type(o)):
+                if name not in ("__dict__", "__weakref__"):
+                    stack.append(getattr(o, name, None))
+    return total
+
+
+def breakdown(items: Mapping[str, Any]) -> list[dict[str, Any]]:
+    """
+    [{"key", "bytes"}] per top-level entry, largest first. An object shared between entries
+    is counted once, under the first key (in sorted order) that reaches it, so the rows sum
+    to the total.
+    """
+    seen: set[int] = set()
+    rows = [{"key": str(k), "bytes": deep_sizeof(items[k], seen)} for k in sorted(items, key=str)]
+    rows.sort(key=lambda r: r["bytes"], reverse=True)
+    return rows
@@ -1,9 +1,10 @@
 # src/models.py
 from __future__ import annotations
 
+import itertools
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Dict, List
+from typing import Any, Dict, List
 
 
 class Risk(Enum):
@@ -12,8 +13,51 @@ class Risk(Enum):
     HIGH = "High"
 
 
-@dataclass
-class Limits:
+# Small-int encoding used for ordering comparisons (and by the columnar engine in boundaries.py)
+RISK_LEVEL: Dict[Risk, int] = {Risk.LOW: 0, Risk.MEDIUM: 1, Risk.HIGH: 2}
+
+
+# -----------------------------
+# Change tracking
+# -----------------------------
+# One process-wide counter: every change gets a stamp larger than any stamp handed out
+# before it, so max() over a set of objects' versions is itself a valid change detector.
+_version_counter = itertools.count(1)
+_MISSING = object()
+
+
+def next_version() -> int:
+    return next(_version_counter)
+
+
+class Tracked:
+    """
+    Dataclass mixin: assigning a field a *different* value bumps `version`.
+    Re-assigning an equal value (what every Streamlit rerun does) does not.
+
+    In-place mutation (e.g. opt.criteria["x"] = 3) is not seen; assign a new dict instead.
+
+    Models are slotted (no per-instance __dict__): every session holds a full set of them.
+    """
+
+    __slots__ = ("_version",)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_version", next_version())
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        old = getattr(self, name, _MISSING)
+        object.__setattr__(self, name, value)
+        if old is _MISSING or old != value:
+            object.__setattr__(self, "_version", next_version())
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+
+@dataclass(slots=True)
+class Limits(Tracked):
     # Locked user-facing limits (STRICT-4)
     money_max_usd: int = 1000
     time_hours_per_week: int = 10
@@ -27,15 +71,20 @@ class Limits:
     confirmed: bool = False
 
 
-@dataclass
-class Decision:
+@dataclass(slots=True)
+class Decision(Tracked):
     title: str = ""
     category: str = ""
     limits: Limits = field(default_factory=Limits)
 
+    @property
+    def revision(self) -> int:
+        """Latest change stamp across the decision and its limits."""
+        return max(self.version, self.limits.version)
+
 
-@dataclass
-class OptionInput:
+@dataclass(slots=True)
+class OptionInput(Tracked):
     name: str
 
     # HARD guardrail inputs (compared against Limits) (STRICT-4)
@@ -66,21 +115,43 @@ def check_limits(limits: Limits, opt: OptionInput) -> Dict[str, bool]:
       - Relationships (Low/Med/High)
 
     Legacy fields (reversibility/dependency) are intentionally NOT enforced yet.
-    """
-    order = {Risk.LOW: 0, Risk.MEDIUM: 1, Risk.HIGH: 2}
-
-    def ok(tolerance: Risk, actual: Risk) -> bool:
-        return order[actual] <= order[tolerance]
 
+    For many options at once, use boundaries.check_batch().
+    """
     return {
-        # IMPORTANT: key is "financial" to match Compare UX + CHECK_ORDER
-        "financial": int(opt.money_at_risk_usd) <= int(limits.money_max_usd),
+        # IMPORTANT: keys match Compare UX + CHECK_ORDER (and boundaries.BOUNDARY_KEYS)
+        "money": int(opt.money_at_risk_usd) <= int(limits.money_max_usd),
         "time": int(opt.time_required_hours_per_week) <= int(limits.time_hours_per_week),
-        "stress": ok(limits.stress, opt.stress_fit),
-        "relationships": ok(limits.relationships, opt.relationships_impact),
+        "stress": RISK_LEVEL[opt.stress_fit] <= RISK_LEVEL[limits.stress],
+        "relationships": RISK_LEVEL[opt.relationships_impact] <= RISK_LEVEL[limits.relationships],
     }
 
 
+# -----------------------------
+# Option collections
+# -----------------------------
+MIN_OPTIONS = 2
+MAX_OPTIONS = 20
+
+# Stable option keys ("opt_a", "opt_b", ...) — also used as widget key prefixes
+OPTION_KEYS: List[str] = [f"opt_{c}" for c in "abcdefghijklmnopqrstuvwxyz"[:MAX_OPTIONS]]
+
+
+def default_option_name(key: str) -> str:
+    return f"Option {key.rsplit('_', 1)[-1].upper()}"
+
+
+def next_option_key(options: Dict[str, OptionInput]) -> str | None:
+    for key in OPTION_KEYS:
+        if key not in options:
+            return key
+    return None
+
+
+def default_options() -> Dict[str, OptionInput]:
+    return {key: OptionInput(name=default_option_name(key)) for key in OPTION_KEYS[:MIN_OPTIONS]}
+
+
 DEFAULT_CATEGORIES: List[str] = [
     "Career",
     "Personal",
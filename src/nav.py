@@ -11,8 +11,9 @@ OPTIONS = "Options"
 COMPARE = "Compare"
 PAST = "Past Decisions"
 LOAD = "Load Decision"
+ANALYTICS = "Analytics"
 
-ALL_PAGES = [HOME, CATEGORY, LIMITS, OPTIONS, COMPARE, PAST, LOAD]
+ALL_PAGES = [HOME, CATEGORY, LIMITS, OPTIONS, COMPARE, PAST, LOAD, ANALYTICS]
 
 
 def get_page() -> str:
@@ -0,0 +1,545 @@
+# src/saved_store.py
+from __future__ import annotations
+
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows: in-process locking only
+    fcntl = None
+
+import search
+import versions
+
+# -----------------------------
+# Persistence config
+# -----------------------------
+# Saves will land at: <project_root>/data/saved_decisions/*.json
+# Works locally + Streamlit Community Cloud (note: cloud storage may be ephemeral on redeploy).
+ROOT = Path(__file__).resolve().parents[1]
+SAVE_DIR = ROOT / "data" / "saved_decisions"
+
+# Metadata index (kept OUTSIDE SAVE_DIR so index writes don't touch the directory mtime).
+# Append-only JSONL log of {"op": "snap" | "put" | "del" | "dir", ...} entries:
+#   snap -> items ({file_id: meta}) + dir_mtime_ns; written by compaction, replaces everything before it
+#   put  -> file_id, title, category, saved_at, mtime_ns (+ versions for chain heads, see versions.py)
+#   del  -> file_id
+#   dir  -> mtime_ns of SAVE_DIR the index was last known to match
+# Each process replays only the tail it hasn't seen yet; the log is compacted back to a
+# single "snap" line once the tail outgrows a fraction of the live entry count.
+INDEX_PATH = ROOT / "data" / "saved_decisions.index.jsonl"
+
+# Autosave drafts (one file per editing session) live OUTSIDE SAVE_DIR and are never indexed,
+# so search, analytics and export only ever see decisions the user saved explicitly.
+# Listing them reads names + mtimes only; drafts untouched for DRAFT_TTL_SECONDS are purged.
+DRAFT_DIR = ROOT / "data" / "drafts"
+DRAFT_TTL_SECONDS = 7 * 24 * 3600
+_COMPACT_RATIO = 0.5
+_COMPACT_MIN_LINES = 256
+
+
+def _slug(s: str, *, max_len: int = 40) -> str:
+    s = (s or "").strip().lower()
+    s = re.sub(r"[^a-z0-9]+", "-", s)
+    s = re.sub(r"-+", "-", s).strip("-")
+    return (s[:max_len] or "decision").strip("-") or "decision"
+
+
+def _meta_from_snapshot(snap: Any, file_id: str) -> dict[str, Any]:
+    snap = snap if isinstance(snap, dict) else {}
+    dec = snap.get("decision", {}) if isinstance(snap.get("decision"), dict) else {}
+    return {
+        "title": str(dec.get("title", "")).strip() or "Untitled",
+        "category": str(dec.get("category", "")).strip(),
+        "saved_at": str(snap.get("saved_at", "")).strip() or file_id.split("__")[0],
+        "decision_id": versions.decision_id_of(snap),
+    }
+
+
+# -----------------------------
+# Metadata index
+# -----------------------------
+class _Index:
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.items: dict[str, dict[str, Any]] = {}
+        self.dir_mtime_ns: int | None = None
+        self.offset = 0
+        self.inode: int | None = None
+        self.lines = 0
+        self._sorted: list[dict[str, Any]] | None = None
+
+    # ---- log replay ----
+    def _apply(self, entry: dict[str, Any]) -> None:
+        op = entry.get("op")
+        if op == "snap":
+            items = entry.get("items")
+            self.items = dict(items) if isinstance(items, dict) else {}
+            self.dir_mtime_ns = entry.get("dir_mtime_ns")
+        elif op == "put":
+            fid = str(entry.get("file_id", ""))
+            if fid:
+                self.items[fid] = {
+                    "title": entry.get("title", "Untitled"),
+                    "category": entry.get("category", ""),
+                    "saved_at": entry.get("saved_at", ""),
+                    "mtime_ns": int(entry.get("mtime_ns", 0)),
+                    "versions": int(entry.get("versions", 1)),
+                    "decision_id": entry.get("decision_id"),
+                }
+        elif op == "del":
+            self.items.pop(str(entry.get("file_id", "")), None)
+        elif op == "dir":
+            self.dir_mtime_ns = int(entry.get("mtime_ns", 0))
+        self.lines += 1
+        self._sorted = None
+
+    def refresh_from_log(self) -> None:
+        try:
+            st_ = INDEX_PATH.stat()
+        except FileNotFoundError:
+            self.reset()
+            return
+
+        if st_.st_ino != self.inode or st_.st_size < self.offset:
+            # first read, or the log was compacted/replaced underneath us
+            self.reset()
+            self.inode = st_.st_ino
+
+        if st_.st_size == self.offset:
+            return
+
+        with INDEX_PATH.open("rb") as f:
+            f.seek(self.offset)
+            chunk = f.read()
+
+        # only consume complete lines (another writer may be mid-append)
+        end = chunk.rfind(b"\n") + 1
+        for raw in chunk[:end].splitlines():
+            try:
+                self._apply(json.loads(raw))
+            except Exception:
+                continue
+        self.offset += end
+
+    # ---- log writes ----
+    def append(self, entries: list[dict[str, Any]]) -> None:
+        if not entries:
+            return
+        INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
+        data = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in entries).encode("utf-8")
+        with INDEX_PATH.open("ab") as f:
+            f.write(data)
+        # replay what we just wrote (plus anything another process appended first)
+        self.refresh_from_log()
+        self._maybe_compact()
+
+    def _maybe_compact(self) -> None:
+        if self.lines <= max(_COMPACT_MIN_LINES, _COMPACT_RATIO * len(self.items)):
+            return
+        entry = {"op": "snap", "items": self.items, "dir_mtime_ns": self.dir_mtime_ns}
+        # callers hold _index_locked(); the unique tmp name still keeps two writers apart where
+        # flock is unavailable
+        fd, tmp = tempfile.mkstemp(prefix=INDEX_PATH.name + ".", suffix=".tmp", dir=INDEX_PATH.parent)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(tmp, INDEX_PATH)
+        self.reset()
+        self.refresh_from_log()
+
+    # ---- directory reconciliation ----
+    def reconcile(self, dir_mtime_ns: int) -> None:
+        """
+        Re-syncs with SAVE_DIR after out-of-band changes. Only files that are new or whose
+        mtime differs from the indexed one are opened.
+        """
+        entries: list[dict[str, Any]] = []
+        seen: set[str] = set()
+        with os.scandir(SAVE_DIR) as it:
+            for de in it:
+                if not de.name.endswith(".json") or not de.is_file():
+                    continue
+                seen.add(de.name)
+                mtime_ns = de.stat().st_mtime_ns
+                known = self.items.get(de.name)
+                if known is not None and known.get("mtime_ns") == mtime_ns:
+                    continue
+                try:
+                    raw = Path(de.path).read_text(encoding="utf-8")
+                    snap = json.loads(raw) if raw else {}
+                except Exception:
+                    # Corrupt file? Skip it (don’t brick Past Decisions screen).
+                    continue
+                meta = _meta_from_snapshot(snap, de.name)
+                found = versions.find_chain(de.name, snap)
+                if found is not None:
+                    meta["versions"] = len(found[1]) + 1
+                entries.append({"op": "put", "file_id": de.name, **meta, "mtime_ns": mtime_ns})
+
+        entries.extend({"op": "del", "file_id": fid} for fid in set(self.items) - seen)
+        if entries:
+            # Out-of-band changes: let the search index rebuild itself on next use
+            # (can't index here, search's rebuild reads this index under the same lock)
+            search.mark_stale()
+        entries.append({"op": "dir", "mtime_ns": dir_mtime_ns})
+        self.append(entries)
+
+    def sorted_items(self) -> list[dict[str, Any]]:
+        if self._sorted is None:
+            prefix = str(SAVE_DIR) + os.sep
+            self._sorted = [
+                {
+                    "file_id": fid,
+                    "title": meta["title"],
+                    "category": meta["category"],
+                    "saved_at": meta["saved_at"],
+                    "versions": meta.get("versions", 1),
+                    "path": prefix + fid,
+                }
+                for fid, meta in sorted(self.items.items(), key=lambda kv: kv[0], reverse=True)
+            ]
+        return self._sorted
+
+
+_index = _Index()
+_index_lock = threading.Lock()
+
+
+@contextmanager
+def _index_locked() -> Iterator[None]:
+    """
+    _index_lock plus an exclusive flock on a sidecar file, so appends and compaction in
+    other processes (replicas sharing data/) can't interleave with ours.
+    """
+    with _index_lock:
+        if fcntl is None:
+            yield
+            return
+        INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with INDEX_PATH.with_name(INDEX_PATH.name + ".lock").open("a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _dir_mtime_ns() -> int:
+    return SAVE_DIR.stat().st_mtime_ns
+
+
+def _synced_index() -> _Index:
+    """
+    Caller must hold _index_locked(). Replays unseen log lines, then reconciles with
+    SAVE_DIR only if its mtime moved without a matching "dir" entry.
+    """
+    _index.refresh_from_log()
+    mtime = _dir_mtime_ns()
+    if _index.dir_mtime_ns != mtime:
+        _index.reconcile(mtime)
+    return _index
+
+
+def rebuild_index() -> None:
+    """
+    Drops the metadata index and rebuilds it from SAVE_DIR.
+    """
+    with _index_locked():
+        INDEX_PATH.unlink(missing_ok=True)
+        _index.reset()
+        if SAVE_DIR.exists():
+            _index.reconcile(_dir_mtime_ns())
+
+
+# -----------------------------
+# Saved decisions (disk storage)
+# -----------------------------
+def _unique_file_id(indexed: dict[str, Any], next_n: dict[str, int], ts: str, base: str) -> str:
+    # next_n remembers the next free suffix per base, so a batch of same-titled
+    # snapshots saved within one second doesn't probe 1..n for every file
+    n = next_n.get(base, 1)
+    while True:
+        file_id = f"{ts}__{base}.json" if n == 1 else f"{ts}__{base}-{n}.json"
+        n += 1
+        if file_id not in indexed and not (SAVE_DIR / file_id).exists():
+            next_n[base] = n
+            return file_id
+
+
+def save_snapshot_file(snap: dict, label: str | None = None) -> str:
+    """
+    Writes a snapshot to SAVE_DIR, records it in the index, and returns file_id (filename).
+    """
+    return save_snapshot_files([snap], label=label)[0]
+
+
+def save_snapshot_files(snaps: list[dict], label: str | None = None) -> list[str]:
+    """
+    Writes several snapshots under one index lock with a single index append (bulk import).
+    Returns the file_ids in input order; ids stay unique within the same second.
+    """
+    SAVE_DIR.mkdir(parents=True, exist_ok=True)
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    file_ids: list[str] = []
+    entries: list[dict[str, Any]] = []
+    with _index_locked():
+        idx = _synced_index()
+        next_n: dict[str, int] = {}
+        for snap in snaps:
+            title = ((snap.get("decision") or {}).get("title") or "").strip()
+            file_id = _unique_file_id(idx.items, next_n, ts, _slug(label or title or "decision"))
+            path = SAVE_DIR / file_id
+            path.write_text(json.dumps(snap, indent=2, ensure_ascii=False), encoding="utf-8")
+            meta = _meta_from_snapshot(snap, file_id)
+            entries.append({"op": "put", "file_id": file_id, **meta, "mtime_ns": path.stat().st_mtime_ns})
+            file_ids.append(file_id)
+        if entries:
+            entries.append({"op": "dir", "mtime_ns": _dir_mtime_ns()})
+            idx.append(entries)
+
+    # outside _index_locked(): a first-time search build lists this index
+    search.index_snapshots(
+        "saved", ((fid, snap, e["saved_at"]) for fid, snap, e in zip(file_ids, snaps, entries))
+    )
+    return file_ids
+
+
+def _latest_of_decision(indexed: dict[str, Any], decision_id: str) -> str | None:
+    # file_ids start with a sortable timestamp, so the max is the newest
+    same = [fid for fid, meta in indexed.items() if meta.get("decision_id") == decision_id]
+    return max(same) if same else None
+
+
+def save_version(snap: dict, label: str | None = None) -> str:
+    """
+    Saves snap as the new head of its decision's version chain, keyed by snap["decision_id"]
+    (see versions.py): the previous head is folded into data/saved_versions/ as a reverse
+    delta and its full file is removed. A snapshot without a decision_id is saved as a plain
+    file. Returns the new head's file_id.
+    """
+    did = versions.decision_id_of(snap)
+    if did is None:
+        return save_snapshot_file(snap, label)
+
+    SAVE_DIR.mkdir(parents=True, exist_ok=True)
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    title = ((snap.get("decision") or {}).get("title") or "").strip()
+    slug = _slug(label or title or "decision")
+
+    with _index_locked():
+        idx = _synced_index()
+        chain = versions.read_chain(did)
+        prev_id = versions.chain_head(chain)
+        if prev_id not in idx.items:
+            # head deleted (or never chained): restart from the newest save of this decision
+            if chain:
+                versions.drop_chain(did)
+                chain = []
+            prev_id = _latest_of_decision(idx.items, did)
+
+        file_id = _unique_file_id(idx.items, {}, ts, slug)
+        path = SAVE_DIR / file_id
+        path.write_text(json.dumps(snap, indent=2, ensure_ascii=False), encoding="utf-8")
+
+        entries: list[dict[str, Any]] = []
+        folded = None
+        if prev_id is not None:
+            try:
+                prev = load_snapshot_by_id(prev_id)
+            except (OSError, ValueError):
+                # unreadable previous head: leave it alone and start the chain here
+                prev = None
+            if prev is not None and versions.decision_id_of(prev) == did:
+                versions.append_version(did, chain, prev, file_id, snap)
+                (SAVE_DIR / prev_id).unlink()
+                entries.append({"op": "del", "file_id": prev_id})
+                folded = prev_id
+
+        meta = _meta_from_snapshot(snap, file_id)
+        entries.append(
+            {"op": "put", "file_id": file_id, **meta, "mtime_ns": path.stat().st_mtime_ns, "versions": len(chain) + 1}
+        )
+        entries.append({"op": "dir", "mtime_ns": _dir_mtime_ns()})
+        idx.append(entries)
+
+    # outside _index_locked() (see save_snapshot_files)
+    if folded is not None:
+        search.remove("saved", [folded])
+    search.index_snapshots("saved", [(file_id, snap, meta["saved_at"])])
+    return file_id
+
+
+def iter_versions(file_id: str) -> Iterator[tuple[int, dict]]:
+    """
+    (v, snapshot) for every version of the chain headed by file_id, newest (the head) first.
+    """
+    head = load_snapshot_by_id(file_id)
+    found = versions.find_chain(file_id, head)
+    return versions.walk_back(found[1] if found else [], head)
+
+
+def list_versions(file_id: str) -> list[dict[str, Any]]:
+    """
+    Oldest-first [{"v", "saved_at"}] for the chain headed by file_id
+    (a single entry for files that were never re-saved).
+    """
+    out = [
+        {"v": v, "saved_at": _meta_from_snapshot(snap, file_id)["saved_at"]}
+        for v, snap in iter_versions(file_id)
+    ]
+    return out[::-1]
+
+
+def load_version(file_id: str, v: int) -> dict:
+    """
+    Rebuilds version v of the chain headed by file_id.
+    """
+    head = load_snapshot_by_id(file_id)
+    found = versions.find_chain(file_id, head)
+    return versions.reconstruct(found[1] if found else [], head, int(v))
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    # the tmp name doesn't end in .json, so a crash mid-write leaves nothing reconcile would list
+    tmp = path.with_name(f".{path.name}.tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    dir_fd = os.open(path.parent, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def _check_file_id(file_id: str) -> None:
+    if not file_id.endswith(".json") or Path(file_id).name != file_id:
+        raise ValueError(f"Invalid file_id: {file_id}")
+
+
+def list_saved_snapshots() -> list[dict[str, Any]]:
+    """
+    Returns newest-first list of saved decisions with basic metadata (served from the index).
+    """
+    if not SAVE_DIR.exists():
+        return []
+
+    with _index_locked():
+        return list(_synced_index().sorted_items())
+
+
+def load_snapshot_by_id(file_id: str) -> dict:
+    path = SAVE_DIR / file_id
+    if not path.exists():
+        raise FileNotFoundError(f"Snapshot not found: {file_id}")
+    snap = json.loads(path.read_text(encoding="utf-8"))
+    if not isinstance(snap, dict):
+        raise ValueError("Snapshot file did not contain a JSON object.")
+    return snap
+
+
+def delete_snapshot(file_id: str) -> None:
+    path = SAVE_DIR / file_id
+    if not path.exists():
+        return
+
+    with _index_locked():
+        idx = _synced_index()
+        try:
+            head = load_snapshot_by_id(file_id)
+        except (OSError, ValueError):
+            head = None
+        # deleting a chain head deletes its older versions too
+        found = versions.find_chain(file_id, head)
+        path.unlink()
+        idx.append([{"op": "del", "file_id": file_id}, {"op": "dir", "mtime_ns": _dir_mtime_ns()}])
+        if found is not None:
+            versions.drop_chain(found[0])
+    search.remove("saved", [file_id])
+
+
+# -----------------------------
+# Autosave drafts
+# -----------------------------
+def put_draft(file_id: str, snap: dict) -> None:
+    """
+    Creates or replaces DRAFT_DIR/file_id (autosave). The write is atomic: after a crash the
+    file holds either the previous snapshot or the new one, never a partial one.
+    """
+    _check_file_id(file_id)
+    DRAFT_DIR.mkdir(parents=True, exist_ok=True)
+    _write_atomic(DRAFT_DIR / file_id, json.dumps(snap, indent=2, ensure_ascii=False))
+
+
+def _draft_entries() -> Iterator[tuple[os.DirEntry, float]]:
+    try:
+        it = os.scandir(DRAFT_DIR)
+    except FileNotFoundError:
+        return
+    with it:
+        for de in it:
+            try:
+                yield de, de.stat().st_mtime
+            except FileNotFoundError:
+                # purged or saved by another session meanwhile
+                continue
+
+
+def list_drafts() -> list[dict[str, Any]]:
+    """
+    Returns newest-first [{"file_id", "saved_at"}] of autosave drafts. Only names and mtimes
+    are read, never the files themselves.
+    """
+    items = [
+        (mtime, de.name)
+        for de, mtime in _draft_entries()
+        if de.name.endswith(".json") and not de.name.startswith(".")
+    ]
+    items.sort(reverse=True)
+    return [
+        {"file_id": name, "saved_at": datetime.fromtimestamp(mtime).isoformat(timespec="seconds")}
+        for mtime, name in items
+    ]
+
+
+def load_draft(file_id: str) -> dict:
+    _check_file_id(file_id)
+    path = DRAFT_DIR / file_id
+    if not path.exists():
+        raise FileNotFoundError(f"Draft not found: {file_id}")
+    snap = json.loads(path.read_text(encoding="utf-8"))
+    if not isinstance(snap, dict):
+        raise ValueError("Draft file did not contain a JSON object.")
+    return snap
+
+
+def delete_draft(file_id: str) -> None:
+    _check_file_id(file_id)
+    (DRAFT_DIR / file_id).unlink(missing_ok=True)
+
+
+def purge_drafts(older_than: float = DRAFT_TTL_SECONDS) -> int:
+    """
+    Deletes drafts (and temp files left by a crash mid-write) untouched for older_than seconds.
+    """
+    cutoff = time.time() - older_than
+    n = 0
+    for de, mtime in _draft_entries():
+        if mtime < cutoff:
+            Path(de.path).unlink(missing_ok=True)
+            n += 1
+    return n
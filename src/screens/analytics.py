@@ -0,0 +1,122 @@
+# src/screens/analytics.py
+from __future__ import annotations
+
+import streamlit as st
+
+import nav
+import state
+from analytics import SCORE_BINS
+from screens.compare import CHECK_ORDER
+
+# Time window choices -> days (None = everything)
+WINDOWS: dict[str, int | None] = {
+    "Last 30 days": 30,
+    "Last 90 days": 90,
+    "Last year": 365,
+    "All time": None,
+}
+
+
+def _pct(x: float) -> str:
+    return f"{x * 100:.0f}%"
+
+
+def _render_categories(summary: dict) -> None:
+    st.markdown("### By category")
+    rows = summary["by_category"]
+    st.dataframe(
+        [
+            {
+                "Category": r["category"],
+                "Decisions": r["decisions"],
+                "Options": r["options"],
+                "Options passing": _pct(r["pass_rate"]),
+                "Decisions with a fit": _pct(r["decisions_with_fit"]),
+                "Median score": round(r["score_median"], 1),
+                "Score IQR": f"{r['score_p25']:.0f}–{r['score_p75']:.0f}",
+            }
+            for r in rows
+        ],
+        hide_index=True,
+        use_container_width=True,
+    )
+
+    st.markdown("#### Score distribution")
+    step = 100 // SCORE_BINS
+    buckets = [f"{i * step:02d}–{(i + 1) * step}" for i in range(SCORE_BINS)]
+    chart = {"Score": buckets}
+    for r in rows:
+        chart[r["category"]] = r["score_histogram"]
+    st.bar_chart(chart, x="Score", y=[r["category"] for r in rows], stack=True)
+
+
+def _render_eliminations(summary: dict) -> None:
+    st.markdown("### What eliminates options")
+    st.markdown(
+        "<div class='small-muted'>First boundary each failing option exceeds, in check order (money → time → stress → relationships).</div>",
+        unsafe_allow_html=True,
+    )
+    labels = dict(CHECK_ORDER)
+    rows = summary["eliminations"]
+    st.bar_chart(
+        {
+            "Boundary": [labels.get(r["boundary"], r["boundary"]) for r in rows],
+            "Eliminated first": [r["first_failure"] for r in rows],
+            "Exceeded at all": [r["exceeded"] for r in rows],
+        },
+        x="Boundary",
+        y=["Eliminated first", "Exceeded at all"],
+        stack=False,
+    )
+
+
+def _render_trend(summary: dict) -> None:
+    st.markdown("### Over time")
+    trend = summary["trend"]
+    if not trend:
+        st.markdown("<div class='small-muted'>No dated decisions in this window.</div>", unsafe_allow_html=True)
+        return
+    weeks = [t["week"] for t in trend]
+    st.line_chart({"Week": weeks, "Decisions": [t["decisions"] for t in trend]}, x="Week", y="Decisions")
+    st.line_chart(
+        {
+            "Week": weeks,
+            "Pass rate (%)": [t["pass_rate"] * 100 for t in trend],
+            "Mean score": [t["mean_score"] for t in trend],
+        },
+        x="Week",
+        y=["Pass rate (%)", "Mean score"],
+    )
+
+
+def render() -> None:
+    st.markdown("## Analytics")
+    st.markdown(
+        "<div class='small-muted'>Patterns across every decision saved here (Past Decisions files and saved history).</div>",
+        unsafe_allow_html=True,
+    )
+    st.markdown("---")
+
+    c1, c2 = st.columns([1, 1], gap="large")
+    with c1:
+        if st.button("← Back to Home", use_container_width=True):
+            nav.set_page(nav.HOME)
+    with c2:
+        window = st.selectbox("Time window", list(WINDOWS), index=len(WINDOWS) - 1, key="analytics_window")
+
+    summary = state.history_summary(WINDOWS[window])
+    if not summary["options"]:
+        st.info("No saved decisions in this window yet.")
+        return
+
+    m1, m2, m3 = st.columns(3)
+    m1.metric("Decisions", f"{summary['decisions']:,}")
+    m2.metric("Options checked", f"{summary['options']:,}")
+    m3.metric("Options passing", _pct(summary["pass_rate"]))
+
+    st.markdown("---")
+    _render_categories(summary)
+    st.markdown("---")
+    _render_eliminations(summary)
+    st.markdown("---")
+    _render_trend(summary)
@@ -1,12 +1,12 @@
 # src/screens/compare.py
 from __future__ import annotations
 
+import numpy as np
 import streamlit as st
 
 import nav
 import state
-from criteria import weighted_score
-from models import check_limits
+from criteria import criteria_matrix, win_probabilities
 
 
 # STRICT-4 (v0.1) — these are the only enforced boundaries
@@ -18,13 +18,6 @@ CHECK_ORDER = [
 ]
 
 
-def _first_failure_key(checks: dict[str, bool]) -> str | None:
-    for key, _label in CHECK_ORDER:
-        if checks.get(key) is False:
-            return key
-    return None
-
-
 def _fmt_usd(n: int) -> str:
     try:
         return f"${int(n):,}"
@@ -55,9 +48,10 @@ def _failure_explanation(key: str | None, limits, opt=None) -> str:
     return "This crosses one of your boundaries."
 
 
-def _render_boundary_card(title: str, checks: dict[str, bool], passed: bool, limits, opt) -> None:
+def _render_boundary_card(title: str, ev, limits, opt) -> None:
     st.markdown(f"### {title}")
 
+    checks = ev.checks
     rows = []
     for key, label in CHECK_ORDER:
         ok = checks.get(key, True)
@@ -65,10 +59,10 @@ def _render_boundary_card(title: str, checks: dict[str, bool], passed: bool, lim
 
     st.table(rows)
 
-    if passed:
+    if ev.passed:
         st.success("Result: Fits within your boundaries.")
     else:
-        fail_key = _first_failure_key(checks)
+        fail_key = ev.first_failure_key
         st.error("Result: Removed")
         st.markdown(
             f"<div class='small-muted'>{_failure_explanation(fail_key, limits, opt)}</div>",
@@ -106,10 +100,50 @@ def _final_context_block(
         )
 
 
+SENSITIVITY_SAMPLES = 10_000
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _win_shares(category: str, rows: tuple[tuple[int, ...], ...]) -> list[float]:
+    # Cached per (category, criteria values): reruns with unchanged inputs are free.
+    return win_probabilities(category, np.array(rows, dtype=np.int64), samples=SENSITIVITY_SAMPLES).tolist()
+
+
+def _render_sensitivity(category: str, ranking: list, options) -> None:
+    if not st.toggle("Sensitivity check", key="cmp_sensitivity"):
+        return
+
+    matrix = criteria_matrix(category, [options[ev.key].criteria or {} for ev in ranking])
+    shares = _win_shares(category, tuple(map(tuple, matrix.tolist())))
+
+    st.markdown(
+        f"<div class='small-muted'>How often each option comes out on top across {SENSITIVITY_SAMPLES:,} "
+        "re-runs where every weight wobbles ±25% and every rating ±1 point.</div>",
+        unsafe_allow_html=True,
+    )
+    st.table([(ev.name, f"{share * 100:.1f}%") for ev, share in zip(ranking, shares)])
+
+    best = max(shares) if shares else 0.0
+    if best >= 0.8:
+        st.markdown("**This result is robust** — small changes in how you weigh things don’t flip it.")
+    else:
+        st.markdown("**This result is close** — small changes in how you weigh things could flip it.")
+
+
+def _grid(items: list, per_row: int = 2):
+    """
+    Yields (column, item) pairs, laying items out per_row to a row.
+    """
+    for row_start in range(0, len(items), per_row):
+        cols = st.columns([1] * per_row, gap="large")
+        for col, item in zip(cols, items[row_start : row_start + per_row]):
+            yield col, item
+
+
 def render() -> None:
     d = state.get_decision()
     limits = d.limits
-    opt_a, opt_b = state.get_options()
+    options = state.get_options()
     category = d.category or "Personal"
 
     st.markdown("## Compare your options")
@@ -125,42 +159,34 @@ def render() -> None:
             nav.set_page(nav.LIMITS)
         return
 
+    # Memoized by content hash; on a miss only edited options recompute
+    result = state.compare_result()
+    evals = list(result.evals)
+    ranking = list(result.ranking)
+    verdict = result.verdict
+
     # 1) Boundary check
     st.markdown("### Boundary check")
     st.markdown("")
 
-    a_checks = check_limits(limits, opt_a)
-    b_checks = check_limits(limits, opt_b)
-
-    a_pass = all(a_checks.values())
-    b_pass = all(b_checks.values())
-
-    c1, c2 = st.columns([1, 1], gap="large")
-    with c1:
-        _render_boundary_card(opt_a.name, a_checks, a_pass, limits, opt_a)
-    with c2:
-        _render_boundary_card(opt_b.name, b_checks, b_pass, limits, opt_b)
+    for col, ev in _grid(evals):
+        with col:
+            _render_boundary_card(ev.name, ev, limits, options[ev.key])
 
     st.markdown("---")
 
-    # Pre-compute scores (shown later in Results as N/A if removed)
-    score_a = float(weighted_score(category, opt_a.criteria))
-    score_b = float(weighted_score(category, opt_b.criteria))
-
     # Outcomes
-    if a_pass and not b_pass:
-        st.markdown("### Result")
-        st.info(f"Only one option fits within your boundaries: **{opt_a.name}**.")
-        st.markdown("---")
-
-    elif b_pass and not a_pass:
+    if verdict.status == "one_fits":
         st.markdown("### Result")
-        st.info(f"Only one option fits within your boundaries: **{opt_b.name}**.")
+        st.info(f"Only one option fits within your boundaries: **{result.get(verdict.keys[0]).name}**.")
         st.markdown("---")
 
-    elif not a_pass and not b_pass:
+    elif verdict.status == "none_fit":
         st.markdown("### Result")
-        st.error("Neither option fits within the boundaries you set.")
+        if len(evals) == 2:
+            st.error("Neither option fits within the boundaries you set.")
+        else:
+            st.error("None of your options fit within the boundaries you set.")
         st.markdown(
             "<div class='small-muted'>You may need to adjust your boundaries or rethink the options.</div>",
             unsafe_allow_html=True,
@@ -176,8 +202,8 @@ def render() -> None:
         )
         st.markdown("")
 
-        if score_a > score_b:
-            st.markdown(f"**Based on what you set, {opt_a.name} fits better.**")
+        if verdict.status == "winner":
+            st.markdown(f"**Based on what you set, {result.get(verdict.keys[0]).name} fits better.**")
             st.markdown(
                 f"""
 - It aligns more strongly with what matters in **{category}** decisions.
@@ -185,36 +211,47 @@ def render() -> None:
 - It asks for trade-offs that you rated as more acceptable.
                 """.strip()
             )
-        elif score_b > score_a:
-            st.markdown(f"**Based on what you set, {opt_b.name} fits better.**")
+        elif len(verdict.keys) == len(ranking):
+            st.markdown("**Based on what you set, this is a tie.**")
+            both = "Both options" if len(ranking) == 2 else "All remaining options"
             st.markdown(
                 f"""
-- It aligns more strongly with what matters in **{category}** decisions.
-- It stays within your boundaries while producing a better overall fit.
-- It asks for trade-offs that you rated as more acceptable.
+- {both} fit within your boundaries.
+- Your category criteria score them equally.
+- The deciding factor is likely something outside the sliders (values, timing, gut-check).
                 """.strip()
             )
         else:
-            st.markdown("**Based on what you set, this is a tie.**")
+            names = ", ".join(result.get(k).name for k in verdict.keys)
+            st.markdown(f"**Based on what you set, these tie for the best fit: {names}.**")
             st.markdown(
                 """
-- Both options fit within your boundaries.
-- Your category criteria score them equally.
+- They fit within your boundaries and your category criteria score them equally.
 - The deciding factor is likely something outside the sliders (values, timing, gut-check).
                 """.strip()
             )
 
+        if len(ranking) > 2:
+            st.markdown("")
+            st.markdown("**Ranking of options that fit**")
+            st.table([(i + 1, ev.name, int(round(ev.score))) for i, ev in enumerate(ranking)])
+
+        st.markdown("")
+        _render_sensitivity(category, ranking, options)
+
         st.markdown("---")
 
     # ✅ End-of-page: results (fit/removed + score + day-to-day)
     st.markdown("## Results")
     st.markdown("")
 
-    c1, c2 = st.columns([1, 1], gap="large")
-    with c1:
-        _final_context_block(opt=opt_a, passed=a_pass, score=score_a if a_pass else None)
-    with c2:
-        _final_context_block(opt=opt_b, passed=b_pass, score=score_b if b_pass else None)
+    for col, ev in _grid(evals):
+        with col:
+            _final_context_block(
+                opt=options[ev.key],
+                passed=ev.passed,
+                score=ev.score if ev.passed else None,
+            )
 
     st.markdown("---")
 
@@ -226,3 +263,22 @@ def render() -> None:
 
     with c2:
         st.button("Export summary (coming soon)", use_container_width=True, disabled=True)
+
+    with st.expander("Diagnostics", expanded=False):
+        stats = state.compare_cache_stats()
+        st.table(
+            [
+                {"cache": name, **{k: (f"{v:.0%}" if k == "hit_rate" else v) for k, v in s.items()}}
+                for name, s in stats.items()
+            ]
+        )
+
+        # walks every session object, so only measured on request (the expander body runs every rerun)
+        if st.toggle("Measure session memory", key="compare_session_memory"):
+            rows = state.session_memory()
+            total = sum(r["bytes"] for r in rows)
+            st.markdown(
+                f"<div class='small-muted'>Session memory: ~{total / 1024:.1f} KiB across {len(rows)} keys</div>",
+                unsafe_allow_html=True,
+            )
+            st.table([r for r in rows if r["bytes"]])
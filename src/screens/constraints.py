@@ -1,16 +1,103 @@
 # src/screens/constraints.py
 from __future__ import annotations
 
+import numpy as np
 import streamlit as st
 
 import nav
 import state
+from boundaries import (
+    MONEY_GRID,
+    MONEY_LIMIT_RANGE,
+    TIME_GRID,
+    TIME_LIMIT_RANGE,
+    check_columns,
+    grid_index,
+    limits_row,
+    off_grid,
+    option_columns,
+    pass_count_grid,
+)
+from models import RISK_LEVEL
+
+_RISK_BY_LEVEL = {v: k for k, v in RISK_LEVEL.items()}
 
 
 def _helper(text: str) -> None:
     st.markdown(f"<div class='small-muted'>{text}</div>", unsafe_allow_html=True)
 
 
+# -----------------------------
+# What-if explorer
+# -----------------------------
+_CELL_W, _CELL_H = 2, 4  # pixel size of one (money, hours) grid cell
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _pass_grid(cols: tuple[tuple[int, ...], ...]) -> np.ndarray:
+    # Depends only on the options, so slider drags on this page reuse it.
+    return pass_count_grid(np.array(cols, dtype=np.int64))
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _grid_image(cols: tuple[tuple[int, ...], ...], stress: int, rel: int) -> np.ndarray:
+    counts = _pass_grid(cols)[stress, rel].astype(np.float32)
+    frac = counts / max(len(cols), 1)
+
+    # dark panel -> amber as more options fit; hours grow upward
+    dark = np.array([18, 22, 29], dtype=np.float32)
+    amber = np.array([242, 168, 29], dtype=np.float32)
+    rgb = dark + frac[..., None] * (amber - dark)
+    rgb = np.flipud(rgb).repeat(_CELL_H, axis=0).repeat(_CELL_W, axis=1)
+    return rgb.astype(np.uint8)
+
+
+def _render_what_if(limits) -> None:
+    if not st.toggle("What-if explorer", key="lim_what_if"):
+        return
+
+    options = state.get_options()
+    cols_arr = option_columns(list(options.values()))
+    cols = tuple(map(tuple, cols_arr.tolist()))
+    s_idx, r_idx, t_idx, m_idx = grid_index(limits)
+
+    img = _grid_image(cols, s_idx, r_idx).copy()
+    # crosshair at the current limits
+    y = (len(TIME_GRID) - 1 - t_idx) * _CELL_H
+    x = m_idx * _CELL_W
+    img[y : y + _CELL_H, :] = (233, 238, 245)
+    img[:, x : x + _CELL_W] = (233, 238, 245)
+
+    # counted at the exact limits (what Compare checks), not at the crosshair's grid cell
+    fitting = int(check_columns(limits_row(limits), cols_arr).passed.sum())
+    _helper(
+        f"At these limits <b>{fitting} of {len(options)}</b> options fit. "
+        "Brighter = more options fit. Left → right: money "
+        f"${int(MONEY_GRID[0]):,}–${int(MONEY_GRID[-1]):,}. Bottom → top: {int(TIME_GRID[0])}–{int(TIME_GRID[-1])} hrs/week. "
+        "The crosshair marks your current money + time limits; stress and relationship tolerances are applied on top."
+    )
+    st.image(img, use_container_width=True)
+    off = off_grid(limits)
+    if off:
+        _helper(
+            f"Your {' and '.join(off)} limit is between the slider steps, so the crosshair sits on the "
+            "nearest step at or below it (or the edge of the map); the count above uses your exact limits."
+        )
+
+    rows = [
+        {
+            "Option": opt.name,
+            "Money limit": f"≥ ${money:,}",
+            "Time limit": f"≥ {hours} hrs/week",
+            "Stress tolerance": f"≥ {_RISK_BY_LEVEL[stress].value}",
+            "Relationship tolerance": f"≥ {_RISK_BY_LEVEL[rel].value}",
+        }
+        for opt, (money, hours, stress, rel) in zip(options.values(), cols)
+    ]
+    _helper("Each option fits once every limit reaches its threshold:")
+    st.table(rows)
+
+
 def render() -> None:
     d = state.get_decision()
     limits = d.limits
@@ -27,10 +114,10 @@ def render() -> None:
     limits.money_max_usd = int(
         st.slider(
             "Max money at risk (USD)",
-            min_value=0,
-            max_value=20000,
+            min_value=MONEY_LIMIT_RANGE[0],
+            max_value=MONEY_LIMIT_RANGE[1],
             value=int(getattr(limits, "money_max_usd", 1000)),
-            step=100,
+            step=MONEY_LIMIT_RANGE[2],
             key="lim_money",
             label_visibility="collapsed",
         )
@@ -44,10 +131,10 @@ def render() -> None:
     limits.time_hours_per_week = int(
         st.slider(
             "Max hours per week",
-            min_value=0,
-            max_value=80,
+            min_value=TIME_LIMIT_RANGE[0],
+            max_value=TIME_LIMIT_RANGE[1],
             value=int(limits.time_hours_per_week),
-            step=1,
+            step=TIME_LIMIT_RANGE[2],
             key="lim_time",
             label_visibility="collapsed",
         )
@@ -79,6 +166,10 @@ def render() -> None:
 
     st.markdown("---")
 
+    _render_what_if(limits)
+
+    st.markdown("---")
+
     limits.confirmed = st.checkbox(
         "I’m comfortable removing any option that crosses these limits.",
         value=bool(limits.confirmed),
@@ -1,13 +1,17 @@
 # src/screens/load.py
 from __future__ import annotations
 
+import hashlib
+import html
 import json
 from typing import Any, Dict
 
 import streamlit as st
 
+import bulk_import
 import nav
 import state
+from snapshots import SnapshotError, decode_snapshot
 
 
 def _parse_json_text(raw: str) -> Dict[str, Any]:
@@ -20,6 +24,37 @@ def _parse_json_text(raw: str) -> Dict[str, Any]:
     return data
 
 
+def _check_snapshot(snap: Dict[str, Any]) -> tuple[str, str, list[str]]:
+    """
+    Strict pass of the shared snapshot decoder.
+    Returns (detected title, detected category, problems); problems fall back to defaults on load.
+    """
+    try:
+        decision, _options = decode_snapshot(snap, strict=True)
+        return decision.title, decision.category, []
+    except SnapshotError as e:
+        decision, _options = decode_snapshot(snap)
+        return decision.title, decision.category, e.errors
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _parse_upload(digest: str, _raw: bytes) -> tuple[Dict[str, Any], str, str, list[str]]:
+    """
+    Decode + parse + validate an upload once per content hash (digest is the cache key;
+    the leading underscore keeps Streamlit from re-hashing the raw bytes).
+    Returns (snapshot, detected title, detected category, problems).
+    """
+    # tolerate utf-8-sig BOM and typical encodings
+    snap = _parse_json_text(_raw.decode("utf-8-sig"))
+    return (snap, *_check_snapshot(snap))
+
+
+def _render_problems(problems: list[str]) -> None:
+    st.warning(f"{len(problems)} field(s) are invalid and will be replaced with defaults if you load anyway.")
+    with st.expander("Details"):
+        st.markdown("\n".join(f"- `{html.escape(p)}`" for p in problems))
+
+
 def _try_apply_snapshot(snap: Dict[str, Any]) -> bool:
     """
     Returns True if applied successfully.
@@ -42,6 +77,65 @@ def _try_apply_snapshot(snap: Dict[str, Any]) -> bool:
         return False
 
 
+def _render_import_report(report: bulk_import.ImportReport) -> None:
+    if report.imported:
+        st.success(f"Imported {report.imported} decision(s) into Past Decisions.")
+    if report.failed:
+        st.warning(f"{report.failed} record(s) could not be imported.")
+        with st.expander("Error report", expanded=report.imported == 0):
+            shown = len(report.errors)
+            if shown < report.failed:
+                st.markdown(
+                    f"<div class='small-muted'>Showing the first {shown} of {report.failed} errors.</div>",
+                    unsafe_allow_html=True,
+                )
+            st.dataframe(report.errors, use_container_width=True, hide_index=True)
+    if not report.processed:
+        st.info("No records found in that file.")
+
+
+def _render_bulk_import(up: Any) -> None:
+    """
+    Streams a .jsonl / .zip upload into the saved-decisions store (see bulk_import.py).
+    Reports are kept per file (by upload id) so a rerun never imports the same upload twice.
+    """
+    reports = st.session_state.setdefault("load_bulk_reports", {})
+    report = reports.get(up.file_id)
+    if report is not None:
+        _render_import_report(report)
+        return
+
+    size_kb = max(1, up.size // 1024)
+    st.markdown(
+        f"<div class='small-muted'>Archive: <b>{html.escape(up.name)}</b> ({size_kb:,} KB)</div>",
+        unsafe_allow_html=True,
+    )
+    strict = st.checkbox(
+        "Strict validation (skip records with any invalid field instead of using defaults)",
+        key="load_bulk_strict",
+    )
+    if not st.button("Import into Past Decisions", use_container_width=True, key="load_bulk_import"):
+        return
+
+    bar = st.progress(0.0, text="Importing…")
+
+    def on_batch(rep: bulk_import.ImportReport) -> None:
+        frac = min(1.0, up.tell() / up.size) if up.size else 1.0
+        bar.progress(frac, text=f"Importing… {rep.processed:,} record(s) read, {rep.failed:,} failed")
+
+    up.seek(0)
+    try:
+        report = bulk_import.import_file(up, up.name, strict=strict, on_batch=on_batch)
+    except Exception as e:
+        bar.empty()
+        st.error(f"Could not read that archive. ({e})")
+        return
+
+    bar.progress(1.0, text=f"Done: {report.processed:,} record(s) read")
+    reports[up.file_id] = report
+    _render_import_report(report)
+
+
 def render() -> None:
     st.markdown("## Load saved decision")
     st.markdown(
@@ -60,28 +154,45 @@ def render() -> None:
         st.markdown("")
 
     st.markdown("### Upload JSON")
-    up = st.file_uploader("Decision JSON", type=["json"], label_visibility="collapsed")
+    st.markdown(
+        "<div class='small-muted'>A single .json loads into the app. A .jsonl or .zip archive is "
+        "bulk-imported into Past Decisions.</div>",
+        unsafe_allow_html=True,
+    )
+    up = st.file_uploader("Decision JSON", type=["json", "jsonl", "zip"], label_visibility="collapsed")
 
-    if up is not None:
+    if up is not None and not up.name.lower().endswith(".json"):
+        _render_bulk_import(up)
+    elif up is not None:
         try:
-            raw = up.read()
-            # tolerate utf-8-sig BOM and typical encodings
-            text = raw.decode("utf-8-sig")
-            snap = _parse_json_text(text)
+            raw = up.getvalue()
+            digest = hashlib.sha256(raw).hexdigest()
+            snap, title, category, problems = _parse_upload(digest, raw)
 
             # Optional quick preview (safe)
-            title = str(snap.get("title", "")).strip()
-            category = str(snap.get("category", "")).strip()
             if title or category:
                 st.markdown(
-                    f"<div class='small-muted'>Detected: <b>{title or 'Untitled'}</b>"
-                    f"{(' — ' + category) if category else ''}</div>",
+                    f"<div class='small-muted'>Detected: <b>{html.escape(title or 'Untitled')}</b>"
+                    f"{(' — ' + html.escape(category)) if category else ''}</div>",
                     unsafe_allow_html=True,
                 )
 
-            if _try_apply_snapshot(snap):
-                st.success("Loaded. Redirecting…")
-                nav.set_page(nav.CATEGORY)
+            applied = st.session_state.setdefault("load_applied_uploads", set())
+            if digest in applied:
+                # Already applied once: don't silently overwrite edits made since then
+                st.info("This file is already loaded. Upload a different file, or load it again to discard your changes.")
+                if st.button("Load this file again", use_container_width=True, key="load_upload_again"):
+                    if _try_apply_snapshot(snap):
+                        nav.set_page(nav.CATEGORY)
+            else:
+                load = True
+                if problems:
+                    _render_problems(problems)
+                    load = st.button("Load anyway", use_container_width=True, key="load_upload_anyway")
+                if load and _try_apply_snapshot(snap):
+                    applied.add(digest)
+                    st.success("Loaded. Redirecting…")
+                    nav.set_page(nav.CATEGORY)
 
         except Exception as e:
             st.error(f"Could not load that file. ({e})")
@@ -98,15 +209,30 @@ def render() -> None:
     c3, c4 = st.columns([1, 1], gap="large")
     with c3:
         load_disabled = not txt.strip()
+        paste_digest = hashlib.sha256(txt.encode("utf-8")).hexdigest()
+        confirmed = False
         if st.button("Load pasted JSON", use_container_width=True, disabled=load_disabled):
             try:
                 snap = _parse_json_text(txt)
-                if _try_apply_snapshot(snap):
+                problems = _check_snapshot(snap)[2]
+                if problems:
+                    # ask first; the confirmation is tied to this exact text
+                    st.session_state["load_paste_problems"] = (paste_digest, problems)
+                elif _try_apply_snapshot(snap):
                     st.success("Loaded. Redirecting…")
                     nav.set_page(nav.CATEGORY)
             except Exception as e:
                 st.error(f"Could not parse JSON. ({e})")
 
+        pending = st.session_state.get("load_paste_problems")
+        if pending and pending[0] == paste_digest and txt.strip():
+            _render_problems(pending[1])
+            confirmed = st.button("Load anyway", use_container_width=True, key="load_paste_anyway")
+        if confirmed and _try_apply_snapshot(_parse_json_text(txt)):
+            st.session_state.pop("load_paste_problems", None)
+            st.success("Loaded. Redirecting…")
+            nav.set_page(nav.CATEGORY)
+
     with c4:
         if st.button("Clear", use_container_width=True, disabled=not txt.strip()):
             st.session_state["load_paste_clear"] = True
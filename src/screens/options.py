@@ -96,7 +96,7 @@ def _option_form(opt: OptionInput, prefix: str) -> None:
 def render() -> None:
     d = state.get_decision()
     limits = d.limits
-    opt_a, opt_b = state.get_options()
+    options = state.get_options()
 
     st.markdown("## Describe your options")
     st.markdown(
@@ -105,41 +105,45 @@ def render() -> None:
     )
     st.markdown("---")
 
-    # ---- Option names ----
-    c1, c2 = st.columns([1, 1], gap="large")
-    with c1:
-        opt_a.name = st.text_input(
-            "Option A name",
-            value=opt_a.name,
-            key="opt_a_name",
-            label_visibility="collapsed",
-            placeholder="Option A name",
-        )
-    with c2:
-        opt_b.name = st.text_input(
-            "Option B name",
-            value=opt_b.name,
-            key="opt_b_name",
-            label_visibility="collapsed",
-            placeholder="Option B name",
-        )
-
-    st.markdown("---")
-
-    # ---- Option forms ----
-    left, right = st.columns([1, 1], gap="large")
-    with left:
-        _option_form(opt_a, "opt_a")
-    with right:
-        _option_form(opt_b, "opt_b")
+    # ---- Option forms (two per row) ----
+    items = list(options.items())
+    can_remove = len(items) > state.MIN_OPTIONS
+    for row_start in range(0, len(items), 2):
+        cols = st.columns([1, 1], gap="large")
+        for col, (key, opt) in zip(cols, items[row_start : row_start + 2]):
+            with col:
+                label = f"{state.default_option_name(key)} name"
+                opt.name = st.text_input(
+                    label,
+                    value=opt.name,
+                    key=f"{key}_name",
+                    label_visibility="collapsed",
+                    placeholder=label,
+                )
+                _option_form(opt, key)
+                st.button(
+                    "Remove this option",
+                    key=f"{key}_remove",
+                    use_container_width=True,
+                    disabled=not can_remove,
+                    on_click=state.remove_option,
+                    args=(key,),
+                )
+        st.markdown("---")
+
+    st.button(
+        "+ Add another option",
+        use_container_width=True,
+        disabled=len(items) >= state.MAX_OPTIONS,
+        on_click=state.add_option,
+    )
 
     st.markdown("---")
 
     # ---- Gating ----
-    a_name_ok = bool(opt_a.name.strip())
-    b_name_ok = bool(opt_b.name.strip())
+    names_ok = all(opt.name.strip() for opt in options.values())
     limits_ok = bool(limits.confirmed)
-    can_continue = limits_ok and a_name_ok and b_name_ok
+    can_continue = limits_ok and names_ok
 
     # ---- Navigation ----
     c1, c2 = st.columns([1, 1], gap="large")
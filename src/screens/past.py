@@ -1,8 +1,10 @@
 # src/screens/past.py
 from __future__ import annotations
 
+import html
 import json
 from datetime import datetime
+from typing import Callable
 
 import streamlit as st
 
@@ -10,14 +12,201 @@ import nav
 import state
 
 
+PAGE_SIZE = 20
+
+
 def _stamp() -> str:
     return datetime.now().strftime("%Y%m%d_%H%M%S")
 
 
+def _snapshot_json() -> str:
+    """
+    Pretty-printed current snapshot, serialized once per state version.
+    """
+    version = state.state_version()
+    cached = st.session_state.get("_past_json")
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    data = json.dumps(state.snapshot_current(), indent=2)
+    st.session_state["_past_json"] = (version, data)
+    return data
+
+
+def _show_more() -> None:
+    st.session_state["past_shown"] = st.session_state.get("past_shown", PAGE_SIZE) + PAGE_SIZE
+
+
+def _render_row(
+    title: str,
+    category: str,
+    saved_at: str,
+    ref: str,
+    *,
+    key: str,
+    load: Callable[[], dict],
+    delete: Callable[[str], None] | None,
+) -> None:
+    c1, c2, c3 = st.columns([4, 1, 1], gap="small")
+    with c1:
+        meta = " · ".join(html.escape(x) for x in (category, saved_at) if x)
+        st.markdown(
+            f"**{html.escape(title)}**<div class='small-muted'>{meta}</div>",
+            unsafe_allow_html=True,
+        )
+    with c2:
+        if st.button("Load", key=f"past_load_{key}", use_container_width=True):
+            state.apply_snapshot(load())
+            nav.set_page(nav.CATEGORY)
+    with c3:
+        if delete is not None and st.button("Delete", key=f"past_del_{key}", use_container_width=True):
+            delete(ref)
+            st.rerun()
+
+
+def _fmt_value(v: object) -> str:
+    if v is None:
+        return "—"
+    return v if isinstance(v, str) else json.dumps(v, ensure_ascii=False)
+
+
+def _render_versions(file_id: str) -> None:
+    """
+    Version picker + field diff for a decision that was saved more than once.
+    """
+    vs = state.list_versions(file_id)
+    if len(vs) < 2:
+        # the index counted versions the chain file no longer has (missing or torn)
+        st.markdown("<div class='small-muted'>Older versions are unavailable.</div>", unsafe_allow_html=True)
+        return
+
+    labels = {e["v"]: f"v{e['v']} · {e['saved_at']}" for e in vs}
+    newest = vs[-1]["v"]
+
+    c1, c2 = st.columns([1, 1], gap="small")
+    with c1:
+        v = st.selectbox(
+            "Version", list(labels), index=len(vs) - 2, format_func=labels.get, key=f"past_v_{file_id}"
+        )
+    with c2:
+        against = st.selectbox(
+            "Compare with", list(labels), index=len(vs) - 1, format_func=labels.get, key=f"past_vcmp_{file_id}"
+        )
+
+    diff = [c for c in state.version_changes(file_id, v, against) if c["field"] != "saved_at"]
+    if diff:
+        st.dataframe(
+            [{"Field": c["field"], f"v{v}": _fmt_value(c["before"]), f"v{against}": _fmt_value(c["after"])} for c in diff],
+            hide_index=True,
+            use_container_width=True,
+        )
+    else:
+        st.markdown("<div class='small-muted'>No differences.</div>", unsafe_allow_html=True)
+
+    if v != newest and st.button(f"Load v{v}", key=f"past_vload_{file_id}", use_container_width=True):
+        state.apply_snapshot(state.load_version(file_id, v))
+        nav.set_page(nav.CATEGORY)
+
+
+def _render_search_results(query: str) -> None:
+    shown = st.session_state.get("past_shown", PAGE_SIZE)
+    total, hits = state.search_saved(query, limit=shown)
+    st.markdown(
+        f"<div class='small-muted'>{total} match{'es' if total != 1 else ''}</div>",
+        unsafe_allow_html=True,
+    )
+    for hit in hits:
+        history = hit["source"] == "history"
+        _render_row(
+            hit["title"],
+            " · ".join(x for x in (hit["category"], "history" if history else "") if x),
+            hit["saved_at"],
+            hit["ref"],
+            key=f"{hit['source']}_{hit['ref']}",
+            load=lambda hit=hit: state.load_search_hit(hit),
+            delete=None if history else state.delete_snapshot,
+        )
+
+    if total > shown:
+        st.button(f"Show more ({total - shown} more)", use_container_width=True, on_click=_show_more)
+
+
+def _render_drafts() -> None:
+    """
+    Autosaved, never explicitly saved decisions (kept apart from the saved list and its index).
+    """
+    drafts = state.list_drafts()
+    if not drafts:
+        return
+
+    st.markdown("### Unsaved drafts")
+    # only names + mtimes are listed (drafts are never opened just to show them)
+    for item in drafts[:PAGE_SIZE]:
+        file_id = item["file_id"]
+        _render_row(
+            "Unsaved draft",
+            "",
+            f"autosaved {item['saved_at']}",
+            file_id,
+            key=f"draft_{file_id}",
+            load=lambda file_id=file_id: state.load_draft(file_id),
+            delete=state.delete_draft,
+        )
+    st.markdown("---")
+
+
+def _render_saved_list() -> None:
+    st.markdown("### Saved decisions")
+
+    if st.button("Save current decision", use_container_width=True, key="past_save"):
+        file_id = state.save_current_snapshot()
+        st.success(f"Saved ({file_id}).")
+
+    query = st.text_input(
+        "Search",
+        key="past_query",
+        placeholder="Search titles, options, categories and summaries…",
+        label_visibility="collapsed",
+    )
+    if query.strip():
+        _render_search_results(query)
+        return
+
+    # Served from the metadata index — no per-file reads
+    items = state.list_saved_snapshots()
+    if not items:
+        st.markdown("<div class='small-muted'>Nothing saved yet.</div>", unsafe_allow_html=True)
+        return
+
+    shown = st.session_state.get("past_shown", PAGE_SIZE)
+    for item in items[:shown]:
+        file_id = item["file_id"]
+        saved_at = item["saved_at"]
+        _render_row(
+            item["title"],
+            item["category"],
+            saved_at,
+            file_id,
+            key=file_id,
+            load=lambda file_id=file_id: state.load_snapshot_by_id(file_id),
+            delete=state.delete_snapshot,
+        )
+        n = item.get("versions", 1)
+        if n > 1 and st.toggle(f"{n} versions", key=f"past_versions_{file_id}"):
+            _render_versions(file_id)
+
+    if len(items) > shown:
+        st.button(
+            f"Show more ({len(items) - shown} older)",
+            use_container_width=True,
+            on_click=_show_more,
+        )
+
+
 def render() -> None:
     st.markdown("## Past Decisions")
     st.markdown(
-        "<div class='small-muted'>Download your current decision as JSON. You can load it later from the Load page.</div>",
+        "<div class='small-muted'>Download your current decision as JSON, or save it here. You can load it later from the Load page.</div>",
         unsafe_allow_html=True,
     )
     st.markdown("---")
@@ -32,8 +221,7 @@ def render() -> None:
 
     st.markdown("")
 
-    snap = state.snapshot_current()
-    data = json.dumps(snap, indent=2)
+    data = _snapshot_json()
 
     st.download_button(
         "Download current decision (JSON)",
@@ -44,5 +232,10 @@ def render() -> None:
     )
 
     st.markdown("---")
-    st.markdown("<div class='small-muted'>Preview</div>", unsafe_allow_html=True)
-    st.code(data, language="json")
+    _render_drafts()
+    _render_saved_list()
+
+    st.markdown("---")
+    # Only sent to the browser when opened (st.expander would still ship the full payload)
+    if st.toggle("Show JSON preview", key="past_preview"):
+        st.code(data, language="json")
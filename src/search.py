@@ -0,0 +1,495 @@
+# src/search.py
+"""
+Full-text search over saved decisions (titles, option names, categories, summaries).
+
+An on-disk inverted index (data/search.sqlite3) covers both stores: saved decision files
+(source "saved", ref = file_id) and storage.py history records (source "history",
+ref = record id). saved_store and storage push every write through index_snapshots() /
+remove(), so the index is maintained incrementally; the first open builds it once from
+both stores.
+
+    python src/search.py "job offer"
+    python src/search.py --rebuild
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import re
+import sqlite3
+import threading
+from collections import defaultdict
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Iterable, Mapping
+
+import numpy as np
+
+# Index layout
+# ------------
+# docs:     one row per indexed snapshot (display metadata + alive flag). Replaced or
+#           deleted snapshots are only flagged dead (a tombstone); their postings are dropped
+#           on merge. Once the tombstones outgrow a fraction of the live docs, a sweep deletes
+#           them with their postings and renumbers the live docs, so the tombstones a query
+#           loads and its per-doc score arrays (sized by the largest doc_id) track the live set.
+# postings: (source, term, seg) -> doc_ids (int32) + weights (float32) as raw blobs.
+#           Each write batch adds one small segment per term; once a term has more than
+#           MERGE_AT segments they are merged back into one. A query therefore reads a
+#           handful of contiguous blobs per term and scores them with numpy, instead of
+#           visiting postings one row at a time.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    doc_id   INTEGER PRIMARY KEY,
+    source   TEXT NOT NULL,
+    ref      TEXT NOT NULL,
+    title    TEXT NOT NULL,
+    category TEXT NOT NULL,
+    options  TEXT NOT NULL,
+    saved_at TEXT NOT NULL,
+    alive    INTEGER NOT NULL DEFAULT 1
+);
+CREATE UNIQUE INDEX IF NOT EXISTS docs_live_ref ON docs (source, ref) WHERE alive = 1;
+CREATE INDEX IF NOT EXISTS docs_dead ON docs (source, doc_id) WHERE alive = 0;
+CREATE TABLE IF NOT EXISTS postings (
+    source  TEXT NOT NULL,
+    term    TEXT NOT NULL,
+    seg     INTEGER NOT NULL,
+    doc_ids BLOB NOT NULL,
+    weights BLOB NOT NULL,
+    PRIMARY KEY (source, term, seg)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+SOURCES = ("saved", "history")
+
+# A term's weight in a document is 1 + ln(sum of the weights of the fields it occurs in)
+FIELD_WEIGHTS = {"title": 4.0, "options": 2.0, "category": 1.5, "summary": 1.0}
+
+MERGE_AT = 16
+_SWEEP_RATIO = 0.25
+_SWEEP_MIN_DEAD = 256
+MAX_PREFIX_TERMS = 64
+_BUILD_BATCH = 500
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+_init_lock = threading.Lock()
+_initialized: set[str] = set()
+
+
+def _db_path() -> Path:
+    p = Path(__file__).resolve().parents[1] / "data"
+    p.mkdir(parents=True, exist_ok=True)
+    return p / "search.sqlite3"
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN.findall(text.casefold())
+
+
+# -----------------------------
+# Documents
+# -----------------------------
+def document(snap: Any) -> dict[str, str]:
+    """
+    Searchable text of one snapshot (current format; storage records are unwrapped).
+    """
+    snap = snap if isinstance(snap, dict) else {}
+    if isinstance(snap.get("snapshot"), dict) and "decision" not in snap:
+        snap = snap["snapshot"]
+    dec = snap.get("decision") if isinstance(snap.get("decision"), dict) else {}
+    opts = snap.get("options") if isinstance(snap.get("options"), dict) else {}
+    opts = [o for o in opts.values() if isinstance(o, dict)]
+    return {
+        "title": str(dec.get("title") or "").strip(),
+        "options": ", ".join(str(o.get("name") or "").strip() for o in opts),
+        "category": str(dec.get("category") or "").strip(),
+        "summary": "\n".join(str(o.get("summary") or "") for o in opts if o.get("summary")),
+        "saved_at": str(snap.get("saved_at") or ""),
+    }
+
+
+def _term_weights(doc: Mapping[str, str]) -> dict[str, float]:
+    raw: dict[str, float] = defaultdict(float)
+    for name, w in FIELD_WEIGHTS.items():
+        for tok in tokenize(doc[name]):
+            raw[tok] += w
+    return {t: 1.0 + math.log(w) for t, w in raw.items()}
+
+
+# -----------------------------
+# Writes
+# -----------------------------
+def _bump(conn: sqlite3.Connection, key: str, delta: int) -> None:
+    conn.execute(
+        "INSERT INTO meta (key, value) VALUES (?, ?) "
+        "ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + ?",
+        (key, str(delta), delta),
+    )
+
+
+def _dead_ids(conn: sqlite3.Connection, source: str) -> np.ndarray:
+    rows = conn.execute("SELECT doc_id FROM docs WHERE source = ? AND alive = 0", (source,)).fetchall()
+    return np.fromiter((r[0] for r in rows), dtype=np.int32, count=len(rows))
+
+
+def _merge(conn: sqlite3.Connection, source: str, term: str, dead: np.ndarray) -> None:
+    rows = conn.execute(
+        "SELECT seg, doc_ids, weights FROM postings WHERE source = ? AND term = ?", (source, term)
+    ).fetchall()
+    ids = np.concatenate([np.frombuffer(r[1], dtype=np.int32) for r in rows])
+    ws = np.concatenate([np.frombuffer(r[2], dtype=np.float32) for r in rows])
+    if dead.size:
+        keep = ~np.isin(ids, dead)
+        ids, ws = ids[keep], ws[keep]
+    conn.execute("DELETE FROM postings WHERE source = ? AND term = ?", (source, term))
+    if ids.size:
+        conn.execute(
+            "INSERT INTO postings (source, term, seg, doc_ids, weights) VALUES (?, ?, ?, ?, ?)",
+            (source, term, min(r[0] for r in rows), ids.tobytes(), ws.tobytes()),
+        )
+
+
+def _kill(conn: sqlite3.Connection, source: str, refs: Iterable[str]) -> int:
+    killed = 0
+    for ref in refs:
+        killed += conn.execute(
+            "UPDATE docs SET alive = 0 WHERE source = ? AND ref = ? AND alive = 1", (source, ref)
+        ).rowcount
+    if killed:
+        _bump(conn, f"live_{source}", -killed)
+        _bump(conn, f"dead_{source}", killed)
+    return killed
+
+
+def _maybe_sweep(conn: sqlite3.Connection) -> None:
+    counts = dict(conn.execute("SELECT key, CAST(value AS INTEGER) FROM meta"))
+    n_live = sum(counts.get(f"live_{src}", 0) for src in SOURCES)
+    n_dead = sum(counts.get(f"dead_{src}", 0) for src in SOURCES)
+    if n_dead >= max(_SWEEP_MIN_DEAD, _SWEEP_RATIO * n_live):
+        _sweep(conn)
+
+
+def _sweep(conn: sqlite3.Connection) -> None:
+    """
+    Deletes dead docs and their postings, and renumbers the live docs 1..n (in order, so
+    "newest wins" ties still hold). Queries size their score arrays by the largest doc_id.
+    """
+    alive = np.fromiter(
+        (r[0] for r in conn.execute("SELECT doc_id FROM docs WHERE alive = 1 ORDER BY doc_id")), dtype=np.int32
+    )
+    conn.execute("DELETE FROM docs WHERE alive = 0")
+    # ascending, and every new id <= its old one, so no update collides with a row not yet moved
+    conn.executemany(
+        "UPDATE docs SET doc_id = ? WHERE doc_id = ?",
+        ((new, int(old)) for new, old in enumerate(alive.tolist(), start=1) if new != old),
+    )
+
+    keys = conn.execute("SELECT DISTINCT source, term FROM postings").fetchall()
+    for source, term in keys:
+        rows = conn.execute(
+            "SELECT doc_ids, weights FROM postings WHERE source = ? AND term = ?", (source, term)
+        ).fetchall()
+        ids = np.concatenate([np.frombuffer(r[0], dtype=np.int32) for r in rows])
+        ws = np.concatenate([np.frombuffer(r[1], dtype=np.float32) for r in rows])
+        pos = np.minimum(np.searchsorted(alive, ids), max(alive.size - 1, 0))
+        keep = (alive[pos] == ids) if alive.size else np.zeros(ids.size, dtype=bool)
+        ids, ws = (pos[keep] + 1).astype(np.int32), ws[keep]
+        conn.execute("DELETE FROM postings WHERE source = ? AND term = ?", (source, term))
+        if ids.size:
+            conn.execute(
+                "INSERT INTO postings (source, term, seg, doc_ids, weights) VALUES (?, ?, ?, ?, ?)",
+                (source, term, int(ids.min()), ids.tobytes(), ws.tobytes()),
+            )
+    conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, '0')", ((f"dead_{src}",) for src in SOURCES))
+
+
+def _index_batch(conn: sqlite3.Connection, source: str, items: Iterable[tuple[str, Any, str]]) -> None:
+    """
+    Indexes one batch as a single new segment per term (replacing any live doc with the same ref).
+    """
+    postings: dict[str, tuple[list[int], list[float]]] = defaultdict(lambda: ([], []))
+    with conn:
+        added = 0
+        for ref, snap, saved_at in items:
+            doc = document(snap)
+            _kill(conn, source, [ref])
+            doc_id = conn.execute(
+                "INSERT INTO docs (source, ref, title, category, options, saved_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (source, ref, doc["title"], doc["category"], doc["options"], saved_at or doc["saved_at"]),
+            ).lastrowid
+            added += 1
+            for term, w in _term_weights(doc).items():
+                ids, ws = postings[term]
+                ids.append(doc_id)
+                ws.append(w)
+        if not added:
+            return
+        _bump(conn, f"live_{source}", added)
+
+        seg = min(ids[0] for ids, _ in postings.values()) if postings else 0
+        conn.executemany(
+            "INSERT INTO postings (source, term, seg, doc_ids, weights) VALUES (?, ?, ?, ?, ?)",
+            (
+                (source, term, seg, np.asarray(ids, dtype=np.int32).tobytes(), np.asarray(ws, dtype=np.float32).tobytes())
+                for term, (ids, ws) in postings.items()
+            ),
+        )
+
+        dead: np.ndarray | None = None
+        for term in postings:
+            (n,) = conn.execute(
+                "SELECT COUNT(*) FROM postings WHERE source = ? AND term = ?", (source, term)
+            ).fetchone()
+            if n > MERGE_AT:
+                if dead is None:
+                    dead = _dead_ids(conn, source)
+                _merge(conn, source, term, dead)
+        _maybe_sweep(conn)
+
+
+# -----------------------------
+# Build / connect
+# -----------------------------
+def _build(conn: sqlite3.Connection) -> None:
+    """
+    Indexes everything currently in both stores (streamed, committed in batches).
+    """
+    # imported here: both stores import this module to push incremental updates
+    import saved_store
+    import storage
+
+    with conn:
+        conn.execute("DELETE FROM docs")
+        conn.execute("DELETE FROM postings")
+        conn.execute("DELETE FROM meta")
+
+    batch: list[tuple[str, Any, str]] = []
+    for meta in saved_store.list_saved_snapshots():
+        try:
+            snap = saved_store.load_snapshot_by_id(meta["file_id"])
+        except Exception:
+            continue
+        batch.append((meta["file_id"], snap, meta["saved_at"]))
+        if len(batch) >= _BUILD_BATCH:
+            _index_batch(conn, "saved", batch)
+            batch.clear()
+    _index_batch(conn, "saved", batch)
+    batch.clear()
+
+    for rec in storage.iter_saved():
+        batch.append((str(rec.get("id", "")), rec, str(rec.get("saved_at", ""))))
+        if len(batch) >= _BUILD_BATCH:
+            _index_batch(conn, "history", batch)
+            batch.clear()
+    _index_batch(conn, "history", batch)
+
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('built', '1')")
+
+
+def _connect() -> sqlite3.Connection:
+    path = _db_path()
+    conn = sqlite3.connect(path, timeout=30)
+    key = str(path)
+    if key not in _initialized:
+        with _init_lock:
+            if key not in _initialized:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(_SCHEMA)
+                if conn.execute("SELECT 1 FROM meta WHERE key = 'built'").fetchone() is None:
+                    _build(conn)
+                _initialized.add(key)
+    return conn
+
+
+def rebuild() -> None:
+    """
+    Re-indexes both stores from scratch (and reclaims the file space freed by sweeps).
+    """
+    with closing(_connect()) as conn:
+        _build(conn)
+        conn.execute("VACUUM")
+
+
+def mark_stale() -> None:
+    # next open rebuilds from the stores
+    try:
+        with closing(sqlite3.connect(_db_path(), timeout=30)) as conn, conn:
+            conn.execute("DELETE FROM meta WHERE key = 'built'")
+    except Exception:
+        pass
+    _initialized.discard(str(_db_path()))
+
+
+# -----------------------------
+# Incremental updates (called by saved_store / storage)
+# -----------------------------
+def index_snapshots(source: str, items: Iterable[tuple[str, Any, str]]) -> None:
+    """
+    Adds or replaces documents: items are (ref, snapshot, saved_at).
+    Never raises — a failed update marks the index for a rebuild instead of failing the save.
+    """
+    try:
+        with closing(_connect()) as conn:
+            _index_batch(conn, source, items)
+    except Exception:
+        mark_stale()
+
+
+def remove(source: str, refs: Iterable[str]) -> None:
+    try:
+        with closing(_connect()) as conn, conn:
+            if _kill(conn, source, refs):
+                _maybe_sweep(conn)
+    except Exception:
+        mark_stale()
+
+
+# -----------------------------
+# Query
+# -----------------------------
+def _expand(conn: sqlite3.Connection, source: str, token: str, prefix: bool) -> list[str]:
+    if not prefix:
+        return [token]
+    rows = conn.execute(
+        "SELECT DISTINCT term FROM postings WHERE source = ? AND term >= ? AND term < ? LIMIT ?",
+        (source, token, token + "\U0010ffff", MAX_PREFIX_TERMS),
+    ).fetchall()
+    return [r[0] for r in rows]
+
+
+def _rank_source(conn: sqlite3.Connection, source: str, tokens: list[str], k: int) -> tuple[int, list[tuple[float, int]]]:
+    """
+    (match count, top-k [(score, doc_id)]) for one source. Every token must match (AND);
+    the last token also matches as a prefix. Score = sum over terms of weight * idf.
+    """
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (f"live_{source}",)).fetchone()
+    n_docs = int(row[0]) if row else 0
+    if n_docs <= 0:
+        return 0, []
+    size = int(conn.execute("SELECT MAX(doc_id) FROM docs").fetchone()[0]) + 1
+
+    total = np.zeros(size, dtype=np.float32)
+    matched: np.ndarray | None = None
+    for i, tok in enumerate(tokens):
+        terms = _expand(conn, source, tok, prefix=i == len(tokens) - 1)
+        tok_hit = np.zeros(size, dtype=bool)
+        for term in terms:
+            rows = conn.execute(
+                "SELECT doc_ids, weights FROM postings WHERE source = ? AND term = ?", (source, term)
+            ).fetchall()
+            if not rows:
+                continue
+            ids = np.concatenate([np.frombuffer(r[0], dtype=np.int32) for r in rows])
+            ws = np.concatenate([np.frombuffer(r[1], dtype=np.float32) for r in rows])
+            idf = math.log(1.0 + n_docs / ids.size)
+            # a doc occurs at most once in a term's postings, so fancy-index += is a scatter-add
+            total[ids] += ws * idf
+            tok_hit[ids] = True
+        matched = tok_hit if matched is None else (matched & tok_hit)
+        if not matched.any():
+            return 0, []
+
+    dead = _dead_ids(conn, source)
+    if dead.size:
+        matched[dead[dead < size]] = False
+
+    cand = np.flatnonzero(matched)
+    if not cand.size:
+        return 0, []
+    scores = total[cand]
+    if cand.size > k:
+        part = np.argpartition(-scores, k - 1)[:k]
+        cand, scores = cand[part], scores[part]
+    # best score first; ties go to the newest document
+    order = np.lexsort((-cand, -scores))
+    return int(matched.sum()), [(float(scores[j]), int(cand[j])) for j in order]
+
+
+def query(
+    text: str,
+    *,
+    limit: int = 20,
+    offset: int = 0,
+    sources: Iterable[str] = SOURCES,
+) -> tuple[int, list[dict[str, Any]]]:
+    """
+    (total matches, ranked hits) where each hit is
+    {"source", "ref", "title", "category", "options", "saved_at", "score"}.
+    """
+    tokens = list(dict.fromkeys(tokenize(text)))
+    srcs = [s for s in dict.fromkeys(sources) if s in SOURCES]
+    if not tokens or not srcs:
+        return 0, []
+
+    k = max(0, int(offset)) + max(0, int(limit))
+    with closing(_connect()) as conn:
+        # one read snapshot for ranking + lookup: a sweep in another process renumbers doc ids
+        conn.execute("BEGIN")
+        total = 0
+        ranked: list[tuple[float, int]] = []
+        for src in srcs:
+            n, top = _rank_source(conn, src, tokens, k)
+            total += n
+            ranked.extend(top)
+        ranked.sort(key=lambda t: (-t[0], -t[1]))
+        page = ranked[max(0, int(offset)):k]
+        if not page:
+            return total, []
+
+        ids = [doc_id for _, doc_id in page]
+        rows = conn.execute(
+            f"SELECT doc_id, source, ref, title, category, options, saved_at FROM docs "
+            f"WHERE doc_id IN ({', '.join('?' * len(ids))})",
+            ids,
+        ).fetchall()
+
+    by_id = {r[0]: r for r in rows}
+    hits = []
+    for score, doc_id in page:
+        _, source, ref, title, category, options, saved_at = by_id[doc_id]
+        hits.append(
+            {
+                "source": source,
+                "ref": ref,
+                "title": title or "Untitled",
+                "category": category,
+                "options": options,
+                "saved_at": saved_at,
+                "score": round(score, 4),
+            }
+        )
+    return total, hits
+
+
+def search(text: str, *, limit: int = 20, offset: int = 0, sources: Iterable[str] = SOURCES) -> list[dict[str, Any]]:
+    return query(text, limit=limit, offset=offset, sources=sources)[1]
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Search saved decisions.")
+    ap.add_argument("query", nargs="?", default="")
+    ap.add_argument("-n", "--limit", type=int, default=20)
+    ap.add_argument("--source", action="append", choices=SOURCES, help="default: both")
+    ap.add_argument("--rebuild", action="store_true", help="re-index both stores from scratch")
+    args = ap.parse_args(argv)
+
+    if args.rebuild:
+        rebuild()
+    if args.query:
+        total, hits = query(args.query, limit=args.limit, sources=args.source or SOURCES)
+        for hit in hits:
+            print(f"{hit['score']:8.3f}  [{hit['source']}] {hit['title']}  ({hit['ref']})")
+        print(f"{total} match(es)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,258 @@
+# src/service.py
+"""
+Small asyncio HTTP/1.1 JSON service exposing the decision engine (no Streamlit import).
+
+    python src/service.py --port 8765
+
+Endpoints (POST bodies use the state.snapshot_current() schema):
+    GET  /health
+    POST /check     boundary check only
+    POST /score     category scores only
+    POST /compare   boundary check + scores + verdict
+    GET  /export    full history as JSONL or CSV, streamed with chunked encoding
+                    (?format=jsonl|csv&category=...&from=YYYY-MM-DD&to=YYYY-MM-DD&source=history|saved)
+
+A body may be one snapshot, a JSON array of snapshots, or {"snapshots": [...]}.
+Batched requests answer {"results": [...]} with one entry per snapshot; a bad snapshot
+yields {"ok": false, "error": ...} in its slot instead of failing the whole batch.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+from typing import Any, Callable, Iterator
+from urllib.parse import parse_qs, urlsplit
+
+import engine
+import export
+from snapshots import decode_snapshot, unwrap_record
+
+MAX_BODY_BYTES = 8 * 1024 * 1024
+MAX_HEADER_LINES = 100
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+_ENDPOINTS: dict[str, Callable[..., dict]] = {
+    "/check": engine.check,
+    "/score": engine.score,
+    "/compare": engine.evaluate,
+}
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+# -----------------------------
+# Evaluation
+# -----------------------------
+def _evaluate_one(fn: Callable[..., dict], snap: Any) -> dict:
+    try:
+        decision, options = decode_snapshot(unwrap_record(snap))
+        return {"ok": True, **fn(decision, options)}
+    except Exception as e:
+        return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+
+def handle_payload(path: str, payload: Any) -> dict:
+    fn = _ENDPOINTS.get(path)
+    if fn is None:
+        raise HttpError(404, f"Unknown endpoint '{path}'.")
+
+    if isinstance(payload, list):
+        return {"results": [_evaluate_one(fn, s) for s in payload]}
+    if isinstance(payload, dict) and isinstance(payload.get("snapshots"), list):
+        return {"results": [_evaluate_one(fn, s) for s in payload["snapshots"]]}
+    if isinstance(payload, dict):
+        return _evaluate_one(fn, payload)
+    raise HttpError(400, "Body must be a snapshot object, an array, or {\"snapshots\": [...]}.")
+
+
+# -----------------------------
+# HTTP plumbing
+# -----------------------------
+def _response(status: int, body: dict, *, keep_alive: bool) -> bytes:
+    data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {_REASONS.get(status, 'OK')}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(data)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "\r\n"
+    )
+    return head.encode("latin-1") + data
+
+
+async def _stream_export(writer: asyncio.StreamWriter, query: str, *, keep_alive: bool) -> None:
+    """
+    Streams export.iter_export() as a chunked response. The generator does blocking
+    file/SQLite reads, so each chunk is pulled on a worker thread.
+    """
+    q = parse_qs(query)
+    fmt = (q.get("format") or ["jsonl"])[0]
+    if fmt not in export.FORMATS:
+        raise HttpError(400, f"Unknown format '{fmt}'.")
+    try:
+        flt = export.ExportFilter.build(
+            q.get("category", []),
+            (q.get("from") or [None])[0],
+            (q.get("to") or [None])[0],
+            q.get("source") or export.SOURCES,
+        )
+    except ValueError as e:
+        raise HttpError(400, str(e))
+
+    head = (
+        "HTTP/1.1 200 OK\r\n"
+        f"Content-Type: {export.content_type(fmt)}\r\n"
+        f'Content-Disposition: attachment; filename="decisions.{fmt}"\r\n'
+        "Transfer-Encoding: chunked\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "\r\n"
+    )
+    writer.write(head.encode("latin-1"))
+
+    chunks: Iterator[bytes] = export.iter_export(fmt, flt)
+    try:
+        while True:
+            chunk = await asyncio.to_thread(next, chunks, None)
+            if chunk is None:
+                break
+            writer.write(f"{len(chunk):x}\r\n".encode("latin-1") + chunk + b"\r\n")
+            # backpressure: a slow client pauses the generator instead of buffering the dump
+            await writer.drain()
+    except Exception as e:
+        # headers are already out; dropping the connection without the final
+        # zero-length chunk tells the client the dump is incomplete
+        raise ConnectionError(f"export aborted: {e}") from e
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+
+
+async def _read_request(reader: asyncio.StreamReader) -> tuple[str, str, str, dict[str, str], bytes] | None:
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, version = line.decode("latin-1").split()
+    except ValueError:
+        raise HttpError(400, "Malformed request line.")
+
+    headers: dict[str, str] = {}
+    for _ in range(MAX_HEADER_LINES):
+        h = await reader.readline()
+        if h in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = h.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    else:
+        raise HttpError(400, "Too many headers.")
+
+    body = b""
+    if method == "POST":
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise HttpError(411, "Send a Content-Length body.")
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise HttpError(400, "Invalid Content-Length.")
+        if length < 0:
+            raise HttpError(400, "Invalid Content-Length.")
+        if length > MAX_BODY_BYTES:
+            raise HttpError(413, f"Body exceeds {MAX_BODY_BYTES} bytes.")
+        body = await reader.readexactly(length) if length else b""
+
+    return method, target, version, headers, body
+
+
+def _wants_keep_alive(version: str, headers: dict[str, str]) -> bool:
+    conn = headers.get("connection", "").lower()
+    if version == "HTTP/1.0":
+        return conn == "keep-alive"
+    return conn != "close"
+
+
+async def _handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while True:
+            keep_alive = False
+            try:
+                req = await _read_request(reader)
+                if req is None:
+                    break
+                method, target, version, headers, body = req
+                keep_alive = _wants_keep_alive(version, headers)
+                url = urlsplit(target)
+                path = url.path
+
+                if path == "/health":
+                    status, out = 200, {"ok": True}
+                elif path == "/export":
+                    if method != "GET":
+                        raise HttpError(405, "Use GET.")
+                    await _stream_export(writer, url.query, keep_alive=keep_alive)
+                    if not keep_alive:
+                        break
+                    continue
+                elif method != "POST":
+                    raise HttpError(405, "Use POST.")
+                else:
+                    try:
+                        payload = json.loads(body or b"null")
+                    except ValueError as e:
+                        raise HttpError(400, f"Invalid JSON: {e}")
+                    status, out = 200, handle_payload(path, payload)
+            except HttpError as e:
+                # after an error the rest of the request (e.g. an unread body) may still be
+                # on the socket, so never parse another request from this connection
+                status, out = e.status, {"ok": False, "error": str(e)}
+                keep_alive = False
+            except asyncio.IncompleteReadError:
+                break
+            except Exception as e:
+                status, out = 500, {"ok": False, "error": f"{type(e).__name__}: {e}"}
+                keep_alive = False
+
+            writer.write(_response(status, out, keep_alive=keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host: str, port: int) -> None:
+    server = await asyncio.start_server(_handle_connection, host, port)
+    addrs = ", ".join(str(s.getsockname()) for s in server.sockets)
+    print(f"decision engine listening on {addrs}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Local HTTP service for the decision engine.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    args = ap.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,240 @@
+# src/session_store.py
+"""
+Shared session-state backends (no Streamlit import).
+
+The decision being edited is kept under a session key (the `sid` query parameter), so a
+browser reload, a server restart or a different replica behind a load balancer picks up
+where the user left off. Values are snapshot dicts (the snapshots.py schema).
+
+    MemoryStore  per-process dict (default; survives reloads, not restarts)
+    SQLiteStore  one WAL-mode SQLite file; replicas that mount the same data/ dir share it
+
+Pick one with LDT_SESSION_STORE ("memory", "sqlite" or "sqlite:<path>"). Writes go through
+a write-behind queue (autosave.Autosaver with a batch writer): edits are coalesced per
+session, and every session due at the same moment is written in one transaction.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Iterable
+
+import autosave
+
+ENV_VAR = "LDT_SESSION_STORE"
+
+# write-behind timing: short, since this is what a reconnect or a failover would see
+FLUSH_DEBOUNCE_SECONDS = 0.25
+FLUSH_MIN_INTERVAL_SECONDS = 1.0
+
+# sessions untouched this long are dropped by purge() (at start, then from the write-behind
+# worker every PURGE_INTERVAL_SECONDS); in-process memory is far scarcer than disk
+SESSION_TTL_SECONDS = 30 * 24 * 3600
+MEMORY_TTL_SECONDS = 6 * 3600
+PURGE_INTERVAL_SECONDS = 10 * 60
+
+# session keys come from the URL: anything not shaped like new_session_id() is ignored
+_SESSION_ID = re.compile(r"^[0-9a-f]{32}$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    sid        TEXT PRIMARY KEY,
+    snapshot   TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_by_updated_at ON sessions (updated_at);
+"""
+
+
+def new_session_id() -> str:
+    return uuid.uuid4().hex
+
+
+def is_session_id(value: Any) -> bool:
+    return isinstance(value, str) and _SESSION_ID.match(value) is not None
+
+
+def _default_sqlite_path() -> Path:
+    return Path(__file__).resolve().parents[1] / "data" / "sessions.sqlite3"
+
+
+# -----------------------------
+# Backends
+# -----------------------------
+class SessionStore:
+    """
+    Backend interface: load one session, write many.
+    """
+
+    ttl: float = SESSION_TTL_SECONDS
+
+    def load(self, sid: str) -> dict[str, Any] | None:
+        raise NotImplementedError
+
+    def save_many(self, items: Iterable[tuple[str, dict[str, Any]]]) -> None:
+        raise NotImplementedError
+
+    def delete(self, sid: str) -> None:
+        raise NotImplementedError
+
+    def purge(self, older_than: float | None = None) -> int:
+        raise NotImplementedError
+
+
+class MemoryStore(SessionStore):
+    ttl = MEMORY_TTL_SECONDS
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._items: dict[str, tuple[str, float]] = {}
+
+    def load(self, sid: str) -> dict[str, Any] | None:
+        with self._lock:
+            found = self._items.get(sid)
+        # stored serialized, so callers can never share (and mutate) a stored dict
+        return None if found is None else json.loads(found[0])
+
+    def save_many(self, items: Iterable[tuple[str, dict[str, Any]]]) -> None:
+        now = time.time()
+        encoded = [(sid, json.dumps(snap, ensure_ascii=False)) for sid, snap in items]
+        with self._lock:
+            for sid, raw in encoded:
+                self._items[sid] = (raw, now)
+
+    def delete(self, sid: str) -> None:
+        with self._lock:
+            self._items.pop(sid, None)
+
+    def purge(self, older_than: float | None = None) -> int:
+        cutoff = time.time() - (self.ttl if older_than is None else older_than)
+        with self._lock:
+            stale = [sid for sid, (_, t) in self._items.items() if t < cutoff]
+            for sid in stale:
+                del self._items[sid]
+        return len(stale)
+
+
+class SQLiteStore(SessionStore):
+    def __init__(self, path: Path | str | None = None) -> None:
+        self.path = Path(path) if path else _default_sqlite_path()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.executescript(_SCHEMA)
+                    self._initialized = True
+        # WAL + NORMAL: commits don't fsync; a power cut can lose the last flush, never corrupt
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def load(self, sid: str) -> dict[str, Any] | None:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT snapshot FROM sessions WHERE sid = ?", (sid,)).fetchone()
+        if row is None:
+            return None
+        try:
+            snap = json.loads(row[0])
+        except json.JSONDecodeError:
+            return None
+        return snap if isinstance(snap, dict) else None
+
+    def save_many(self, items: Iterable[tuple[str, dict[str, Any]]]) -> None:
+        now = time.time()
+        rows = [(sid, json.dumps(snap, ensure_ascii=False), now) for sid, snap in items]
+        if not rows:
+            return
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT INTO sessions (sid, snapshot, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (sid) DO UPDATE SET snapshot = excluded.snapshot, updated_at = excluded.updated_at",
+                rows,
+            )
+
+    def delete(self, sid: str) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+
+    def purge(self, older_than: float | None = None) -> int:
+        cutoff = time.time() - (self.ttl if older_than is None else older_than)
+        with closing(self._connect()) as conn, conn:
+            return conn.execute("DELETE FROM sessions WHERE updated_at < ?", (cutoff,)).rowcount
+
+
+def from_env(value: str | None = None) -> SessionStore:
+    """
+    Backend named by LDT_SESSION_STORE (or value): "memory" (default), "sqlite", "sqlite:<path>".
+    """
+    spec = (os.environ.get(ENV_VAR, "") if value is None else value).strip()
+    kind, _, arg = spec.partition(":")
+    if kind in ("", "memory"):
+        return MemoryStore()
+    if kind == "sqlite":
+        return SQLiteStore(arg or None)
+    raise ValueError(f"Unknown {ENV_VAR}: {spec!r} (expected memory, sqlite or sqlite:<path>)")
+
+
+# -----------------------------
+# Write-behind front end
+# -----------------------------
+class SessionSync:
+    """
+    What state.py talks to: load() once when a session starts, save() after every run
+    (queued; see module docstring), flush() on shutdown.
+    """
+
+    def __init__(self, store: SessionStore) -> None:
+        self.store = store
+        self._queue = autosave.Autosaver(
+            batch_writer=self._write,
+            debounce=FLUSH_DEBOUNCE_SECONDS,
+            min_interval=FLUSH_MIN_INTERVAL_SECONDS,
+        )
+        self._purged_at = 0.0
+        self._purge()
+
+    def _purge(self) -> None:
+        self._purged_at = time.monotonic()
+        try:
+            self.store.purge()
+        except Exception:
+            # a store that is down is handled per call (see load); retried next interval
+            pass
+
+    def _write(self, items: Iterable[tuple[str, dict[str, Any]]]) -> None:
+        # runs on the write-behind worker, so expiry never costs a page run
+        self.store.save_many(items)
+        if time.monotonic() - self._purged_at >= PURGE_INTERVAL_SECONDS:
+            self._purge()
+
+    def load(self, sid: str) -> dict[str, Any] | None:
+        queued = self._queue.latest(sid)
+        if queued is not None:
+            # a reload within the flush window: the newest state hasn't reached the store yet
+            return queued
+        try:
+            return self.store.load(sid)
+        except Exception:
+            # an unreachable store must not take the app down: start from defaults
+            return None
+
+    def save(self, sid: str, snapshot: dict[str, Any]) -> None:
+        self._queue.submit(sid, snapshot)
+
+    def flush(self, timeout: float | None = None) -> bool:
+        return self._queue.flush(timeout)
+
+    def stats(self) -> dict[str, Any]:
+        return {"backend": type(self.store).__name__, "writes": self._queue.writes, "failures": self._queue.failures}
@@ -0,0 +1,372 @@
+# src/snapshots.py
+from __future__ import annotations
+
+import dataclasses
+from datetime import datetime
+from typing import Any, Callable, Dict, Mapping, get_type_hints
+
+from models import (
+    MAX_OPTIONS,
+    MIN_OPTIONS,
+    OPTION_KEYS,
+    Decision,
+    Limits,
+    OptionInput,
+    Risk,
+    default_option_name,
+    next_option_key,
+    next_version,
+)
+
+# Snapshot <-> model conversion, shared by the Streamlit state layer and headless tooling.
+# Snapshot schema (v0.1):
+#   {"version", "saved_at", "decision": {"title", "category", "limits": {...}},
+#    "options": {"opt_a": {...}, "opt_b": {...}, ...}}
+
+
+def _safe_int(v: Any, default: int) -> int:
+    try:
+        return int(v)
+    except Exception:
+        return default
+
+
+def _criteria_safe(c: Any) -> dict[str, int]:
+    # Ensure criteria is JSON-safe {str:int}
+    if not isinstance(c, dict):
+        return {}
+    out: dict[str, int] = {}
+    for k, v in c.items():
+        if k is None:
+            continue
+        out[str(k)] = _safe_int(v, 0)
+    return out
+
+
+# -----------------------------
+# Encode
+# -----------------------------
+def _option_snapshot(opt: OptionInput) -> dict:
+    return {
+        "name": opt.name,
+        "money_at_risk_usd": _safe_int(getattr(opt, "money_at_risk_usd", 1000), 1000),
+        "time_required_hours_per_week": _safe_int(getattr(opt, "time_required_hours_per_week", 10), 10),
+        "stress_fit": getattr(opt.stress_fit, "value", "Medium"),
+        "relationships_impact": getattr(opt.relationships_impact, "value", "Medium"),
+        "summary": getattr(opt, "summary", "") or "",
+        "criteria": _criteria_safe(getattr(opt, "criteria", {}) or {}),
+    }
+
+
+def encode_snapshot(decision: Decision, options: Mapping[str, OptionInput]) -> dict:
+    """
+    Serialize a decision + options into a JSON-safe snapshot.
+    Options are keyed by their stable option key ("opt_a", "opt_b", ...).
+    """
+    d = decision
+    lim = d.limits
+
+    return {
+        "version": "0.1",
+        "saved_at": datetime.now().isoformat(timespec="seconds"),
+        "decision": {
+            "title": d.title,
+            "category": d.category,
+            "limits": {
+                "money_max_usd": _safe_int(getattr(lim, "money_max_usd", 1000), 1000),
+                "time_hours_per_week": _safe_int(getattr(lim, "time_hours_per_week", 10), 10),
+                "stress": getattr(lim.stress, "value", "Medium"),
+                "relationships": getattr(lim.relationships, "value", "Medium"),
+                "confirmed": bool(getattr(lim, "confirmed", False)),
+            },
+        },
+        "options": {key: _option_snapshot(opt) for key, opt in options.items()},
+    }
+
+
+# -----------------------------
+# Decode (compiled schema)
+# -----------------------------
+# Field decoders are compiled once, at import, from the dataclass definitions in models.py:
+# each model field maps to a snapshot key of the same name plus a coercer picked by the
+# field's type. Decoding is then one flat loop per model, and instances are filled in
+# directly (no per-field Tracked.__setattr__ round trips).
+#
+# Lenient mode (default) keeps the historical behavior: anything missing or unusable falls
+# back to the field default. Strict mode applies the same rules but records every problem
+# and raises SnapshotError listing all of them.
+
+
+class SnapshotError(ValueError):
+    def __init__(self, errors: list[str]) -> None:
+        self.errors = errors
+        shown = "; ".join(errors[:10])
+        more = f" (+{len(errors) - 10} more)" if len(errors) > 10 else ""
+        super().__init__(f"{len(errors)} problem(s) in snapshot: {shown}{more}")
+
+
+_RISK_BY_VALUE: dict[str, Risk] = {r.value: r for r in Risk}
+_RISK_CHOICES = "/".join(_RISK_BY_VALUE)
+CRITERIA_RANGE = (0, 10)
+
+# Coercer signature: (value, default, errors, path) -> value
+# `errors` is None in lenient mode, so the happy path never builds messages.
+Coercer = Callable[[Any, Any, "list[str] | None", str], Any]
+
+
+def _coerce_int(v: Any, default: int, errors: list[str] | None, path: str) -> int:
+    if type(v) is int:
+        if errors is not None and v < 0:
+            errors.append(f"{path}: must be >= 0, got {v}")
+        return v
+    if errors is None:
+        try:
+            return int(v)
+        except Exception:
+            return default
+    if isinstance(v, float) and v.is_integer() and v >= 0:
+        return int(v)
+    errors.append(f"{path}: expected a non-negative integer, got {v!r}")
+    return default
+
+
+def _coerce_risk(v: Any, default: Risk, errors: list[str] | None, path: str) -> Risk:
+    r = _RISK_BY_VALUE.get(v) if isinstance(v, str) else None
+    if r is not None:
+        return r
+    if errors is not None:
+        errors.append(f"{path}: expected one of {_RISK_CHOICES}, got {v!r}")
+    return default
+
+
+def _coerce_bool(v: Any, default: bool, errors: list[str] | None, path: str) -> bool:
+    if type(v) is bool:
+        return v
+    if errors is not None:
+        errors.append(f"{path}: expected true/false, got {v!r}")
+        return default
+    return bool(v)
+
+
+def _coerce_str(v: Any, default: str, errors: list[str] | None, path: str) -> str:
+    if isinstance(v, str):
+        return v.strip() or default
+    if errors is not None:
+        errors.append(f"{path}: expected a string, got {type(v).__name__}")
+        return default
+    return str(v).strip() or default
+
+
+def _coerce_text(v: Any, default: str, errors: list[str] | None, path: str) -> str:
+    # free text (option summary): kept exactly as written, whitespace included
+    if isinstance(v, str):
+        return v or default
+    if errors is not None:
+        errors.append(f"{path}: expected a string, got {type(v).__name__}")
+        return default
+    return v or default
+
+
+def _coerce_criteria(v: Any, default: dict, errors: list[str] | None, path: str) -> dict[str, int]:
+    if not isinstance(v, dict):
+        if errors is not None:
+            errors.append(f"{path}: expected an object of scores, got {type(v).__name__}")
+        return default
+    if errors is None:
+        # common case: already {str: int}
+        for k, score in v.items():
+            if type(score) is not int or type(k) is not str:
+                return _criteria_safe(v)
+        return dict(v)
+
+    lo, hi = CRITERIA_RANGE
+    out: dict[str, int] = {}
+    for k, score in v.items():
+        if type(score) is not int or not lo <= score <= hi:
+            errors.append(f"{path}.{k}: expected an integer {lo}-{hi}, got {score!r}")
+            continue
+        out[str(k)] = score
+    return out
+
+
+_COERCERS: dict[Any, Coercer] = {
+    int: _coerce_int,
+    Risk: _coerce_risk,
+    bool: _coerce_bool,
+    str: _coerce_str,
+    Dict[str, int]: _coerce_criteria,
+}
+
+
+# Inline fast paths (condition, value) emitted into the compiled decoders, so values that
+# are already valid never pay for a coercer call. `{d}` is the field's default.
+_FAST_PATHS: dict[Coercer, tuple[str, str]] = {
+    _coerce_int: ("lenient and type(v) is int", "v"),
+    _coerce_bool: ("type(v) is bool", "v"),
+    _coerce_risk: ("type(v) is str and v in RISK", "RISK[v]"),
+    _coerce_str: ("type(v) is str", "v.strip() or {d}"),
+    _coerce_text: ("type(v) is str", "v or {d}"),
+}
+
+
+class _ModelSchema:
+    """
+    Decoder for one Tracked dataclass, compiled once from its field list and type hints
+    (fields listed in `skip` are left to the caller and passed to build() as keywords;
+    `coercers` overrides the per-type coercer for individual fields).
+
+    The generated build(raw, errors, path, **extra) is one straight-line function per model,
+    the same technique dataclasses uses for __init__.
+    """
+
+    def __init__(self, cls: type, skip: tuple[str, ...] = (), coercers: Mapping[str, Coercer] | None = None) -> None:
+        hints = get_type_hints(cls)
+        self.cls = cls
+        env: dict[str, Any] = {
+            "cls": cls,
+            "new": object.__new__,
+            "set_attr": object.__setattr__,
+            "next_version": next_version,
+            "RISK": _RISK_BY_VALUE,
+        }
+        body = ["    get = raw.get", "    lenient = errors is None"]
+        slots: list[int] = []
+        for i, f in enumerate(dataclasses.fields(cls)):
+            if f.name in skip:
+                continue
+            coerce = (coercers or {}).get(f.name) or _COERCERS[hints[f.name]]
+            env[f"C{i}"] = coerce
+            if f.default_factory is not dataclasses.MISSING:
+                env[f"F{i}"] = f.default_factory
+                default = f"F{i}()"
+            else:
+                env[f"D{i}"] = f.default if f.default is not dataclasses.MISSING else ""
+                default = f"D{i}"
+            body += [
+                f"    v = get({f.name!r})",
+                "    if v is None:",
+                f"        f{i} = {default}",
+            ]
+            fast = _FAST_PATHS.get(coerce)
+            if fast is not None:
+                body += [f"    elif {fast[0]}:", f"        f{i} = {fast[1].format(d=default)}"]
+            body += [
+                "    else:",
+                f"        f{i} = C{i}(v, {default}, errors, '' if lenient else path + {'.' + f.name!r})",
+            ]
+            env[f"S{i}"] = getattr(cls, f.name).__set__
+            slots.append(i)
+
+        # Same end state as cls(**values), without the per-field change-tracking overhead.
+        # Models are slotted, so fields are stored through the slot descriptors directly.
+        body += ["    obj = new(cls)"]
+        body += [f"    S{i}(obj, f{i})" for i in slots]
+        body += [
+            "    for k, v in extra.items():",
+            "        set_attr(obj, k, v)",
+            "    set_attr(obj, '_version', next_version())",
+            "    return obj",
+        ]
+        src = "def build(raw, errors, path, **extra):\n" + "\n".join(body)
+        exec(compile(src, f"<snapshot decoder for {cls.__name__}>", "exec"), env)
+        self.source = src
+        self.build: Callable[..., Any] = env["build"]
+
+
+_DEFAULT_NAMES: dict[str, str] = {key: default_option_name(key) for key in OPTION_KEYS}
+
+_LIMITS = _ModelSchema(Limits)
+_DECISION = _ModelSchema(Decision, skip=("limits",))
+_OPTION = _ModelSchema(OptionInput, coercers={"summary": _coerce_text})
+
+
+def unwrap_record(obj: Any) -> Any:
+    """
+    storage.py records wrap the snapshot: {"id", "saved_at", "snapshot": {...}}.
+    """
+    if isinstance(obj, dict) and isinstance(obj.get("snapshot"), dict) and "decision" not in obj:
+        return obj["snapshot"]
+    return obj
+
+
+def _section(parent: Mapping[str, Any], key: str, errors: list[str] | None, path: str) -> dict:
+    v = parent.get(key)
+    if isinstance(v, dict):
+        return v
+    if v is not None and errors is not None:
+        errors.append(f"{path}: expected an object, got {type(v).__name__}")
+    return {}
+
+
+def _decode(snapshot: Any, errors: list[str] | None) -> tuple[Decision, Dict[str, OptionInput]]:
+    if not isinstance(snapshot, dict):
+        raise ValueError("Snapshot must be a JSON object (dict).")
+
+    # Current format
+    dec = _section(snapshot, "decision", errors, "decision")
+    opts = _section(snapshot, "options", errors, "options")
+
+    # Back-compat (if you ever change your shape)
+    if not dec and ("title" in snapshot or "category" in snapshot):
+        dec = {
+            "title": snapshot.get("title", ""),
+            "category": snapshot.get("category", ""),
+            "limits": snapshot.get("limits", {}),
+        }
+    if not opts and ("opt_a" in snapshot or "opt_b" in snapshot):
+        opts = {"opt_a": snapshot.get("opt_a", {}), "opt_b": snapshot.get("opt_b", {})}
+
+    limits = _LIMITS.build(_section(dec, "limits", errors, "decision.limits"), errors, "decision.limits")
+    decision = _DECISION.build(dec, errors, "decision", limits=limits)
+
+    if errors is not None and len(opts) > MAX_OPTIONS:
+        errors.append(f"options: at most {MAX_OPTIONS} options are supported, got {len(opts)}")
+
+    # Re-key options in snapshot order so keys stay valid widget prefixes
+    options: Dict[str, OptionInput] = {}
+    for key, (src_key, raw) in zip(OPTION_KEYS, opts.items()):
+        path = f"options.{src_key}"
+        if not isinstance(raw, dict):
+            if errors is not None:
+                errors.append(f"{path}: expected an object, got {type(raw).__name__}")
+            raw = {}
+        opt = _OPTION.build(raw, errors, path)
+        if not opt.name:
+            object.__setattr__(opt, "name", _DEFAULT_NAMES[key])
+        options[key] = opt
+    while len(options) < MIN_OPTIONS:
+        key = next_option_key(options)
+        options[key] = OptionInput(name=default_option_name(key))
+
+    return decision, options
+
+
+def decode_snapshot(snapshot: dict, *, strict: bool = False) -> tuple[Decision, Dict[str, OptionInput]]:
+    """
+    Build fresh model objects from a snapshot.
+    Safe defaults: missing fields won't crash. With strict=True, every invalid field is
+    collected and reported in one SnapshotError instead of being silently defaulted.
+
+    Accepts:
+    - current format: {"decision": {...}, "options": {"opt_a": {...}, "opt_b": {...}, ...}}
+    - mildly older/flattened formats (best effort)
+    """
+    if not strict:
+        return _decode(snapshot, None)
+    errors: list[str] = []
+    out = _decode(snapshot, errors)
+    if errors:
+        raise SnapshotError(errors)
+    return out
+
+
+def validate_snapshot(snapshot: Any) -> list[str]:
+    """
+    Strict-mode problems for a snapshot (empty list = clean). Never raises.
+    """
+    errors: list[str] = []
+    try:
+        _decode(snapshot, errors)
+    except ValueError as e:
+        errors.append(str(e))
+    return errors
@@ -1,24 +1,79 @@
 # src/state.py
 from __future__ import annotations
 
-import json
-import re
+import atexit
+import time
+import uuid
 from dataclasses import asdict
 from datetime import datetime
-from pathlib import Path
-from typing import Any
 
 import streamlit as st
 
+import analytics
+import autosave
+import memsize
+import models
+import saved_store
+import search
+import session_store
+import snapshots
+import storage
+import undo
+import versions
+from engine import SHARED_RESULTS, Board, CompareResult, ResultCache, decision_key
 from models import Decision, Limits, OptionInput, Risk
 
 # -----------------------------
 # Persistence config
 # -----------------------------
-# Saves will land at: <project_root>/data/saved_decisions/*.json
-# Works locally + Streamlit Community Cloud (note: cloud storage may be ephemeral on redeploy).
-ROOT = Path(__file__).resolve().parents[1]
-SAVE_DIR = ROOT / "data" / "saved_decisions"
+# See saved_store.py (<project_root>/data/saved_decisions/*.json)
+ROOT = saved_store.ROOT
+SAVE_DIR = saved_store.SAVE_DIR
+
+
+# -----------------------------
+# Options
+# -----------------------------
+MIN_OPTIONS = models.MIN_OPTIONS
+MAX_OPTIONS = models.MAX_OPTIONS
+default_option_name = models.default_option_name
+
+SESSION_RESULT_CACHE_SIZE = 32
+
+# Undo/redo cap per session (see undo.Timeline); oldest steps are dropped first
+UNDO_MAX_STEPS = undo.DEFAULT_MAX_STEPS
+UNDO_MAX_BYTES = undo.DEFAULT_MAX_BYTES
+
+# Keyed edit widgets (screens/constraints.py, screens/options.py). Widgets keep their own
+# value under these keys, so they must be cleared for an undo/redo to show up in them.
+LIMIT_WIDGET_KEYS = ("lim_money", "lim_time", "lim_stress", "lim_rel", "lim_confirmed")
+OPTION_WIDGET_SUFFIXES = ("name", "money", "time", "stress", "rel", "summary")
+
+# Background autosave into saved_store.DRAFT_DIR (see autosave.py): one worker thread for all sessions
+AUTOSAVE_SLUG = "autosave"
+DRAFT_PURGE_INTERVAL_SECONDS = 10 * 60
+_drafts_purged_at = 0.0
+
+
+def _write_draft(file_id: str, snap: dict) -> None:
+    # runs on the autosave worker, so expiring abandoned drafts never costs a page run
+    global _drafts_purged_at
+    saved_store.put_draft(file_id, snap)
+    if time.monotonic() - _drafts_purged_at >= DRAFT_PURGE_INTERVAL_SECONDS:
+        _drafts_purged_at = time.monotonic()
+        try:
+            saved_store.purge_drafts()
+        except OSError:
+            pass
+
+
+_AUTOSAVER = autosave.Autosaver(_write_draft)
+atexit.register(_AUTOSAVER.flush, 5.0)
+
+# Shared session backend (see session_store.py; LDT_SESSION_STORE picks memory or sqlite)
+SESSION_PARAM = "sid"
+_SESSIONS = session_store.SessionSync(session_store.from_env())
+atexit.register(_SESSIONS.flush, 5.0)
 
 
 def init_state() -> None:
@@ -26,15 +81,52 @@ def init_state() -> None:
     if "page" not in st.session_state:
         st.session_state.page = "Home"
 
+    # session key (kept in the URL, so a reload or another replica finds the same state)
+    if "sid" not in st.session_state:
+        sid = st.query_params.get(SESSION_PARAM)
+        if not session_store.is_session_id(sid):
+            # never trust a hand-made key: it could name (or flood the store with) other sessions
+            sid = session_store.new_session_id()
+        st.query_params[SESSION_PARAM] = sid
+        st.session_state.sid = sid
+        _hydrate(sid)
+
     # core decision object
     if "decision" not in st.session_state:
         st.session_state.decision = Decision()
 
-    # options
-    if "opt_a" not in st.session_state:
-        st.session_state.opt_a = OptionInput(name="Option A")
-    if "opt_b" not in st.session_state:
-        st.session_state.opt_b = OptionInput(name="Option B")
+    # stable identity of the decision being edited: re-saves become versions of it (versions.py)
+    if "decision_id" not in st.session_state:
+        st.session_state.decision_id = versions.new_decision_id()
+
+    # change stamp for the option *set* (add/remove/replace); field edits are tracked on the models
+    if "options_rev" not in st.session_state:
+        st.session_state.options_rev = models.next_version()
+
+    # options (insertion-ordered: key -> OptionInput)
+    if "options" not in st.session_state:
+        st.session_state.options = models.default_options()
+
+    # incremental boundary check + scoring
+    if "board" not in st.session_state:
+        st.session_state.board = Board()
+
+    # per-session compare-result LRU (backed by engine.SHARED_RESULTS)
+    if "compare_cache" not in st.session_state:
+        st.session_state.compare_cache = ResultCache(maxsize=SESSION_RESULT_CACHE_SIZE)
+
+    # undo/redo timeline (first step = the state we start from)
+    if "undo_timeline" not in st.session_state:
+        st.session_state.undo_timeline = undo.Timeline(UNDO_MAX_STEPS, UNDO_MAX_BYTES)
+        record_edit()
+
+    # autosave target (file_id, picked on the first change) + last state handed to the worker
+    if "autosave_file" not in st.session_state:
+        st.session_state.autosave_file = None
+        _mark_autosaved()
+
+    if "_persisted_version" not in st.session_state:
+        st.session_state["_persisted_version"] = state_version()
 
 
 def get_decision() -> Decision:
@@ -45,221 +137,308 @@ def get_limits() -> Limits:
     return st.session_state.decision.limits
 
 
-def get_options() -> tuple[OptionInput, OptionInput]:
-    return st.session_state.opt_a, st.session_state.opt_b
+def get_options() -> dict[str, OptionInput]:
+    return st.session_state.options
 
 
-# -----------------------------
-# Snapshot helpers
-# -----------------------------
-def _risk_from_value(v: str | None) -> Risk:
-    if not v:
-        return Risk.MEDIUM
-    for r in Risk:
-        if r.value == v:
-            return r
-    return Risk.MEDIUM
+def add_option() -> str | None:
+    """
+    Adds a blank option (up to MAX_OPTIONS) and returns its key.
+    """
+    options = get_options()
+    key = models.next_option_key(options)
+    if key is None:
+        return None
+    options[key] = OptionInput(name=default_option_name(key))
+    _bump_options()
+    return key
 
 
-def _safe_int(v: Any, default: int) -> int:
-    try:
-        return int(v)
-    except Exception:
-        return default
+def remove_option(key: str) -> None:
+    options = get_options()
+    if len(options) <= MIN_OPTIONS:
+        return
+    if options.pop(key, None) is not None:
+        _bump_options()
 
 
-def snapshot_current() -> dict:
+def _bump_options() -> None:
+    st.session_state.options_rev = models.next_version()
+
+
+def state_version() -> int:
     """
-    Serialize current session state into a JSON-safe snapshot.
+    Change stamp for the whole decision: grows whenever any tracked field, the limits,
+    or the option set changes, and stays put across no-op reruns.
+    """
+    return max(
+        get_decision().revision,
+        st.session_state.options_rev,
+        *(opt.version for opt in get_options().values()),
+    )
+
+
+def evaluate() -> Board:
+    """
+    Returns the session's Board, synced with the current decision + options.
+    Only options that changed since the last call are re-checked / re-scored.
+    """
+    return st.session_state.board.sync(get_decision(), get_options())
+
+
+def compare_result() -> CompareResult:
+    """
+    Compare result for the current decision, memoized by content hash:
+    session LRU first, then the process-wide LRU, then an incremental Board sync.
     """
     d = get_decision()
-    opt_a, opt_b = get_options()
-    lim = d.limits
-
-    # Ensure criteria is JSON-safe {str:int}
-    def _criteria_safe(c: Any) -> dict[str, int]:
-        if not isinstance(c, dict):
-            return {}
-        out: dict[str, int] = {}
-        for k, v in c.items():
-            if k is None:
-                continue
-            out[str(k)] = _safe_int(v, 0)
-        return out
+    options = get_options()
+
+    # hashing is skipped too when nothing changed since the last call
+    version = state_version()
+    cached = st.session_state.get("_compare_key")
+    if cached is not None and cached[0] == version:
+        key = cached[1]
+    else:
+        key = decision_key(d, options)
+        st.session_state["_compare_key"] = (version, key)
+
+    return st.session_state.compare_cache.get_or_compute(
+        key,
+        lambda: SHARED_RESULTS.get_or_compute(key, lambda: evaluate().result()),
+    )
+
 
+def compare_cache_stats() -> dict[str, dict]:
     return {
-        "version": "0.1",
-        "saved_at": datetime.now().isoformat(timespec="seconds"),
-        "decision": {
-            "title": d.title,
-            "category": d.category,
-            "limits": {
-                "money_max_usd": _safe_int(getattr(lim, "money_max_usd", 1000), 1000),
-                "time_hours_per_week": _safe_int(getattr(lim, "time_hours_per_week", 10), 10),
-                "stress": getattr(lim.stress, "value", "Medium"),
-                "relationships": getattr(lim.relationships, "value", "Medium"),
-                "confirmed": bool(getattr(lim, "confirmed", False)),
-            },
-        },
-        "options": {
-            "opt_a": {
-                "name": opt_a.name,
-                "money_at_risk_usd": _safe_int(getattr(opt_a, "money_at_risk_usd", 1000), 1000),
-                "time_required_hours_per_week": _safe_int(
-                    getattr(opt_a, "time_required_hours_per_week", 10), 10
-                ),
-                "stress_fit": getattr(opt_a.stress_fit, "value", "Medium"),
-                "relationships_impact": getattr(opt_a.relationships_impact, "value", "Medium"),
-                "summary": getattr(opt_a, "summary", "") or "",
-                "criteria": _criteria_safe(getattr(opt_a, "criteria", {}) or {}),
-            },
-            "opt_b": {
-                "name": opt_b.name,
-                "money_at_risk_usd": _safe_int(getattr(opt_b, "money_at_risk_usd", 1000), 1000),
-                "time_required_hours_per_week": _safe_int(
-                    getattr(opt_b, "time_required_hours_per_week", 10), 10
-                ),
-                "stress_fit": getattr(opt_b.stress_fit, "value", "Medium"),
-                "relationships_impact": getattr(opt_b.relationships_impact, "value", "Medium"),
-                "summary": getattr(opt_b, "summary", "") or "",
-                "criteria": _criteria_safe(getattr(opt_b, "criteria", {}) or {}),
-            },
-        },
+        "session": st.session_state.compare_cache.stats(),
+        "shared": SHARED_RESULTS.stats(),
     }
 
 
-def apply_snapshot(snapshot: dict) -> None:
+def session_memory() -> list[dict]:
+    """
+    Approximate bytes held by this session, per session_state key (see memsize.py).
+    Results shared with other sessions (engine.SHARED_RESULTS) are included where reachable.
     """
-    Load a snapshot into session state (in-place).
-    Safe defaults: missing fields won't crash.
+    return memsize.breakdown({key: st.session_state[key] for key in st.session_state.keys()})
 
-    Accepts:
-    - current format: {"decision": {...}, "options": {...}}
-    - mildly older/flattened formats (best effort)
+
+# -----------------------------
+# Undo / redo
+# -----------------------------
+def record_edit() -> bool:
+    """
+    Adds an undo step if anything changed since the last one (call once per run, after the page).
     """
-    if not isinstance(snapshot, dict):
-        raise ValueError("Snapshot must be a JSON object (dict).")
+    return st.session_state.undo_timeline.record(state_version(), get_decision(), get_options())
 
-    d = get_decision()
-    opt_a, opt_b = get_options()
-
-    # Current format
-    dec = snapshot.get("decision") if isinstance(snapshot.get("decision"), dict) else {}
-    opts = snapshot.get("options") if isinstance(snapshot.get("options"), dict) else {}
-
-    # Back-compat (if you ever change your shape)
-    if not dec and ("title" in snapshot or "category" in snapshot):
-        dec = {
-            "title": snapshot.get("title", ""),
-            "category": snapshot.get("category", ""),
-            "limits": snapshot.get("limits", {}),
-        }
-    if not opts and ("opt_a" in snapshot or "opt_b" in snapshot):
-        opts = {"opt_a": snapshot.get("opt_a", {}), "opt_b": snapshot.get("opt_b", {})}
-
-    d.title = (dec.get("title") or "").strip()
-    d.category = (dec.get("category") or "").strip()
-
-    lim = dec.get("limits") if isinstance(dec.get("limits"), dict) else {}
-    d.limits.money_max_usd = _safe_int(lim.get("money_max_usd", 1000), 1000)
-    d.limits.time_hours_per_week = _safe_int(lim.get("time_hours_per_week", 10), 10)
-    d.limits.stress = _risk_from_value(lim.get("stress"))
-    d.limits.relationships = _risk_from_value(lim.get("relationships"))
-    d.limits.confirmed = bool(lim.get("confirmed", False))
-
-    a = opts.get("opt_a") if isinstance(opts.get("opt_a"), dict) else {}
-    opt_a.name = (a.get("name") or "Option A").strip() or "Option A"
-    opt_a.money_at_risk_usd = _safe_int(a.get("money_at_risk_usd", 1000), 1000)
-    opt_a.time_required_hours_per_week = _safe_int(a.get("time_required_hours_per_week", 10), 10)
-    opt_a.stress_fit = _risk_from_value(a.get("stress_fit"))
-    opt_a.relationships_impact = _risk_from_value(a.get("relationships_impact"))
-    opt_a.summary = a.get("summary", "") or ""
-    opt_a.criteria = dict(a.get("criteria", {}) or {})
-
-    b = opts.get("opt_b") if isinstance(opts.get("opt_b"), dict) else {}
-    opt_b.name = (b.get("name") or "Option B").strip() or "Option B"
-    opt_b.money_at_risk_usd = _safe_int(b.get("money_at_risk_usd", 1000), 1000)
-    opt_b.time_required_hours_per_week = _safe_int(b.get("time_required_hours_per_week", 10), 10)
-    opt_b.stress_fit = _risk_from_value(b.get("stress_fit"))
-    opt_b.relationships_impact = _risk_from_value(b.get("relationships_impact"))
-    opt_b.summary = b.get("summary", "") or ""
-    opt_b.criteria = dict(b.get("criteria", {}) or {})
+
+def can_undo() -> bool:
+    return st.session_state.undo_timeline.can_undo
+
+
+def can_redo() -> bool:
+    return st.session_state.undo_timeline.can_redo
+
+
+def _restore(frame: undo.Frame | None) -> None:
+    if frame is None:
+        return
+    stale = set(get_options())
+    decision, options = undo.thaw(frame)
+    st.session_state.decision = decision
+    st.session_state.options = options
+    _bump_options()
+
+    for key in (*LIMIT_WIDGET_KEYS, *(f"{k}_{s}" for k in stale | set(options) for s in OPTION_WIDGET_SUFFIXES)):
+        st.session_state.pop(key, None)
+    st.session_state.undo_timeline.mark(state_version())
+
+
+def undo_edit() -> None:
+    """
+    Button callback (runs before widgets are created, so their keys can be cleared).
+    """
+    _restore(st.session_state.undo_timeline.undo())
+
+
+def redo_edit() -> None:
+    _restore(st.session_state.undo_timeline.redo())
+
+
+def undo_stats() -> dict:
+    return st.session_state.undo_timeline.stats()
+
+
+# -----------------------------
+# Snapshot helpers
+# -----------------------------
+# Encoding/decoding lives in snapshots.py (no Streamlit dependency) so batch tooling can share it.
+def snapshot_current() -> dict:
+    """
+    Serialize current session state into a JSON-safe snapshot.
+    Cached per state_version(); treat the returned dict as read-only.
+    """
+    version = state_version()
+    cached = st.session_state.get("_snapshot_cache")
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    snap = snapshots.encode_snapshot(get_decision(), get_options())
+    snap["decision_id"] = st.session_state.decision_id
+    st.session_state["_snapshot_cache"] = (version, snap)
+    return snap
+
+
+def apply_snapshot(snapshot: dict) -> None:
+    """
+    Load a snapshot into session state.
+    Safe defaults: missing or invalid fields fall back to defaults (see snapshots.decode_snapshot).
+    """
+    decision, options = snapshots.decode_snapshot(snapshot)
+    st.session_state.decision = decision
+    st.session_state.options = options
+    # files saved before decision ids existed start a chain of their own
+    st.session_state.decision_id = versions.decision_id_of(snapshot) or versions.new_decision_id()
+    _bump_options()
+    # a freshly loaded decision is already on disk
+    _mark_autosaved()
 
 
 # -----------------------------
 # Past Decisions (disk storage)
 # -----------------------------
-def _slug(s: str, *, max_len: int = 40) -> str:
-    s = (s or "").strip().lower()
-    s = re.sub(r"[^a-z0-9]+", "-", s)
-    s = re.sub(r"-+", "-", s).strip("-")
-    return (s[:max_len] or "decision").strip("-") or "decision"
+# File storage + metadata index live in saved_store.py (no Streamlit dependency);
+# re-exported here so screens keep using state.*
+list_saved_snapshots = saved_store.list_saved_snapshots
+load_snapshot_by_id = saved_store.load_snapshot_by_id
+delete_snapshot = saved_store.delete_snapshot
+list_versions = saved_store.list_versions
+load_version = saved_store.load_version
+list_drafts = saved_store.list_drafts
+load_draft = saved_store.load_draft
+delete_draft = saved_store.delete_draft
 
 
 def save_current_snapshot(label: str | None = None) -> str:
     """
     Saves current snapshot to disk and returns file_id (filename).
+    Re-saving the same decision (same decision_id) adds a version to its chain (see versions.py).
     """
-    SAVE_DIR.mkdir(parents=True, exist_ok=True)
+    snap = dict(snapshot_current())
+    snap["saved_at"] = datetime.now().isoformat(timespec="seconds")
+    file_id = saved_store.save_version(snap, label)
+    _drop_autosave()
+    return file_id
 
-    snap = snapshot_current()
-    title = ((snap.get("decision") or {}).get("title") or "").strip()
-    base = _slug(label or title or "decision")
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    file_id = f"{ts}__{base}.json"
-    path = SAVE_DIR / file_id
 
-    path.write_text(json.dumps(snap, indent=2, ensure_ascii=False), encoding="utf-8")
-    return file_id
+def version_changes(file_id: str, v_from: int, v_to: int) -> list[dict]:
+    """
+    Field-level differences between two versions of the chain headed by file_id.
+    """
+    return versions.changes(load_version(file_id, v_from), load_version(file_id, v_to))
 
 
-def list_saved_snapshots() -> list[dict[str, Any]]:
+# -----------------------------
+# Autosave
+# -----------------------------
+def _mark_autosaved() -> None:
+    st.session_state["_autosaved_version"] = state_version()
+
+
+def _drop_autosave() -> None:
+    # an explicit save supersedes this session's draft
+    file_id = st.session_state.get("autosave_file")
+    if file_id:
+        _AUTOSAVER.discard(file_id)
+        saved_store.delete_draft(file_id)
+    st.session_state.autosave_file = None
+    _mark_autosaved()
+
+
+def autosave_current() -> bool:
     """
-    Returns newest-first list of saved decisions with basic metadata.
+    Queues the current state for a background write if it changed since the last call
+    (call once per run, after the page). Never blocks on disk. Returns True if queued.
     """
-    if not SAVE_DIR.exists():
-        return []
+    version = state_version()
+    if version == st.session_state.get("_autosaved_version"):
+        return False
+    st.session_state["_autosaved_version"] = version
 
-    items: list[dict[str, Any]] = []
-    for p in sorted(SAVE_DIR.glob("*.json"), key=lambda x: x.name, reverse=True):
-        try:
-            raw = p.read_text(encoding="utf-8")
-            snap = json.loads(raw) if raw else {}
-            dec = snap.get("decision", {}) if isinstance(snap.get("decision"), dict) else {}
-            title = str(dec.get("title", "")).strip() or "Untitled"
-            category = str(dec.get("category", "")).strip()
-            saved_at = str(snap.get("saved_at", "")).strip() or p.name.split("__")[0]
-
-            items.append(
-                {
-                    "file_id": p.name,
-                    "title": title,
-                    "category": category,
-                    "saved_at": saved_at,
-                    "path": str(p),
-                }
-            )
-        except Exception:
-            # Corrupt file? Skip it (don’t brick Past Decisions screen).
-            continue
-
-    return items
-
-
-def load_snapshot_by_id(file_id: str) -> dict:
-    path = SAVE_DIR / file_id
-    if not path.exists():
-        raise FileNotFoundError(f"Snapshot not found: {file_id}")
-    snap = json.loads(path.read_text(encoding="utf-8"))
-    if not isinstance(snap, dict):
-        raise ValueError("Snapshot file did not contain a JSON object.")
-    return snap
+    file_id = st.session_state.get("autosave_file")
+    if file_id is None:
+        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+        file_id = f"{ts}__{AUTOSAVE_SLUG}-s{uuid.uuid4().hex[:8]}.json"
+        st.session_state.autosave_file = file_id
+
+    snap = dict(snapshot_current())
+    snap["saved_at"] = datetime.now().isoformat(timespec="seconds")
+    _AUTOSAVER.submit(file_id, snap)
+    return True
+
+
+def autosave_pending() -> bool:
+    file_id = st.session_state.get("autosave_file")
+    return bool(file_id) and _AUTOSAVER.pending(file_id)
 
 
-def delete_snapshot(file_id: str) -> None:
-    path = SAVE_DIR / file_id
-    if path.exists():
-        path.unlink()
+# -----------------------------
+# Shared session store
+# -----------------------------
+def _hydrate(sid: str) -> None:
+    # one backend read per session; after that the session's own state is the cache
+    snap = _SESSIONS.load(sid)
+    if snap is None:
+        return
+    decision, options = snapshots.decode_snapshot(snap)
+    st.session_state.decision = decision
+    st.session_state.options = options
+    did = versions.decision_id_of(snap)
+    if did is not None:
+        st.session_state.decision_id = did
+
+
+def persist_session() -> bool:
+    """
+    Queues the current state for the shared session store if it changed since the last call
+    (call once per run, after the page). Returns True if queued.
+    """
+    version = state_version()
+    if version == st.session_state.get("_persisted_version"):
+        return False
+    st.session_state["_persisted_version"] = version
+    _SESSIONS.save(st.session_state.sid, snapshot_current())
+    return True
+
+
+def session_store_stats() -> dict:
+    return _SESSIONS.stats()
+
+
+# Full-text search over saved files + storage.py history (see search.py)
+search_saved = search.query
+
+
+def load_search_hit(hit: dict) -> dict:
+    """
+    Snapshot behind a search hit, from whichever store it came from.
+    """
+    if hit["source"] == "history":
+        record = storage.get_saved(hit["ref"])
+        if record is None:
+            raise FileNotFoundError(f"Record not found: {hit['ref']}")
+        return snapshots.unwrap_record(record)
+    return load_snapshot_by_id(hit["ref"])
+
+
+def history_summary(days: int | None = None) -> dict:
+    """
+    Aggregates over every stored decision (see analytics.py), optionally the last N days only.
+    """
+    cols = analytics.history()
+    return cols.summary(None if days is None else analytics.days_ago(days))
 
 
 # -----------------------------
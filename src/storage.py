@@ -2,10 +2,40 @@
 from __future__ import annotations
 
 import json
+import sqlite3
+import threading
+import uuid
+from contextlib import closing
 from dataclasses import asdict, is_dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
+
+import search
+
+# Records live in an embedded SQLite database (data/decisions.sqlite3):
+# B-tree indexes give O(log n) inserts, id lookups, and newest-first pages
+# without reading the whole history. The old append-only data/decisions.jsonl
+# is imported once, the first time the database is opened.
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS decisions (
+    seq      INTEGER PRIMARY KEY AUTOINCREMENT,
+    id       TEXT NOT NULL UNIQUE,
+    saved_at TEXT NOT NULL,
+    record   TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS decisions_by_saved_at ON decisions (saved_at, seq);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_IMPORT_BATCH = 1000
+
+_init_lock = threading.Lock()
+_initialized: set[str] = set()
 
 
 def _root_dir() -> Path:
@@ -20,6 +50,10 @@ def _data_dir() -> Path:
 
 
 def _db_path() -> Path:
+    return _data_dir() / "decisions.sqlite3"
+
+
+def _legacy_jsonl_path() -> Path:
     return _data_dir() / "decisions.jsonl"
 
 
@@ -34,39 +68,145 @@ def _safe_json(obj: Any) -> Any:
     return obj
 
 
-def list_saved() -> list[dict[str, Any]]:
-    path = _db_path()
-    if not path.exists():
-        return []
+def _new_id() -> str:
+    return f"dec_{int(datetime.now(timezone.utc).timestamp())}_{uuid.uuid4().hex[:8]}"
 
+
+def _import_legacy_jsonl(conn: sqlite3.Connection) -> None:
+    """
+    One-time import of data/decisions.jsonl (streamed line by line).
+    Older ids were only second-resolution, so colliding ids get a suffix.
+    """
+    done = conn.execute("SELECT 1 FROM meta WHERE key = 'legacy_jsonl_imported'").fetchone()
+    path = _legacy_jsonl_path()
+    if done or not path.exists():
+        return
+
+    seen: set[str] = set()
+    batch: list[tuple[str, str, str]] = []
+    with conn, path.open("r", encoding="utf-8") as f:
+        for n, line in enumerate(f):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except Exception:
+                # ignore corrupted lines rather than breaking the app
+                continue
+            if not isinstance(record, dict):
+                continue
+
+            rid = str(record.get("id") or f"dec_legacy_{n}")
+            if rid in seen:
+                rid = f"{rid}_{n}"
+                record["id"] = rid
+            seen.add(rid)
+
+            batch.append((rid, str(record.get("saved_at", "")), json.dumps(record, default=_safe_json)))
+            if len(batch) >= _IMPORT_BATCH:
+                conn.executemany("INSERT OR IGNORE INTO decisions (id, saved_at, record) VALUES (?, ?, ?)", batch)
+                batch.clear()
+
+        if batch:
+            conn.executemany("INSERT OR IGNORE INTO decisions (id, saved_at, record) VALUES (?, ?, ?)", batch)
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('legacy_jsonl_imported', ?)",
+            (_utc_now_iso(),),
+        )
+
+
+def _connect() -> sqlite3.Connection:
+    path = _db_path()
+    conn = sqlite3.connect(path, timeout=30)
+    key = str(path)
+    if key not in _initialized:
+        with _init_lock:
+            if key not in _initialized:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(_SCHEMA)
+                _import_legacy_jsonl(conn)
+                _initialized.add(key)
+    return conn
+
+
+def _decode_rows(rows: list[tuple[str]]) -> list[dict[str, Any]]:
     out: list[dict[str, Any]] = []
-    for line in path.read_text(encoding="utf-8").splitlines():
-        line = line.strip()
-        if not line:
-            continue
+    for (raw,) in rows:
         try:
-            out.append(json.loads(line))
+            out.append(json.loads(raw))
         except Exception:
-            # ignore corrupted lines rather than breaking the app
             continue
-
-    # newest first
-    out.sort(key=lambda r: r.get("saved_at", ""), reverse=True)
     return out
 
 
+def list_saved(limit: int | None = None, offset: int = 0) -> list[dict[str, Any]]:
+    """
+    Returns saved records newest first. Pass limit/offset to page through history.
+    """
+    sql = "SELECT record FROM decisions ORDER BY saved_at DESC, seq DESC"
+    params: tuple[int, ...] = ()
+    if limit is not None:
+        sql += " LIMIT ? OFFSET ?"
+        params = (int(limit), max(0, int(offset)))
+
+    with closing(_connect()) as conn:
+        return _decode_rows(conn.execute(sql, params).fetchall())
+
+
+def count_saved() -> int:
+    with closing(_connect()) as conn:
+        return int(conn.execute("SELECT COUNT(*) FROM decisions").fetchone()[0])
+
+
+def get_saved(record_id: str) -> dict[str, Any] | None:
+    with closing(_connect()) as conn:
+        row = conn.execute("SELECT record FROM decisions WHERE id = ?", (record_id,)).fetchone()
+    if row is None:
+        return None
+    return json.loads(row[0])
+
+
 def save_snapshot(snapshot: dict[str, Any]) -> dict[str, Any]:
     """
-    Appends a snapshot to data/decisions.jsonl and returns the record written.
+    Inserts a snapshot into the decisions store and returns the record written.
     """
     record = {
-        "id": f"dec_{int(datetime.now(timezone.utc).timestamp())}",
+        "id": _new_id(),
         "saved_at": _utc_now_iso(),
         "snapshot": snapshot,
     }
 
-    path = _db_path()
-    with path.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(record, default=_safe_json) + "\n")
+    with closing(_connect()) as conn, conn:
+        conn.execute(
+            "INSERT INTO decisions (id, saved_at, record) VALUES (?, ?, ?)",
+            (record["id"], record["saved_at"], json.dumps(record, default=_safe_json)),
+        )
+    search.index_snapshots("history", [(record["id"], snapshot, record["saved_at"])])
 
     return record
+
+
+def last_seq() -> int:
+    with closing(_connect()) as conn:
+        return int(conn.execute("SELECT COALESCE(MAX(seq), 0) FROM decisions").fetchone()[0])
+
+
+def iter_saved(batch_size: int = 500, *, after_seq: int = 0, upto_seq: int | None = None) -> Iterator[dict[str, Any]]:
+    """
+    Streams saved records oldest first, batch_size rows per query
+    (keyset pagination on seq, so no connection is held open between batches).
+    after_seq / upto_seq bound the insertion sequence (see last_seq()) for incremental readers.
+    """
+    last = int(after_seq)
+    upper = 2**63 - 1 if upto_seq is None else int(upto_seq)
+    while True:
+        with closing(_connect()) as conn:
+            rows = conn.execute(
+                "SELECT seq, record FROM decisions WHERE seq > ? AND seq <= ? ORDER BY seq LIMIT ?",
+                (last, upper, int(batch_size)),
+            ).fetchall()
+        if not rows:
+            return
+        last = rows[-1][0]
+        yield from _decode_rows([(raw,) for _, raw in rows])
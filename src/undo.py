@@ -0,0 +1,186 @@
+# src/undo.py
+"""
+Undo/redo timeline for the decision being edited (no Streamlit import).
+
+Each step is an immutable frame of plain tuples:
+
+    ((title, category), (limits fields...), ((option key, (option fields...)), ...))
+
+Frames share every part that didn't change with the frame before them (an edit to one
+option's slider allocates one option tuple plus the few small tuples that point at it), so a long
+history costs little more than a single copy. Memory is capped per timeline by step count
+and by an estimate of the bytes each frame added; the oldest steps are dropped first.
+"""
+from __future__ import annotations
+
+import sys
+from dataclasses import fields
+from enum import Enum
+from typing import Any, Dict, Mapping
+
+from models import Decision, Limits, OptionInput
+
+DEFAULT_MAX_STEPS = 100
+DEFAULT_MAX_BYTES = 256 * 1024
+
+Frame = tuple
+
+_DECISION_FIELDS = tuple(f.name for f in fields(Decision) if f.name != "limits")
+_LIMITS_FIELDS = tuple(f.name for f in fields(Limits))
+_OPTION_FIELDS = tuple(f.name for f in fields(OptionInput))
+_CRITERIA = _OPTION_FIELDS.index("criteria")
+
+
+# -----------------------------
+# Frames
+# -----------------------------
+def _share(new: tuple, old: tuple | None) -> tuple:
+    return old if old is not None and old == new else new
+
+
+def _freeze_option(opt: OptionInput, old: tuple | None) -> tuple:
+    values = [getattr(opt, name) for name in _OPTION_FIELDS]
+    values[_CRITERIA] = _share(tuple((opt.criteria or {}).items()), old and old[_CRITERIA])
+    return tuple(values)
+
+
+def freeze(decision: Decision, options: Mapping[str, OptionInput], prev: Frame | None = None) -> Frame:
+    """
+    Immutable copy of the editable state, reusing prev's tuples wherever nothing changed.
+    """
+    dec = _share(tuple(getattr(decision, name) for name in _DECISION_FIELDS), prev and prev[0])
+    lim = _share(tuple(getattr(decision.limits, name) for name in _LIMITS_FIELDS), prev and prev[1])
+
+    prev_pairs = dict((p[0], p) for p in prev[2]) if prev else {}
+    pairs = []
+    for key, opt in options.items():
+        old = prev_pairs.get(key)
+        values = _share(_freeze_option(opt, old and old[1]), old and old[1])
+        pairs.append(old if old is not None and old[1] is values else (key, values))
+    opts = tuple(pairs)
+    if prev and len(opts) == len(prev[2]) and all(a is b for a, b in zip(opts, prev[2])):
+        opts = prev[2]
+
+    if prev and dec is prev[0] and lim is prev[1] and opts is prev[2]:
+        return prev
+    return (dec, lim, opts)
+
+
+def thaw(frame: Frame) -> tuple[Decision, Dict[str, OptionInput]]:
+    """
+    Fresh (mutable) model objects for a frame.
+    """
+    dec, lim, opts = frame
+    limits = Limits(**dict(zip(_LIMITS_FIELDS, lim)))
+    decision = Decision(**dict(zip(_DECISION_FIELDS, dec)), limits=limits)
+    options: Dict[str, OptionInput] = {}
+    for key, values in opts:
+        kwargs = dict(zip(_OPTION_FIELDS, values))
+        kwargs["criteria"] = dict(kwargs["criteria"])
+        options[key] = OptionInput(**kwargs)
+    return decision, options
+
+
+def _new_bytes(new: Any, old: Any) -> int:
+    """
+    Approximate bytes allocated by new that aren't shared with old.
+    """
+    if new is old or new is None or isinstance(new, (bool, int, float, Enum)):
+        return 0
+    n = sys.getsizeof(new)
+    if isinstance(new, tuple):
+        old_items = old if isinstance(old, tuple) and len(old) == len(new) else ()
+        for i, item in enumerate(new):
+            n += _new_bytes(item, old_items[i] if old_items else None)
+    return n
+
+
+# -----------------------------
+# Timeline
+# -----------------------------
+class Timeline:
+    """
+    Linear history with a cursor: record() after edits, undo()/redo() to move.
+    Recording after an undo drops the redo branch.
+    """
+
+    def __init__(self, max_steps: int = DEFAULT_MAX_STEPS, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.max_steps = max(1, int(max_steps))
+        self.max_bytes = max(0, int(max_bytes))
+        self._frames: list[Frame] = []
+        self._costs: list[int] = []
+        self._pos = -1
+        self._stamp: int | None = None
+        self.bytes = 0
+
+    @property
+    def can_undo(self) -> bool:
+        return self._pos > 0
+
+    @property
+    def can_redo(self) -> bool:
+        return self._pos < len(self._frames) - 1
+
+    def record(self, stamp: int, decision: Decision, options: Mapping[str, OptionInput]) -> bool:
+        """
+        Adds a step if the state changed since the last record/undo/redo (stamp is
+        state.state_version()). Returns True if a step was added.
+        """
+        if stamp == self._stamp:
+            return False
+        self._stamp = stamp
+
+        prev = self._frames[self._pos] if self._frames else None
+        frame = freeze(decision, options, prev)
+        if frame is prev:
+            return False
+
+        while len(self._frames) > self._pos + 1:
+            self._frames.pop()
+            self.bytes -= self._costs.pop()
+        cost = _new_bytes(frame, prev)
+        self._frames.append(frame)
+        self._costs.append(cost)
+        self.bytes += cost
+        self._pos = len(self._frames) - 1
+        self._evict()
+        return True
+
+    def _evict(self) -> None:
+        while len(self._frames) > 1 and (
+            len(self._frames) > self.max_steps or (self.max_bytes and self.bytes > self.max_bytes)
+        ):
+            self._frames.pop(0)
+            self.bytes -= self._costs.pop(0)
+            # the new oldest frame now owns what it used to share with the evicted one
+            full = _new_bytes(self._frames[0], None)
+            self.bytes += full - self._costs[0]
+            self._costs[0] = full
+            self._pos -= 1
+
+    def undo(self) -> Frame | None:
+        if not self.can_undo:
+            return None
+        self._pos -= 1
+        return self._frames[self._pos]
+
+    def redo(self) -> Frame | None:
+        if not self.can_redo:
+            return None
+        self._pos += 1
+        return self._frames[self._pos]
+
+    def mark(self, stamp: int) -> None:
+        """
+        Call after applying an undo/redo frame, so the restore itself isn't recorded.
+        """
+        self._stamp = stamp
+
+    def stats(self) -> dict:
+        return {
+            "steps": len(self._frames),
+            "position": self._pos + 1,
+            "bytes": self.bytes,
+            "max_steps": self.max_steps,
+            "max_bytes": self.max_bytes,
+        }
@@ -0,0 +1,250 @@
+# src/versions.py
+"""
+Version chains for repeated saves of the same decision (no Streamlit import).
+
+A chain belongs to one decision, identified by the "decision_id" every saved snapshot
+carries (a uuid assigned when the decision is started; titles are never used to match).
+The newest version of a chain is an ordinary saved file in data/saved_decisions/ (so
+listing, loading, search and export see it exactly as before, and loading it is O(1)).
+Every older version lives in data/saved_versions/<decision_id>.jsonl as a *reverse* delta: the
+field-level edits that turn version k+1 back into version k. Every REBASE_EVERY versions
+(or whenever a delta wouldn't be smaller) the full snapshot is stored instead, so rebuilding
+any version applies at most REBASE_EVERY - 1 deltas.
+
+Chain line k (1-based) is version k: {"head", "full" | "delta"}, where "head" is the file_id
+of the saved file that was newest when the line was written (the last line's is current).
+Lines carry nothing else (not even saved_at, which is inside the snapshot) to keep them small.
+
+Callers (saved_store) serialize writes; this module only does the delta algebra and file I/O.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import uuid
+from pathlib import Path
+from typing import Any, Iterator
+
+REBASE_EVERY = 64
+
+# Delta ops: [path, value] sets a field, [path] removes it (path = list of dict keys)
+Op = list
+
+_MISSING = object()
+_DECISION_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+def versions_dir() -> Path:
+    return Path(__file__).resolve().parents[1] / "data" / "saved_versions"
+
+
+def _chain_path(decision_id: str) -> Path:
+    return versions_dir() / f"{decision_id}.jsonl"
+
+
+def new_decision_id() -> str:
+    return uuid.uuid4().hex
+
+
+def decision_id_of(snap: Any) -> str | None:
+    """
+    The snapshot's decision_id, or None if it has none (saved before ids existed) or it
+    isn't one we issued.
+    """
+    did = snap.get("decision_id") if isinstance(snap, dict) else None
+    return did if isinstance(did, str) and _DECISION_ID.match(did) else None
+
+
+def _dumps(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+# -----------------------------
+# Delta algebra
+# -----------------------------
+def _same(a: Any, b: Any) -> bool:
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, (dict, list)):
+        # == ignores dict key order, which decides option order on load
+        return _dumps(a) == _dumps(b)
+    return a == b
+
+
+def _order_compatible(a: dict, b: dict) -> bool:
+    """
+    True if editing a key by key (set in place, delete, append new keys) yields b's key order.
+    """
+    common = [k for k in a if k in b]
+    return list(b) == common + [k for k in b if k not in a]
+
+
+def _walk(a: Any, b: Any, path: list[str]) -> Iterator[tuple[list[str], Any, Any]]:
+    if isinstance(a, dict) and isinstance(b, dict) and _order_compatible(a, b):
+        for k, av in a.items():
+            if k in b:
+                yield from _walk(av, b[k], path + [k])
+            else:
+                yield path + [k], av, _MISSING
+        for k, bv in b.items():
+            if k not in a:
+                yield path + [k], _MISSING, bv
+    elif not _same(a, b):
+        yield path, a, b
+
+
+def make_delta(src: Any, dst: Any) -> list[Op]:
+    """
+    Field-level edits that turn src into dst (see apply_delta).
+    """
+    return [[p] if after is _MISSING else [p, after] for p, _, after in _walk(src, dst, [])]
+
+
+def apply_delta(doc: Any, ops: list[Op]) -> Any:
+    """
+    Returns a new document with ops applied. Only dicts along edited paths are copied;
+    everything else is shared with doc.
+    """
+    out = doc
+    copied: set[int] = set()
+
+    def own(d: dict) -> dict:
+        if id(d) in copied:
+            return d
+        d = dict(d)
+        copied.add(id(d))
+        return d
+
+    for op in ops:
+        path = op[0]
+        if not path:
+            out = op[1]
+            continue
+        out = parent = own(out)
+        for key in path[:-1]:
+            child = own(parent[key])
+            parent[key] = child
+            parent = child
+        if len(op) > 1:
+            parent[path[-1]] = op[1]
+        else:
+            parent.pop(path[-1], None)
+    return out
+
+
+def changes(old: Any, new: Any) -> list[dict[str, Any]]:
+    """
+    Human-readable diff: [{"field": "options.opt_a.name", "before", "after"}, ...]
+    (before/after are None for added/removed fields).
+    """
+    return [
+        {
+            "field": ".".join(p) or "(snapshot)",
+            "before": None if before is _MISSING else before,
+            "after": None if after is _MISSING else after,
+        }
+        for p, before, after in _walk(old, new, [])
+    ]
+
+
+# -----------------------------
+# Chain files
+# -----------------------------
+def read_chain(decision_id: str) -> list[dict[str, Any]]:
+    try:
+        raw = _chain_path(decision_id).read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return []
+    out = []
+    for line in raw.splitlines():
+        try:
+            out.append(json.loads(line))
+        except json.JSONDecodeError:
+            # torn final line from a crash mid-append: everything before it is intact
+            break
+    return out
+
+
+def chain_head(chain: list[dict[str, Any]]) -> str | None:
+    return chain[-1]["head"] if chain else None
+
+
+def find_chain(file_id: str, snap: Any) -> tuple[str, list[dict[str, Any]]] | None:
+    """
+    (decision_id, chain) if file_id (whose content is snap) is the current head of a chain,
+    else None.
+    """
+    did = decision_id_of(snap)
+    if did is None:
+        return None
+    chain = read_chain(did)
+    return (did, chain) if chain_head(chain) == file_id else None
+
+
+def append_version(
+    decision_id: str,
+    chain: list[dict[str, Any]],
+    old: dict,
+    new_id: str,
+    new: dict,
+) -> dict[str, Any]:
+    """
+    Records old (the outgoing head) as version len(chain) + 1, stored relative to new.
+    """
+    v = len(chain) + 1
+    entry: dict[str, Any] = {"head": new_id}
+    full = _dumps(old)
+    if v % REBASE_EVERY:
+        ops = make_delta(new, old)
+        delta = _dumps(ops)
+        # keep the delta only if it is smaller and round-trips exactly
+        if len(delta) < len(full) and _dumps(apply_delta(new, ops)) == full:
+            entry["delta"] = ops
+    if "delta" not in entry:
+        entry["full"] = old
+
+    path = _chain_path(decision_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as f:
+        f.write(_dumps(entry) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    chain.append(entry)
+    return entry
+
+
+def drop_chain(decision_id: str) -> None:
+    _chain_path(decision_id).unlink(missing_ok=True)
+
+
+def reconstruct(chain: list[dict[str, Any]], head: dict, v: int) -> dict:
+    """
+    Version v (1-based; len(chain) + 1 is the head itself).
+    """
+    n = len(chain) + 1
+    if not 1 <= v <= n:
+        raise KeyError(f"No version {v} (chain has {n})")
+    if v == n:
+        return head
+
+    # nearest full snapshot at or after v, then walk the reverse deltas back down
+    j = v - 1
+    while j < len(chain) and "full" not in chain[j]:
+        j += 1
+    doc = head if j == len(chain) else chain[j]["full"]
+    for k in range(j - 1, v - 2, -1):
+        doc = apply_delta(doc, chain[k]["delta"])
+    return doc
+
+
+def walk_back(chain: list[dict[str, Any]], head: dict) -> Iterator[tuple[int, dict]]:
+    """
+    Yields (v, snapshot) for every version, newest first, in one pass over the chain.
+    """
+    doc = head
+    yield len(chain) + 1, doc
+    for k in range(len(chain) - 1, -1, -1):
+        entry = chain[k]
+        doc = entry["full"] if "full" in entry else apply_delta(doc, entry["delta"])
+        yield k + 1, doc